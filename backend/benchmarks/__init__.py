@@ -0,0 +1,7 @@
+"""
+Benchmarks - In-process load tests for the MediSurge AI API
+Seeds the database at configurable sizes, drives every GET route over ASGI
+and many WebSocket clients on /ws/updates, and compares runs against a
+saved JSON baseline. Run with `python -m benchmarks.run` from the backend
+directory.
+"""
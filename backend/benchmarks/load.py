@@ -0,0 +1,189 @@
+"""
+Load generators - HTTP routes over ASGI and WebSocket fan-out
+Both talk to the app in-process, so results measure the application and
+database rather than the network stack
+"""
+
+import asyncio
+import json
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from utils.pagination import encode_cursor
+
+# Variants of paginated and bucketed routes that take other query paths
+EXTRA_REQUESTS = [
+    "/api/agents/logs?include_total=true",
+    "/api/agents/logs?cursor={cursor}",
+    "/api/predictions/history?include_total=true",
+    "/api/staff/activations?include_total=true",
+    "/api/agents/activity?bucket=day",
+]
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict:
+    """Throughput and latency percentiles (milliseconds) for one endpoint"""
+    if not samples:
+        return {"requests": 0, "rps": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+
+def route_paths(app: FastAPI) -> List[str]:
+    """Every GET route with path parameters filled in, plus query variants"""
+    paths = []
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods:
+            paths.append(re.sub(r"\{[^}]+\}", "1", route.path))
+    cursor = encode_cursor(datetime.utcnow(), 2 ** 31)
+    return paths + [path.format(cursor=cursor) for path in EXTRA_REQUESTS]
+
+
+async def bench_route(client: httpx.AsyncClient, path: str, requests: int, concurrency: int,
+                      before_request=None) -> Dict:
+    """Issue `requests` GETs with `concurrency` in flight, returns latency stats"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            if before_request:
+                before_request()
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats = summarize(latencies, time.perf_counter() - start)
+    stats["errors"] = sum(count for status, count in statuses.items() if status >= 500)
+    return stats
+
+
+class ASGIWebSocket:
+    """
+    Minimal in-process WebSocket client speaking the ASGI protocol directly
+    """
+
+    def __init__(self, app: FastAPI, path: str):
+        self.app = app
+        self.path = path
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.outgoing: asyncio.Queue = asyncio.Queue()
+        self.accepted = asyncio.Event()
+        self.closed = False
+        self.task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        scope = {
+            "type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": self.path,
+            "raw_path": self.path.encode(), "query_string": b"", "root_path": "", "headers": [],
+            "client": ("127.0.0.1", 50000), "server": ("bench", 80), "subprotocols": []
+        }
+        await self.outgoing.put({"type": "websocket.connect"})
+        self.task = asyncio.create_task(self.app(scope, self.outgoing.get, self._on_send))
+        await self.accepted.wait()
+
+    async def _on_send(self, message: Dict):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            await self.incoming.put((time.perf_counter(), json.loads(message["text"])))
+        elif message["type"] == "websocket.close":
+            self.closed = True
+            self.accepted.set()
+
+    async def send_json(self, data: Dict):
+        await self.outgoing.put({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive(self, timeout: float = 5.0):
+        """(arrival time, message)"""
+        return await asyncio.wait_for(self.incoming.get(), timeout)
+
+    async def close(self):
+        await self.outgoing.put({"type": "websocket.disconnect", "code": 1000})
+        if self.task:
+            try:
+                await asyncio.wait_for(self.task, 5)
+            except (asyncio.TimeoutError, Exception):
+                self.task.cancel()
+
+
+async def bench_websockets(app: FastAPI, clients: int, messages: int,
+                           topic: str = "city:benchmark") -> Dict:
+    """
+    Connect `clients` dashboards, subscribe each to one topic, then publish
+    `messages` updates and time how long each takes to reach every client
+    """
+    manager = app.state.manager
+    sockets = [ASGIWebSocket(app, "/ws/updates") for _ in range(clients)]
+
+    connect_latency, subscribe_latency = [], []
+    start = time.perf_counter()
+    for socket in sockets:
+        began = time.perf_counter()
+        await socket.connect()
+        connect_latency.append(time.perf_counter() - began)
+    for socket in sockets:
+        began = time.perf_counter()
+        await socket.send_json({"action": "subscribe", "topics": [topic]})
+        while True:
+            _, message = await socket.receive()
+            if message.get("type") == "subscribed":
+                break
+        subscribe_latency.append(time.perf_counter() - began)
+    setup_elapsed = time.perf_counter() - start
+
+    dropped_before = manager.get_stats().get("dropped_messages", 0)
+    published_at: Dict[int, float] = {}
+    start = time.perf_counter()
+    for n in range(messages):
+        published_at[n] = time.perf_counter()
+        await manager.publish(topic, {"n": n})
+        await asyncio.sleep(0)
+
+    delivery_latency: List[float] = []
+    missing = 0
+    for socket in sockets:
+        for _ in range(messages):
+            try:
+                arrived, message = await socket.receive()
+            except asyncio.TimeoutError:
+                missing += 1
+                break
+            n = (message.get("data") or message.get("changed") or {}).get("n")
+            if n in published_at:
+                delivery_latency.append(arrived - published_at[n])
+    fanout_elapsed = time.perf_counter() - start
+
+    for socket in sockets:
+        await socket.close()
+
+    return {
+        "clients": clients,
+        "messages": messages,
+        "connect": summarize(connect_latency, setup_elapsed),
+        "subscribe": summarize(subscribe_latency, setup_elapsed),
+        "delivery": summarize(delivery_latency, fanout_elapsed),
+        "deliveries_per_sec": round(len(delivery_latency) / fanout_elapsed, 1) if fanout_elapsed else 0.0,
+        "undelivered": clients * messages - len(delivery_latency),
+        "dropped": manager.get_stats().get("dropped_messages", 0) - dropped_before,
+        "timed_out_clients": missing
+    }
@@ -0,0 +1,151 @@
+"""
+Benchmark runner - Grow the database, load every route, compare to a baseline
+
+Usage (from the backend directory):
+    python -m benchmarks.run                                  # 1k and 100k rows per table
+    python -m benchmarks.run --sizes 1000,100000,1000000 --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+Exits 1 when --compare finds a route whose p95 regressed past the threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+DEFAULT_SIZES = "1000,100000"
+
+
+def _configure_environment(args):
+    """Point the app at the benchmark database before anything imports it"""
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="medisurge-bench-"), "bench.db")
+    os.environ["MEDISURGE_DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["MEDISURGE_READ_DATABASE_URL"] = os.environ["MEDISURGE_DATABASE_URL"]
+    os.environ["MEDISURGE_MONITORING"] = "0"
+    os.environ.setdefault("MEDISURGE_LEADER_LOCK", db_path + ".leader.lock")
+    return db_path
+
+
+async def run_benchmarks(args) -> Dict:
+    import httpx
+
+    from benchmarks.load import bench_route, bench_websockets, route_paths
+    from benchmarks.seed import seed_database
+    from main import app
+    from utils.cache import response_cache
+
+    results: Dict[str, Dict] = {}
+    # Measure the database path unless asked to include the response cache
+    before_request = None if args.cached else response_cache.invalidate
+
+    async with app.router.lifespan_context(app):
+        paths = [path for path in route_paths(app) if not args.routes or args.routes in path]
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in args.sizes:
+                start = time.perf_counter()
+                await seed_database(size, args.seed)
+                print(f"🌱 Seeded {size:,} rows per table in {time.perf_counter() - start:.1f}s")
+
+                routes = {}
+                for path in paths:
+                    routes[path] = await bench_route(client, path, args.requests, args.concurrency, before_request)
+                    stats = routes[path]
+                    print(f"  {path:<60} {stats['rps']:>8} req/s  p50 {stats['p50_ms']:>8}ms  "
+                          f"p95 {stats['p95_ms']:>8}ms  p99 {stats['p99_ms']:>8}ms"
+                          + (f"  ❌ {stats['errors']} errors" if stats["errors"] else ""))
+
+                websocket = None
+                if args.ws_clients:
+                    websocket = await bench_websockets(app, args.ws_clients, args.ws_messages)
+                    delivery = websocket["delivery"]
+                    print(f"  {'/ws/updates':<60} {websocket['deliveries_per_sec']:>8} msg/s  "
+                          f"p50 {delivery['p50_ms']:>8}ms  p95 {delivery['p95_ms']:>8}ms  "
+                          f"p99 {delivery['p99_ms']:>8}ms  ({websocket['clients']} clients, "
+                          f"{websocket['undelivered']} undelivered)")
+
+                results[str(size)] = {"routes": routes, "websocket": websocket}
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "requests": args.requests, "concurrency": args.concurrency, "cached": args.cached,
+            "ws_clients": args.ws_clients, "ws_messages": args.ws_messages, "seed": args.seed
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """Routes (and WebSocket delivery) whose p95 grew past the threshold"""
+    regressions = []
+    for size, run in current["results"].items():
+        base_run = baseline["results"].get(size)
+        if base_run is None:
+            continue
+        pairs = [(path, stats, base_run["routes"].get(path)) for path, stats in run["routes"].items()]
+        if run.get("websocket") and base_run.get("websocket"):
+            pairs.append(("/ws/updates", run["websocket"]["delivery"], base_run["websocket"]["delivery"]))
+
+        for path, stats, base in pairs:
+            if base is None:
+                continue
+            before, after = base["p95_ms"], stats["p95_ms"]
+            if after > before * (1 + threshold) and after - before >= min_delta_ms:
+                regressions.append(f"{int(size):,} rows {path}: p95 {before}ms -> {after}ms "
+                                   f"(+{(after / before - 1) * 100 if before else float('inf'):.0f}%)")
+            if stats.get("errors") and not base.get("errors"):
+                regressions.append(f"{int(size):,} rows {path}: {stats['errors']} server errors")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="In-process HTTP and WebSocket load benchmarks")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"rows per table to benchmark at, grown in order (default {DEFAULT_SIZES})")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route (default 200)")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight per route (default 16)")
+    parser.add_argument("--ws-clients", type=int, default=200, help="WebSocket clients, 0 to skip (default 200)")
+    parser.add_argument("--ws-messages", type=int, default=50, help="updates published to them (default 50)")
+    parser.add_argument("--routes", help="only benchmark paths containing this text")
+    parser.add_argument("--cached", action="store_true", help="leave the response cache on")
+    parser.add_argument("--db", help="reuse this SQLite file instead of a fresh temporary one")
+    parser.add_argument("--seed", type=int, default=0, help="seed for generated rows (default 0)")
+    parser.add_argument("--save", help="write the results to this baseline file")
+    parser.add_argument("--compare", help="compare the results with this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed p95 growth over the baseline (default 0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="ignore p95 changes smaller than this (default 1ms)")
+    args = parser.parse_args()
+    args.sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    db_path = _configure_environment(args)
+    print(f"📦 Benchmark database: {db_path}")
+    report = asyncio.run(run_benchmarks(args))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) against {args.compare}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"✅ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
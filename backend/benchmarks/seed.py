@@ -0,0 +1,167 @@
+"""
+Benchmark data - Deterministic bulk seeding of every table
+Tops each table up to the requested row count so one database can grow
+through 1k -> 100k -> 1M rows between benchmark rounds
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import func, insert, select
+
+from database import (
+    AgentLog, CommunicationLog, InsurancePreAuth, PharmaceuticalAlert, PharmaceuticalInventory,
+    Prediction, Resource, RetiredStaff, StaffActivation, SurveillanceData, engine
+)
+
+CHUNK_SIZE = 20000
+# Rows are spread over this window, newest at seeding time
+HISTORY = timedelta(days=90)
+
+AGENTS = ["surveillance", "prediction", "resource", "insurance", "reverse911", "pharmaceutical", "communication"]
+CONDITIONS = ["Respiratory", "Cardiovascular", "Trauma", "Vector-borne"]
+LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+HOSPITALS = ["Lilavati Hospital", "KEM Hospital", "Hinduja Hospital", "Nanavati Hospital", "Jaslok Hospital"]
+MEDICINES = ["Salbutamol Inhaler", "Budesonide", "Prednisolone", "Oxygen Supply", "N95 Masks"]
+PROVIDERS = ["Star Health", "HDFC ERGO", "ICICI Lombard", "Niva Bupa"]
+SPECIALIZATIONS = ["Pulmonologist", "Emergency Medicine", "General Physician", "Nurse", "Cardiologist"]
+
+RowFactory = Callable[[int, random.Random, datetime], Dict]
+
+
+def _timestamp(rng: random.Random, now: datetime) -> datetime:
+    return now - HISTORY * rng.random()
+
+
+def _surveillance(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "timestamp": _timestamp(rng, now), "aqi": rng.uniform(50, 300),
+        "temperature": rng.uniform(15, 35), "humidity": rng.uniform(40, 85),
+        "events": {"upcoming": False, "name": None, "days_until": None},
+        "social_sentiment": {"breathing_difficulty_mentions": rng.randint(0, 1000)},
+        "admission_patterns": {"current_rate": rng.randint(80, 150), "baseline": 100, "trend": "stable"}
+    }
+
+
+def _prediction(i: int, rng: random.Random, now: datetime) -> Dict:
+    timestamp = _timestamp(rng, now)
+    patients = rng.randint(100, 600)
+    return {
+        "timestamp": timestamp, "surge_date": timestamp + timedelta(hours=rng.randint(48, 72)),
+        "predicted_patients": patients, "baseline_patients": 120,
+        "surge_percentage": round((patients - 120) / 120 * 100, 1), "confidence": rng.uniform(60, 95),
+        "primary_condition": rng.choice(CONDITIONS), "alert_level": rng.choice(LEVELS),
+        "factors": {"aqi": rng.uniform(50, 300)}
+    }
+
+
+def _resource(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "prediction_id": i, "timestamp": _timestamp(rng, now),
+        "nurses_needed": rng.randint(5, 80), "doctors_needed": rng.randint(2, 30),
+        "nebulizers": rng.randint(0, 50), "oxygen_cylinders": rng.randint(0, 100),
+        "n95_masks": rng.randint(0, 5000), "ventilators": rng.randint(0, 20),
+        "estimated_cost": rng.uniform(1e5, 5e6), "allocation_strategy": {"priority": rng.choice(LEVELS)}
+    }
+
+
+def _pre_auth(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "prediction_id": i, "timestamp": _timestamp(rng, now), "patient_count": rng.randint(10, 200),
+        "insurance_provider": rng.choice(PROVIDERS), "treatment_type": rng.choice(CONDITIONS),
+        "estimated_cost": rng.uniform(1e4, 1e6), "status": rng.choice(["pending", "approved", "rejected"]),
+        "approval_rate": rng.uniform(70, 99)
+    }
+
+
+def _retired_staff(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "name": f"Dr. Staff {i}", "specialization": rng.choice(SPECIALIZATIONS),
+        "phone": f"+91-98{i % 10 ** 8:08d}", "email": f"staff{i}@example.org",
+        "distance_km": rng.uniform(1, 40), "crisis_hero_score": rng.randint(0, 1000),
+        "availability": rng.random() < 0.7, "last_response_time": rng.uniform(0.5, 6),
+        "total_activations": rng.randint(0, 30)
+    }
+
+
+def _activation(i: int, rng: random.Random, now: datetime) -> Dict:
+    timestamp = _timestamp(rng, now)
+    return {
+        "prediction_id": i, "staff_id": rng.randint(1, 1000), "timestamp": timestamp,
+        "shift_date": timestamp + timedelta(days=2), "shift_duration": rng.choice([8, 12]),
+        "compensation": rng.uniform(5000, 20000),
+        "status": rng.choice(["sent", "confirmed", "declined", "completed"]),
+        "response_time": rng.uniform(0.5, 6)
+    }
+
+
+def _inventory(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "hospital_name": rng.choice(HOSPITALS), "medicine_name": rng.choice(MEDICINES),
+        "current_stock": rng.randint(0, 1000), "required_stock": rng.randint(100, 1000), "unit": "units",
+        "expiry_date": now + timedelta(days=rng.randint(30, 720)), "last_updated": _timestamp(rng, now)
+    }
+
+
+def _pharma_alert(i: int, rng: random.Random, now: datetime) -> Dict:
+    timestamp = _timestamp(rng, now)
+    return {
+        "prediction_id": i, "timestamp": timestamp, "medicine_name": rng.choice(MEDICINES),
+        "required_quantity": rng.randint(100, 5000), "current_stock": rng.randint(0, 1000),
+        "partner_company": "Cipla", "production_status": rng.choice(["alerted", "ramping", "ready"]),
+        "estimated_delivery": timestamp + timedelta(days=rng.randint(1, 5))
+    }
+
+
+def _communication(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "prediction_id": i, "timestamp": _timestamp(rng, now), "message_type": "advisory",
+        "channel": rng.choice(["SMS", "WhatsApp", "email"]), "recipients_count": rng.randint(1000, 500000),
+        "content": "Public health advisory: limit outdoor activity.", "language": rng.choice(["en", "hi", "mr"]),
+        "sent_successfully": rng.random() < 0.98
+    }
+
+
+def _agent_log(i: int, rng: random.Random, now: datetime) -> Dict:
+    return {
+        "timestamp": _timestamp(rng, now), "agent_name": rng.choice(AGENTS), "action": "crisis_response",
+        "status": "success" if rng.random() < 0.95 else "failed",
+        "details": {"prediction_id": i, "region": "mumbai"}, "execution_time": rng.uniform(0.01, 2)
+    }
+
+
+FACTORIES: Dict[type, RowFactory] = {
+    SurveillanceData: _surveillance,
+    Prediction: _prediction,
+    Resource: _resource,
+    InsurancePreAuth: _pre_auth,
+    RetiredStaff: _retired_staff,
+    StaffActivation: _activation,
+    PharmaceuticalInventory: _inventory,
+    PharmaceuticalAlert: _pharma_alert,
+    CommunicationLog: _communication,
+    AgentLog: _agent_log,
+}
+
+
+async def seed_database(rows_per_table: int, seed: int = 0) -> Dict[str, int]:
+    """Insert rows until every table holds `rows_per_table`, returns rows added per table"""
+    added = {}
+    now = datetime.utcnow()
+    for model, factory in FACTORIES.items():
+        async with engine.begin() as conn:
+            existing = (await conn.execute(select(func.count()).select_from(model))).scalar()
+            missing = rows_per_table - existing
+            if missing <= 0:
+                continue
+            # Seeded per table and offset so growing a database stays deterministic
+            rng = random.Random(f"{seed}:{model.__tablename__}:{existing}")
+            for start in range(existing, rows_per_table, CHUNK_SIZE):
+                rows: List[Dict] = [
+                    factory(i, rng, now) for i in range(start, min(start + CHUNK_SIZE, rows_per_table))
+                ]
+                await conn.execute(insert(model), rows)
+        added[model.__tablename__] = missing
+    return added
+
@@ -0,0 +1,85 @@
+"""
+Threat scoring benchmark - Scalar rule chain against the NumPy batch path
+
+Usage (from the backend directory):
+    python -m benchmarks.threat_scoring                     # 10k and 1M rows
+    python -m benchmarks.threat_scoring --rows 10000 --repeat 5
+Both paths score the same random readings and the levels must agree.
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict
+
+import numpy as np
+
+from services.threat_scoring import DEFAULT_THREAT_RULES, score_batch, threat_level, threat_score
+
+DEFAULT_ROWS = "10000,1000000"
+
+
+def generate_columns(rows: int, seed: int) -> Dict[str, np.ndarray]:
+    """Readings spread across every rule's threshold"""
+    rng = np.random.default_rng(seed)
+    days = rng.integers(0, 11, rows).astype(np.float64)
+    days[days > 3] = np.nan
+    return {
+        "aqi": rng.uniform(50, 300, rows),
+        "temperature": rng.uniform(15, 35, rows),
+        "event_days": days,
+        "breathing_mentions": rng.integers(0, 1000, rows).astype(np.float64),
+        "admissions_rising": rng.random(rows) < 1 / 3,
+        "aqi_slope_per_hour": rng.normal(0, 15, rows),
+        "aqi_trend_points": rng.integers(0, 10, rows).astype(np.float64)
+    }
+
+
+def score_scalar(columns: Dict[str, np.ndarray], rules: Dict[str, float]):
+    """The per-reading path, fed the same values as dicts like a live scan"""
+    levels = []
+    for aqi, temp, days, mentions, rising, slope, points in zip(*(columns[name].tolist() for name in (
+            "aqi", "temperature", "event_days", "breathing_mentions", "admissions_rising",
+            "aqi_slope_per_hour", "aqi_trend_points"))):
+        events = {"upcoming": days == days, "days_until": days}
+        trends = {"aqi": {"slope_per_hour": slope, "count": points}}
+        score = threat_score(aqi, temp, events, {"breathing_difficulty_mentions": mentions},
+                             {"trend": "increasing" if rising else "stable"}, trends, rules)
+        levels.append(threat_level(score, rules))
+    return levels
+
+
+def best_of(repeat: int, fn, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Scalar vs vectorized threat scoring")
+    parser.add_argument("--rows", default=DEFAULT_ROWS, help=f"row counts to score (default {DEFAULT_ROWS})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per path, best one reported (default 3)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for generated readings (default 0)")
+    args = parser.parse_args()
+
+    rules = DEFAULT_THREAT_RULES
+    for rows in (int(size) for size in args.rows.split(",")):
+        columns = generate_columns(rows, args.seed)
+        scalar_time, scalar_levels = best_of(args.repeat, score_scalar, columns, rules)
+        batch_time, batch = best_of(args.repeat, lambda: score_batch(**columns, rules=rules))
+        mismatches = int(np.count_nonzero(np.asarray(scalar_levels) != batch["level"]))
+
+        print(f"{rows:>10,} rows  scalar {scalar_time * 1000:>9.1f}ms ({rows / scalar_time:>12,.0f} rows/s)  "
+              f"batch {batch_time * 1000:>7.1f}ms ({rows / batch_time:>13,.0f} rows/s)  "
+              f"{scalar_time / batch_time:>5.0f}x faster")
+        if mismatches:
+            print(f"❌ {mismatches} rows scored differently")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,73 @@
 Database models and initialization for MediSurge AI
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, JSON, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Text, Index, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from datetime import datetime
 import os
 
+from utils.metrics import instrument_engine
+
 # Database setup
-DATABASE_URL = "sqlite:///./medisurge.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Writes (orchestrator, migrations) go through `engine`, route reads through
+# `read_engine`. Point MEDISURGE_READ_DATABASE_URL at a replica to split them
+# across servers, e.g. with postgresql+asyncpg:// URLs.
+DATABASE_URL = os.getenv("MEDISURGE_DATABASE_URL", "sqlite+aiosqlite:///./medisurge.db")
+READ_DATABASE_URL = os.getenv("MEDISURGE_READ_DATABASE_URL", DATABASE_URL)
+
+# SQLite storage profile: WAL lets readers proceed while the monitoring loop
+# writes, the rest trades a little durability on power loss for throughput
+SQLITE_PRAGMAS = {
+    "synchronous": os.getenv("MEDISURGE_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": int(os.getenv("MEDISURGE_SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB, 64 MiB
+    "mmap_size": int(os.getenv("MEDISURGE_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "busy_timeout": int(os.getenv("MEDISURGE_SQLITE_BUSY_TIMEOUT", "5000")),  # ms
+    "temp_store": "MEMORY",
+}
+SQLITE_JOURNAL_MODE = os.getenv("MEDISURGE_SQLITE_JOURNAL_MODE", "WAL")
+
+def _create_engine(url: str, read_only: bool) -> AsyncEngine:
+    """Create a pooled async engine, applying the SQLite profile when relevant"""
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            url,
+            pool_size=int(os.getenv("MEDISURGE_DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("MEDISURGE_DB_MAX_OVERFLOW", "20")),
+            pool_pre_ping=True
+        )
+    
+    # SQLite allows a single writer at a time, so one pooled write connection
+    # avoids lock contention between our own writers
+    pool_size = int(os.getenv("MEDISURGE_DB_POOL_SIZE", "8")) if read_only else 1
+    sqlite_engine = create_async_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=pool_size if read_only else 0
+    )
+    
+    @event.listens_for(sqlite_engine.sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not read_only:
+            cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    
+    return sqlite_engine
+
+engine = _create_engine(DATABASE_URL, read_only=False)
+read_engine = _create_engine(READ_DATABASE_URL, read_only=True)
+instrument_engine(engine, "write")
+instrument_engine(read_engine, "read")
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # Models
@@ -19,7 +76,7 @@ class SurveillanceData(Base):
     __tablename__ = "surveillance_data"
     
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     aqi = Column(Float)
     temperature = Column(Float)
     humidity = Column(Float)
@@ -29,10 +86,14 @@ class SurveillanceData(Base):
 
 class Prediction(Base):
     __tablename__ = "predictions"
+    __table_args__ = (
+        # History pages walk (timestamp, id) newest first
+        Index("ix_predictions_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
-    surge_date = Column(DateTime)
+    surge_date = Column(DateTime, index=True)
     predicted_patients = Column(Integer)
     baseline_patients = Column(Integer)
     surge_percentage = Column(Float)
@@ -46,7 +107,7 @@ class Resource(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     prediction_id = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     nurses_needed = Column(Integer)
     doctors_needed = Column(Integer)
     nebulizers = Column(Integer)
@@ -61,7 +122,7 @@ class InsurancePreAuth(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     prediction_id = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     patient_count = Column(Integer)
     insurance_provider = Column(String)
     treatment_type = Column(String)
@@ -71,6 +132,10 @@ class InsurancePreAuth(Base):
 
 class RetiredStaff(Base):
     __tablename__ = "retired_staff"
+    __table_args__ = (
+        # Available staff ranked by score
+        Index("ix_retired_staff_availability_score", "availability", "crisis_hero_score"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
@@ -78,13 +143,16 @@ class RetiredStaff(Base):
     phone = Column(String)
     email = Column(String)
     distance_km = Column(Float)
-    crisis_hero_score = Column(Integer, default=0)
+    crisis_hero_score = Column(Integer, default=0, index=True)
     availability = Column(Boolean, default=True)
     last_response_time = Column(Float)  # hours
     total_activations = Column(Integer, default=0)
 
 class StaffActivation(Base):
     __tablename__ = "staff_activations"
+    __table_args__ = (
+        Index("ix_staff_activations_timestamp_id", "timestamp", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     prediction_id = Column(Integer)
@@ -113,7 +181,7 @@ class PharmaceuticalAlert(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     prediction_id = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     medicine_name = Column(String)
     required_quantity = Column(Integer)
     current_stock = Column(Integer)
@@ -126,7 +194,7 @@ class CommunicationLog(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     prediction_id = Column(Integer)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
     message_type = Column(String)  # advisory, activation, alert
     channel = Column(String)  # SMS, WhatsApp, email
     recipients_count = Column(Integer)
@@ -136,6 +204,11 @@ class CommunicationLog(Base):
 
 class AgentLog(Base):
     __tablename__ = "agent_logs"
+    __table_args__ = (
+        Index("ix_agent_logs_timestamp_id", "timestamp", "id"),
+        # Activity aggregation groups by agent inside a time window
+        Index("ix_agent_logs_agent_timestamp", "agent_name", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -145,15 +218,23 @@ class AgentLog(Base):
     details = Column(JSON)
     execution_time = Column(Float)
 
-def init_db():
-    """Initialize database and create tables"""
-    Base.metadata.create_all(bind=engine)
+async def init_db():
+    """Initialize database, create tables and apply pending migrations"""
+    from migrations import run_migrations
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        applied = await conn.run_sync(run_migrations)
+    if applied:
+        print(f"✅ Applied {len(applied)} database migration(s)")
     print("✅ Database initialized successfully!")
 
-def get_db():
-    """Get database session"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Get read-only async database session for route queries"""
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+async def dispose_engines():
+    """Close pooled connections on shutdown"""
+    await read_engine.dispose()
+    await engine.dispose()
@@ -3,35 +3,172 @@ MediSurge AI - Main FastAPI Application
 Multi-Agent Healthcare Crisis Management System
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager, suppress
 import uvicorn
-from typing import List
+import asyncio
 import json
+import os
+import time
 
-from routes import agents, predictions, resources, insurance, staff, pharmaceutical, dashboard
+from routes import agents, predictions, resources, insurance, staff, pharmaceutical, dashboard, surveillance
 from services.orchestrator_agent import OrchestratorAgent
-from database import init_db
+from services.connection_manager import ConnectionManager
+from services.broadcast_bus import create_bus, InMemoryBus, LeaderElection
+from services.persistence import PersistenceQueue, agent_log_sampler
+from services.ingestion import IngestionPipeline, Pane
+from database import init_db, dispose_engines
+from utils.cache import response_cache, CRISIS_RESPONSE
+from utils.metrics import registry
+from utils.loop_monitor import LoopLagMonitor
+
+# Seconds a failed persistence batch keeps /api/health degraded
+HEALTH_FAILURE_WINDOW = float(os.getenv("MEDISURGE_HEALTH_FAILURE_WINDOW", "300"))
 
 # Initialize orchestrator
 orchestrator = None
+persistence = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager for the application"""
-    global orchestrator
+    global orchestrator, persistence
     
     # Startup
     print("🚀 Initializing MediSurge AI System...")
-    init_db()
+    await loop_monitor.start()
+    await init_db()
     orchestrator = OrchestratorAgent()
+    orchestrator.publisher = manager.publish
+    
+    # Agent outputs are written in batches off the response path
+    persistence = PersistenceQueue(
+        batch_size=int(os.getenv("MEDISURGE_PERSIST_BATCH_SIZE", "5000")),
+        flush_interval=float(os.getenv("MEDISURGE_PERSIST_FLUSH_INTERVAL", "1.0")),
+        max_pending_rows=int(os.getenv("MEDISURGE_PERSIST_MAX_PENDING", "50000")),
+        max_attempts=int(os.getenv("MEDISURGE_PERSIST_MAX_ATTEMPTS", "3"))
+    )
+    await persistence.start()
+    orchestrator.persistence = persistence
+    
+    # Recent readings survive restarts through a snapshot of the time-series store.
+    # Restore it before ingestion starts appending, so every series stays in time order
+    history_path = os.getenv("MEDISURGE_HISTORY_SNAPSHOT", "./medisurge_history.bin")
+    if history_path and os.path.exists(history_path):
+        try:
+            points = await asyncio.to_thread(orchestrator.history.restore, history_path)
+            print(f"📈 Restored {points} recent readings from {history_path}")
+        except (OSError, ValueError, EOFError) as e:
+            print(f"⚠️ Could not restore reading history from {history_path}: {e}")
+    
+    # Streaming sensor readings feed windowed aggregates into threat scoring
+    ingestion = IngestionPipeline(
+        tumbling_seconds=float(os.getenv("MEDISURGE_INGEST_TUMBLING_SECONDS", "60")),
+        sliding_seconds=float(os.getenv("MEDISURGE_INGEST_SLIDING_SECONDS", "900")),
+        queue_batches=int(os.getenv("MEDISURGE_INGEST_QUEUE_BATCHES", "64")),
+        max_stations=int(os.getenv("MEDISURGE_INGEST_MAX_STATIONS", "10000"))
+    )
+    await ingestion.start()
+    orchestrator.surveillance.sensor_feed = ingestion
+    ingestion.history = orchestrator.history
+    app.state.orchestrator = orchestrator
+    app.state.ingestion = ingestion
+    app.state.surveillance = orchestrator.surveillance
+    app.state.regions = orchestrator.regions
+    
+    # Optionally keep a sample of span timings in AgentLog
+    sample_rate = float(os.getenv("MEDISURGE_METRICS_SAMPLE_RATE", "0"))
+    span_sampler = agent_log_sampler(persistence, sample_rate) if sample_rate > 0 else None
+    if span_sampler:
+        registry.span_sinks.append(span_sampler)
+    
+    # Join the cross-worker bus, then ask the leader for current snapshots
+    bus = create_bus()
+    manager.attach_bus(bus)
+    await bus.start()
+    await bus.publish("sync_request", {"pid": os.getpid()})
+    app.state.bus = bus
+    app.state.manager = manager
+    
+    # New crisis results invalidate cached dashboard responses on every worker
+    async def invalidate_cache(channel: str, message: dict):
+        if channel == "cache_invalidate":
+            response_cache.invalidate(message.get("tag"))
+    bus.subscribe(invalidate_cache)
+    
+    async def on_crisis_response(prediction: dict, results: dict):
+        await bus.publish("cache_invalidate", {"tag": CRISIS_RESPONSE})
+    orchestrator.response_listeners.append(on_crisis_response)
+    
+    # Readings can arrive at any worker: share each closed ward window
+    if type(bus) is not InMemoryBus:
+        def share_window(ward: str, pane: Pane):
+            asyncio.create_task(bus.publish(
+                "sensor_window", {"pid": os.getpid(), "ward": ward, "pane": pane.to_dict()}
+            ))
+        ingestion.window_listeners.append(share_window)
+        
+        async def merge_window(channel: str, message: dict):
+            if channel == "sensor_window" and message.get("pid") != os.getpid():
+                ingestion.merge_window(message["ward"], Pane.from_dict(message["pane"]), str(message["pid"]))
+        bus.subscribe(merge_window)
+    
+    # Exactly one worker runs the monitoring loop
+    election = LeaderElection(os.getenv("MEDISURGE_LEADER_LOCK", "/tmp/medisurge-leader.lock"))
+    app.state.election = election
+    monitoring_tasks = []
+    
+    async def on_elected():
+        async def resend_snapshots(channel: str, message: dict):
+            if channel == "sync_request":
+                for topic, snapshot in list(manager.snapshots.items()):
+                    await manager.publish(topic, snapshot)
+        bus.subscribe(resend_snapshots)
+        
+        # Scan requests can arrive at any worker, only the leader runs them
+        async def run_requested_scan(channel: str, message: dict):
+            if channel == "scan_request":
+                if not orchestrator.trigger_scan(message.get("reason", "manual"), message.get("region")):
+                    print(f"⚠️ Scan request for {message.get('region') or 'all regions'} not run: monitoring is stopped")
+        bus.subscribe(run_requested_scan)
+        
+        if os.getenv("MEDISURGE_MONITORING", "1") == "1":
+            monitoring_tasks.append(asyncio.create_task(orchestrator.start_monitoring()))
+        else:
+            await orchestrator.publish_status()
+    
+    election_task = asyncio.create_task(election.run(on_elected))
     print("✅ All agents initialized and ready!")
     
     yield
     
     # Shutdown
     print("🛑 Shutting down MediSurge AI System...")
+    orchestrator.stop_monitoring()
+    for task in [election_task, *monitoring_tasks]:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if span_sampler:
+        registry.span_sinks.remove(span_sampler)
+    await ingestion.stop()
+    await orchestrator.surveillance.sources.close()
+    # Only the leader (which runs the scans) writes the snapshot, while it
+    # still holds the lock, so workers never race on the same file
+    if history_path and election.is_leader:
+        try:
+            points = await asyncio.to_thread(orchestrator.history.snapshot, history_path)
+            print(f"📈 Saved {points} recent readings to {history_path}")
+        except OSError as e:
+            print(f"⚠️ Could not save reading history to {history_path}: {e}")
+    election.release()
+    await persistence.stop()
+    await bus.stop()
+    await manager.close_all()
+    await dispose_engines()
+    await loop_monitor.stop()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -58,27 +195,51 @@ app.include_router(insurance.router, prefix="/api/insurance", tags=["Insurance"]
 app.include_router(staff.router, prefix="/api/staff", tags=["Staff"])
 app.include_router(pharmaceutical.router, prefix="/api/pharmaceutical", tags=["Pharmaceutical"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(surveillance.router, prefix="/api/surveillance", tags=["Surveillance"])
 
 # WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+manager = ConnectionManager(
+    queue_size=int(os.getenv("MEDISURGE_WS_QUEUE_SIZE", "100")),
+    slow_consumer_policy=os.getenv("MEDISURGE_WS_SLOW_CONSUMER_POLICY", "drop_oldest"),
+    send_timeout=float(os.getenv("MEDISURGE_WS_SEND_TIMEOUT", "5"))
+)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# Watches for callbacks that hold the event loop
+loop_monitor = LoopLagMonitor(
+    block_threshold=float(os.getenv("MEDISURGE_LOOP_BLOCK_THRESHOLD", "0.25"))
+)
 
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
+# Gauges read at scrape time
+registry.gauge("medisurge_ws_connections", "Open WebSocket connections",
+               lambda: manager.get_stats()["connections"])
+registry.gauge("medisurge_ws_queued_messages", "Messages waiting in WebSocket send queues",
+               lambda: manager.get_stats()["queued_messages"])
+registry.gauge("medisurge_ws_dropped_messages", "WebSocket messages dropped for slow consumers",
+               lambda: manager.get_stats()["dropped_messages"])
+registry.gauge("medisurge_persistence_pending_rows", "Rows waiting in the write-behind queue",
+               lambda: persistence.pending_rows if persistence else 0)
+registry.gauge("medisurge_prediction_gate_hit_rate", "Share of prediction-eligible scans that reused the last prediction",
+               lambda: orchestrator.prediction_gate.hit_rate if orchestrator else 0)
+registry.gauge("medisurge_uptime_seconds", "Seconds since the process started",
+               lambda: round(time.time() - registry.started, 1))
 
-manager = ConnectionManager()
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe request latency per route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        registry.http_requests.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=status
+        )
 
 @app.get("/")
 async def root():
@@ -89,36 +250,78 @@ async def root():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text-format metrics"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint reporting loop lag, agent and storage degradation"""
+    loop = loop_monitor.get_stats()
+    system = orchestrator.get_system_status() if orchestrator else None
+    election = getattr(app.state, "election", None)
+    storage = persistence.get_stats() if persistence else None
+    
+    problems = []
+    if loop["status"] != "healthy":
+        problems.append("event_loop")
+    if system and any(status != "active" for status in system["agents"].values()):
+        problems.append("agents")
+    # Only recent write failures count: one bad batch shouldn't degrade the worker for good
+    if storage and (persistence.failed_within(HEALTH_FAILURE_WINDOW)
+                    or storage["pending"] >= persistence.max_pending_rows):
+        problems.append("persistence")
+    
     return {
-        "status": "healthy",
+        "status": "degraded" if problems else "healthy",
+        "problems": problems,
+        "leader": election.is_leader if election else False,
+        "event_loop": loop,
         "agents": {
-            "orchestrator": "active",
-            "surveillance": "active",
-            "prediction": "active",
-            "resource": "active",
-            "communication": "active",
-            "insurance": "active",
-            "reverse911": "active",
-            "pharmaceutical": "active"
-        }
+            "orchestrator": system["orchestrator"],
+            **system["agents"]
+        } if system else {},
+        "persistence": storage
     }
 
 @app.websocket("/ws/updates")
 async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket endpoint for real-time updates"""
+    """
+    WebSocket endpoint for real-time updates.
+    Clients send {"action": "subscribe" | "unsubscribe" | "resync", "topics": [...]}
+    with topics such as "agent:prediction" or "city:mumbai", then receive a
+    full "snapshot" per topic followed by "delta" messages with changed fields.
+    """
     await manager.connect(websocket)
     try:
         while True:
             data = await websocket.receive_text()
-            # Echo back for now
-            await manager.broadcast({
-                "type": "update",
-                "message": f"Received: {data}"
-            })
+            try:
+                request = json.loads(data)
+                action = request.get("action")
+                topics = request.get("topics", [])
+                if not isinstance(topics, list):
+                    topics = []
+            except (ValueError, AttributeError):
+                action, topics = None, []
+
+            if action == "subscribe":
+                accepted = manager.subscribe(websocket, topics)
+                await manager.send(websocket, {"type": "subscribed", "topics": accepted})
+            elif action == "unsubscribe":
+                removed = manager.unsubscribe(websocket, topics)
+                await manager.send(websocket, {"type": "unsubscribed", "topics": removed})
+            elif action == "resync":
+                manager.resync(websocket, topics)
+            else:
+                await manager.send(websocket, {
+                    "type": "error",
+                    "message": "Expected {\"action\": \"subscribe\", \"topics\": [...]}"
+                })
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 if __name__ == "__main__":
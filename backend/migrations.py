@@ -0,0 +1,57 @@
+"""
+Lightweight schema migrations for MediSurge AI
+Applied in order from init_db and recorded in the schema_migrations table.
+create_all only builds missing tables, so changes to existing tables
+(like new indexes) are shipped as migrations here.
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database import Base
+
+
+def _create_model_indexes(conn: Connection, tables: List[str]):
+    """Create every index declared on the given models that doesn't exist yet"""
+    for name in tables:
+        for index in Base.metadata.tables[name].indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _add_time_range_indexes(conn: Connection):
+    _create_model_indexes(conn, [
+        "surveillance_data", "predictions", "resources", "insurance_preauth",
+        "retired_staff", "staff_activations", "pharmaceutical_alerts",
+        "communication_logs", "agent_logs"
+    ])
+
+
+# (version, description, migration) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Indexes for time-range, pagination and leaderboard queries", _add_time_range_indexes),
+]
+
+
+def run_migrations(conn: Connection) -> List[int]:
+    """Apply pending migrations inside the caller's transaction"""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR, applied_at TIMESTAMP)"
+    ))
+    applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+    newly_applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        migrate(conn)
+        conn.execute(
+            text("INSERT INTO schema_migrations (version, description, applied_at) "
+                 "VALUES (:version, :description, :applied_at)"),
+            {"version": version, "description": description, "applied_at": datetime.utcnow()}
+        )
+        newly_applied.append(version)
+    return newly_applied
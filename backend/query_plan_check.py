@@ -0,0 +1,111 @@
+"""
+Query Plan Check - fails if any route query regresses to a full table scan
+Calls every GET route in-process, captures the SQL it runs and inspects
+SQLite's EXPLAIN QUERY PLAN output.
+
+Usage (from the backend directory):
+    python query_plan_check.py
+"""
+
+import asyncio
+import os
+import re
+import sys
+from datetime import datetime
+from typing import List, Tuple
+
+os.environ.setdefault("MEDISURGE_MONITORING", "0")
+
+import httpx
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+
+from database import Base, dispose_engines, read_engine as engine
+from main import app
+from utils.pagination import encode_cursor
+
+# Tables a route intentionally reads in full
+FULL_SCAN_ALLOWED = {"pharmaceutical_inventory"}
+
+# Variants of paginated routes that take other query paths
+EXTRA_REQUESTS = [
+    "/api/agents/logs?include_total=true&cursor={cursor}",
+    "/api/predictions/history?include_total=true&cursor={cursor}",
+    "/api/staff/activations?include_total=true&cursor={cursor}",
+    "/api/agents/activity?bucket=day",
+]
+
+SCAN_PATTERN = re.compile(r"^SCAN (\w+)(.*)$")
+
+
+def _route_paths() -> List[str]:
+    """Every GET route, with path parameters filled in"""
+    paths = []
+    for route in app.routes:
+        if isinstance(route, APIRoute) and "GET" in route.methods:
+            paths.append(re.sub(r"\{[^}]+\}", "1", route.path))
+    cursor = encode_cursor(datetime.utcnow(), 2 ** 31)
+    return paths + [path.format(cursor=cursor) for path in EXTRA_REQUESTS]
+
+
+async def _capture_route_queries() -> List[Tuple[str, str, tuple]]:
+    """Call each route and record the SELECT statements it executes"""
+    captured = []
+    current_path = [None]
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((current_path[0], statement, parameters))
+
+    async with app.router.lifespan_context(app):
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+                for path in _route_paths():
+                    current_path[0] = path
+                    await client.get(path)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    return captured
+
+
+async def check_query_plans() -> List[str]:
+    """Return a description of every route query that does a full table scan"""
+    if engine.dialect.name != "sqlite":
+        print(f"⚠️ Query plan check only supports SQLite, not {engine.dialect.name}")
+        return []
+
+    tables = set(Base.metadata.tables)
+    queries = await _capture_route_queries()
+    problems = []
+
+    async with engine.connect() as conn:
+        for path, statement, parameters in queries:
+            plan = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+            for row in plan:
+                detail = row[-1]
+                match = SCAN_PATTERN.match(detail)
+                if not match:
+                    continue
+                table, rest = match.groups()
+                if table in tables and table not in FULL_SCAN_ALLOWED and "USING" not in rest:
+                    problems.append(f"{path}: {detail}\n    {' '.join(statement.split())}")
+    await dispose_engines()
+    return problems
+
+
+def main() -> int:
+    problems = asyncio.run(check_query_plans())
+    if problems:
+        print(f"❌ {len(problems)} route quer{'y' if len(problems) == 1 else 'ies'} "
+              f"fall back to a full table scan:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return 1
+    print("✅ All route queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Replay - Accelerated backtest of the orchestrator pipeline
+Pushes recorded SurveillanceData rows, a JSONL recording, or a simulated
+stretch of live monitoring through surveillance -> prediction -> response
+on a virtual clock, then reports throughput, per-stage latency and the
+decisions the agents took.
+
+Usage (from the backend directory):
+    python replay.py --db [--since 2024-10-01] [--until 2024-11-01] [--limit 5000]
+    python replay.py --jsonl readings.jsonl
+    python replay.py --simulate-days 30 --seed 7
+Add --decisions out.jsonl to keep every decision and --json for a
+machine-readable report.
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+os.environ.setdefault("MEDISURGE_MONITORING", "0")
+
+from sqlalchemy import select
+
+from database import ReadSessionLocal, SurveillanceData, dispose_engines, init_db
+from services.orchestrator_agent import OrchestratorAgent
+from utils.clock import VirtualClock, virtual_time
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# (region id or None for the default region, reading)
+ReplayEvent = Tuple[Optional[str], Dict]
+
+
+def _parse_time(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace("Z", ""))
+
+
+async def db_readings(since: datetime = None, until: datetime = None,
+                      limit: int = None) -> AsyncIterator[ReplayEvent]:
+    """Recorded surveillance rows, oldest first"""
+    query = select(SurveillanceData).order_by(SurveillanceData.timestamp, SurveillanceData.id)
+    if since:
+        query = query.where(SurveillanceData.timestamp >= since)
+    if until:
+        query = query.where(SurveillanceData.timestamp < until)
+    if limit:
+        query = query.limit(limit)
+
+    async with ReadSessionLocal() as db:
+        for row in (await db.execute(query)).scalars():
+            yield None, {
+                "timestamp": row.timestamp,
+                "aqi": row.aqi,
+                "temperature": row.temperature,
+                "humidity": row.humidity,
+                "events": row.events,
+                "social_sentiment": row.social_sentiment,
+                "admission_patterns": row.admission_patterns
+            }
+
+
+def jsonl_readings(path: str) -> Iterable[ReplayEvent]:
+    """One reading per line, with an optional "region" field"""
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            reading = json.loads(line)
+            reading["timestamp"] = _parse_time(reading["timestamp"])
+            yield reading.pop("region", None), reading
+
+
+def _percentiles(samples: List[float]) -> Dict:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 2)
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95),
+            "p99_ms": pick(0.99), "max_ms": round(ordered[-1] * 1000, 2)}
+
+
+class ReplayHarness:
+    """
+    Drives an orchestrator on a virtual clock and records what it did
+    """
+
+    def __init__(self, orchestrator: OrchestratorAgent, clock: VirtualClock):
+        self.orchestrator = orchestrator
+        self.clock = clock
+        self.default_region = next(iter(orchestrator.regions.values()))
+        self.latencies: Dict[str, List[float]] = {}
+        self.decisions: List[Dict] = []
+        self.errors = 0
+        self.wall_seconds = 0.0
+        self.started_at: Optional[datetime] = None
+
+    def _record_span(self, name: str, seconds: float, outcome: str):
+        self.latencies.setdefault(name, []).append(seconds)
+
+    async def _scan(self, region, reading: Dict = None):
+        try:
+            decision = await self.orchestrator.scan_region(region, reading)
+        except Exception as e:
+            self.errors += 1
+            region.errors += 1
+            logger.error(f"❌ Replay scan failed for {region.region_id} at {self.clock.now()}: {e}")
+            return None
+        self.decisions.append({"timestamp": self.clock.now().isoformat(), "region": region.region_id, **decision})
+        return decision
+
+    async def _timed(self, coro):
+        registry.span_sinks.append(self._record_span)
+        start = time.perf_counter()
+        try:
+            with virtual_time(self.clock):
+                await coro
+        finally:
+            self.wall_seconds += time.perf_counter() - start
+            registry.span_sinks.remove(self._record_span)
+
+    async def replay(self, events):
+        """Score recorded readings in order, jumping the clock to each one"""
+        async def run():
+            async for region_id, reading in _aiter(events):
+                region = self.orchestrator.regions.get(region_id) or self.default_region
+                self.clock.advance_to(reading["timestamp"])
+                if self.started_at is None:
+                    self.started_at = self.clock.now()
+                await self._scan(region, reading)
+        await self._timed(run())
+
+    async def simulate(self, duration: timedelta):
+        """
+        Run the live monitoring loop for `duration` of virtual time: every
+        region polls its sources and the adaptive scheduler's delays advance
+        the clock instead of sleeping
+        """
+        async def run():
+            self.started_at = self.clock.now()
+            end = self.started_at + duration
+            due = [(self.started_at, region_id) for region_id in self.orchestrator.regions]
+            heapq.heapify(due)
+            while due:
+                at, region_id = heapq.heappop(due)
+                if at >= end:
+                    continue
+                self.clock.advance_to(at)
+                region = self.orchestrator.regions[region_id]
+                decision = await self._scan(region)
+                delay = (region.scheduler.next_delay(decision["threat_level"]) if decision
+                         else region.scheduler.error_delay())
+                heapq.heappush(due, (at + timedelta(seconds=delay), region_id))
+        await self._timed(run())
+
+    def report(self) -> Dict:
+        events = len(self.decisions) + self.errors
+        virtual_seconds = (self.clock.now() - self.started_at).total_seconds() if self.started_at else 0.0
+        stages = {name: _percentiles(samples) for name, samples in sorted(self.latencies.items())}
+        return {
+            "events": events,
+            "errors": self.errors,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "events_per_sec": round(events / self.wall_seconds, 1) if self.wall_seconds else 0.0,
+            "virtual_hours": round(virtual_seconds / 3600, 2),
+            "speedup": round(virtual_seconds / self.wall_seconds) if self.wall_seconds else 0,
+            "stage_latency": {name.split(".", 1)[1]: stats for name, stats in stages.items()
+                              if name.startswith("orchestrator.")},
+            "agent_latency": {name: stats for name, stats in stages.items()
+                              if not name.startswith("orchestrator.")},
+            "decisions": {
+                "threat_levels": dict(Counter(d["threat_level"] for d in self.decisions)),
+                "alert_levels": dict(Counter(d["alert_level"] for d in self.decisions if d["alert_level"])),
+                "responses": dict(Counter(d["response"] for d in self.decisions if d["response"])),
+                "predictions_reused": sum(1 for d in self.decisions if d.get("prediction_reused"))
+            },
+            "response_tracker": self.orchestrator.response_tracker.get_stats(),
+            "regions": {region_id: {key: region.get_stats()[key] for key in ("scans", "predictions", "responses", "errors")}
+                        for region_id, region in self.orchestrator.regions.items()}
+        }
+
+
+async def _aiter(events):
+    if hasattr(events, "__aiter__"):
+        async for event in events:
+            yield event
+    else:
+        for event in events:
+            yield event
+
+
+def _print_report(report: Dict):
+    print(f"▶️  Replayed {report['events']} events ({report['virtual_hours']}h of virtual time) "
+          f"in {report['wall_seconds']}s: {report['events_per_sec']} events/sec, {report['speedup']}x real time")
+    if report["errors"]:
+        print(f"❌ {report['errors']} scans failed")
+    for title, section in (("Stage latency", report["stage_latency"]), ("Agent latency", report["agent_latency"])):
+        print(f"\n{title}:")
+        for name, stats in section.items():
+            print(f"  {name:<32} n={stats['count']:<6} p50 {stats['p50_ms']:>8}ms  p95 {stats['p95_ms']:>8}ms  "
+                  f"p99 {stats['p99_ms']:>8}ms  max {stats['max_ms']:>8}ms")
+    print("\nDecisions:")
+    for name, counts in report["decisions"].items():
+        print(f"  {name:<18} {json.dumps(counts, sort_keys=True)}")
+    tracker = report["response_tracker"]
+    print(f"  {'suppressed':<18} {tracker.get('advisories_suppressed', 0)} repeat advisories")
+
+
+async def run_replay(args) -> Dict:
+    orchestrator = OrchestratorAgent(seed=args.seed)
+    if args.simulate_days:
+        start = _parse_time(args.since) if args.since else datetime.utcnow().replace(microsecond=0)
+        harness = ReplayHarness(orchestrator, VirtualClock(start))
+        await harness.simulate(timedelta(days=args.simulate_days))
+    else:
+        events = (jsonl_readings(args.jsonl) if args.jsonl else
+                  db_readings(_parse_time(args.since) if args.since else None,
+                              _parse_time(args.until) if args.until else None, args.limit))
+        harness = ReplayHarness(orchestrator, VirtualClock(datetime.min))
+        try:
+            if args.db:
+                await init_db()
+            await harness.replay(events)
+        finally:
+            await dispose_engines()
+    await orchestrator.surveillance.sources.close()
+
+    if args.decisions:
+        with open(args.decisions, "w") as f:
+            for decision in harness.decisions:
+                f.write(json.dumps(decision) + "\n")
+    return harness.report()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Backtest the orchestrator pipeline on a virtual clock")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", action="store_true", help="replay SurveillanceData rows")
+    source.add_argument("--jsonl", help="replay a recorded JSONL stream")
+    source.add_argument("--simulate-days", type=float, help="simulate this many days of live monitoring")
+    parser.add_argument("--since", help="first timestamp to replay (or simulation start)")
+    parser.add_argument("--until", help="replay rows before this timestamp")
+    parser.add_argument("--limit", type=int, help="replay at most this many rows")
+    parser.add_argument("--seed", type=int, default=0, help="simulation seed for the agents (default 0)")
+    parser.add_argument("--decisions", help="write every decision to this JSONL file")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="keep the agents' per-scan logging")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    report = asyncio.run(run_replay(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,35 +2,104 @@
 Agent status and control routes
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, AgentLog
+from services.regions import region_slug
+from utils.metrics import registry
+from utils.pagination import paginate
 from datetime import datetime, timedelta
+from typing import Optional
+import time
 
 router = APIRouter()
 
 @router.get("/status")
-async def get_agents_status():
-    """Get status of all agents"""
+async def get_agents_status(request: Request):
+    """Get status of all agents, as measured on this worker"""
+    orchestrator = request.app.state.orchestrator
+    health = orchestrator.supervisor.get_stats()
+    regions = [region.get_stats() for region in orchestrator.regions.values()]
+    scanned = [region["last_scan"] for region in regions if region["last_scan"]]
+    running = "active" if orchestrator.monitoring_active else "idle"
+    
     return {
         "agents": {
-            "orchestrator": {"status": "active", "uptime": "24/7"},
-            "surveillance": {"status": "monitoring", "last_scan": datetime.utcnow().isoformat()},
-            "prediction": {"status": "active", "accuracy": "87%"},
-            "resource": {"status": "active", "calculations": "real-time"},
-            "communication": {"status": "active", "channels": 4},
-            "insurance": {"status": "active", "approval_rate": "87%"},
-            "reverse911": {"status": "active", "staff_pool": 50},
-            "pharmaceutical": {"status": "active", "partners": 5}
+            "orchestrator": {
+                "status": running,
+                "uptime_seconds": round(time.time() - registry.started)
+            },
+            "surveillance": {
+                **health["surveillance"],
+                "last_scan": max(scanned) if scanned else None,
+                "scans": sum(region["scans"] for region in regions)
+            },
+            "prediction": {
+                "status": running,
+                "predictions": sum(region["predictions"] for region in regions),
+                "predictions_reused": sum(region["predictions_reused"] for region in regions)
+            },
+            **{name: stats for name, stats in health.items() if name != "surveillance"}
+        },
+        "performance": _agent_performance(),
+        "system_health": "degraded" if orchestrator.supervisor.degraded() else "operational",
+        "last_updated": datetime.utcnow().isoformat()
+    }
+
+def _agent_performance() -> dict:
+    """Call counts and p95 latency per traced span on this worker"""
+    spans = sorted({dict(key)["span"] for key in registry.spans.series})
+    return {
+        name: {
+            "calls": registry.spans.count(span=name),
+            "errors": registry.spans.count(span=name, outcome="error"),
+            "p95_ms": round(registry.spans.quantile(0.95, span=name) * 1000, 1)
+        }
+        for name in spans
+    }
+
+@router.post("/scan")
+async def trigger_scan(
+    request: Request,
+    reason: str = Query("manual", max_length=100),
+    region: Optional[str] = Query(None, max_length=100)
+):
+    """Ask the monitoring loop to scan one region (or all regions) right away"""
+    # Every worker monitors the same regions, so any of them can validate
+    if region is not None and region_slug(region) not in request.app.state.regions:
+        raise HTTPException(status_code=404, detail=f"Unknown region '{region}'")
+    await request.app.state.bus.publish("scan_request", {"reason": reason, "region": region})
+    return {
+        "status": "requested",
+        "reason": reason,
+        "region": region,
+        "requested_at": datetime.utcnow().isoformat()
+    }
+
+@router.get("/regions")
+async def get_regions(request: Request):
+    """Latest state and pipeline metrics for every monitored region"""
+    snapshots = request.app.state.manager.snapshots
+    return {
+        "regions": {
+            topic.split(":", 1)[1]: snapshot
+            for topic, snapshot in snapshots.items()
+            if topic.startswith("city:")
         },
-        "system_health": "operational",
         "last_updated": datetime.utcnow().isoformat()
     }
 
 @router.get("/logs")
-async def get_agent_logs(limit: int = 50, db: Session = Depends(get_db)):
-    """Get recent agent activity logs"""
-    logs = db.query(AgentLog).order_by(AgentLog.timestamp.desc()).limit(limit).all()
+async def get_agent_logs(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get agent activity logs, newest first, one keyset page at a time"""
+    page = await paginate(db, AgentLog, cursor=cursor, limit=limit, include_total=include_total)
+    logs = page["items"]
     
     return {
         "logs": [
@@ -43,31 +112,100 @@ async def get_agent_logs(limit: int = 50, db: Session = Depends(get_db)):
                 "execution_time": log.execution_time
             }
             for log in logs
-        ]
+        ],
+        "next_cursor": page["next_cursor"],
+        "total": page["total"]
     }
 
 @router.get("/activity")
-async def get_agent_activity(hours: int = 24, db: Session = Depends(get_db)):
-    """Get agent activity summary"""
+async def get_agent_activity(
+    hours: int = 24,
+    bucket: str = Query("hour", pattern="^(hour|day)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get agent activity summary, aggregated in the database"""
     since = datetime.utcnow() - timedelta(hours=hours)
-    logs = db.query(AgentLog).filter(AgentLog.timestamp >= since).all()
+    in_window = AgentLog.timestamp >= since
+    
+    # Success/failure counts per agent
+    counts = await db.execute(
+        select(AgentLog.agent_name, AgentLog.status, func.count())
+        .where(in_window)
+        .group_by(AgentLog.agent_name, AgentLog.status)
+    )
     
-    # Group by agent
     activity = {}
-    for log in logs:
-        if log.agent_name not in activity:
-            activity[log.agent_name] = {
-                "total_actions": 0,
-                "successful": 0,
-                "failed": 0
-            }
-        activity[log.agent_name]["total_actions"] += 1
-        if log.status == "success":
-            activity[log.agent_name]["successful"] += 1
+    for agent_name, status, count in counts:
+        summary = activity.setdefault(agent_name, {
+            "total_actions": 0,
+            "successful": 0,
+            "failed": 0
+        })
+        summary["total_actions"] += count
+        if status == "success":
+            summary["successful"] += count
         else:
-            activity[log.agent_name]["failed"] += 1
+            summary["failed"] += count
+    
+    # Nearest-rank execution time percentiles per agent
+    ranked = (
+        select(
+            AgentLog.agent_name,
+            AgentLog.execution_time,
+            func.row_number().over(
+                partition_by=AgentLog.agent_name, order_by=AgentLog.execution_time
+            ).label("rank"),
+            func.count().over(partition_by=AgentLog.agent_name).label("total")
+        )
+        .where(in_window, AgentLog.execution_time.isnot(None))
+        .subquery()
+    )
+    
+    def percentile(pct: int):
+        # ceil(total * pct / 100) with integer arithmetic
+        target = (ranked.c.total * pct + 99) // 100
+        return func.max(case((ranked.c.rank == target, ranked.c.execution_time)))
+    
+    timings = await db.execute(
+        select(
+            ranked.c.agent_name,
+            percentile(50),
+            percentile(95),
+            func.max(ranked.c.execution_time)
+        ).group_by(ranked.c.agent_name)
+    )
+    for agent_name, p50, p95, slowest in timings:
+        activity.setdefault(agent_name, {})["execution_time"] = {
+            "p50": p50,
+            "p95": p95,
+            "max": slowest
+        }
+    
+    # Time-bucketed action counts per agent
+    bucket_start = _bucket_expression(db.bind.dialect.name, AgentLog.timestamp, bucket)
+    buckets = await db.execute(
+        select(AgentLog.agent_name, bucket_start.label("bucket"), func.count())
+        .where(in_window)
+        .group_by(AgentLog.agent_name, "bucket")
+        .order_by("bucket")
+    )
+    timeline = {}
+    for agent_name, bucket_value, count in buckets:
+        timeline.setdefault(agent_name, []).append({
+            "bucket": bucket_value.isoformat() if hasattr(bucket_value, "isoformat") else bucket_value,
+            "count": count
+        })
     
     return {
         "period_hours": hours,
-        "activity": activity
+        "bucket": bucket,
+        "activity": activity,
+        "timeline": timeline
     }
+
+def _bucket_expression(dialect: str, column, bucket: str):
+    """SQL expression truncating a timestamp to the start of its hour or day"""
+    if dialect == "postgresql":
+        return func.date_trunc(bucket, column)
+    fmt = "%Y-%m-%dT%H:00:00" if bucket == "hour" else "%Y-%m-%dT00:00:00"
+    return func.strftime(fmt, column)
@@ -2,15 +2,17 @@
 Dashboard summary routes
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter
+from utils.cache import response_cache
+from utils.metrics import registry
 from datetime import datetime, timedelta
 import random
+import time
 
 router = APIRouter()
 
 @router.get("/summary")
+@response_cache.cached("dashboard.summary", ttl=10)
 async def get_dashboard_summary():
     """Get comprehensive dashboard summary"""
     return {
@@ -64,39 +66,33 @@ async def get_dashboard_summary():
     }
 
 @router.get("/metrics")
+@response_cache.cached("dashboard.metrics", ttl=30)
 async def get_system_metrics():
-    """Get detailed system metrics"""
+    """Get system metrics measured on this worker since it started"""
+    uptime = int(time.time() - registry.started)
+    agent_calls = registry.spans.count()
+    responses = registry.spans.count(span="orchestrator.response", outcome="ok")
     return {
         "performance": {
-            "prediction_accuracy": 87.3,
-            "average_response_time": "3.2 hours",
-            "system_uptime": "99.8%",
-            "agent_success_rate": 94.5
-        },
-        
-        "capacity": {
-            "max_patients_handleable": 500,
-            "current_capacity_usage": random.uniform(40, 70),
-            "staff_availability": random.uniform(75, 95),
-            "equipment_utilization": random.uniform(50, 75)
-        },
-        
-        "financial": {
-            "total_budget": 500000,
-            "allocated": random.uniform(200000, 300000),
-            "insurance_covered": random.uniform(180000, 250000),
-            "out_of_pocket_reduced": random.uniform(60, 80)
-        },
-        
-        "impact": {
-            "lives_protected": random.randint(800, 1200),
-            "emergency_visits_prevented": random.randint(200, 400),
-            "wait_time_reduction": random.uniform(50, 70),
-            "stockouts_prevented": random.randint(5, 12)
+            "system_uptime": f"{uptime // 3600}h {uptime % 3600 // 60}m",
+            "uptime_seconds": uptime,
+            "agent_calls": agent_calls,
+            "agent_success_rate": round(
+                registry.spans.count(outcome="ok") / agent_calls * 100, 1
+            ) if agent_calls else None,
+            "responses_coordinated": responses,
+            "average_response_ms": round(
+                registry.spans.total(span="orchestrator.response", outcome="ok") / responses * 1000, 1
+            ) if responses else None,
+            "p95_response_ms": round(
+                registry.spans.quantile(0.95, span="orchestrator.response", outcome="ok") * 1000, 1
+            ) if responses else None,
+            "p95_request_latency_ms": round(registry.http_requests.quantile(0.95) * 1000, 1)
         }
     }
 
 @router.get("/timeline")
+@response_cache.cached("dashboard.timeline", ttl=30)
 async def get_crisis_timeline():
     """Get crisis response timeline"""
     base_time = datetime.utcnow() - timedelta(hours=5)
@@ -158,6 +154,7 @@ async def get_crisis_timeline():
     }
 
 @router.get("/agent-coordination")
+@response_cache.cached("dashboard.agent_coordination", ttl=10)
 async def get_agent_coordination():
     """Get agent coordination status"""
     return {
@@ -181,3 +178,8 @@ async def get_agent_coordination():
         
         "coordination_efficiency": random.uniform(92, 98)
     }
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """Get response cache hit/miss statistics"""
+    return response_cache.get_stats()
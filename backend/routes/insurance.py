@@ -3,19 +3,22 @@ Insurance pre-authorization routes
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, InsurancePreAuth
+from utils.cache import response_cache
 from datetime import datetime
 import random
 
 router = APIRouter()
 
 @router.get("/status")
-async def get_insurance_status(db: Session = Depends(get_db)):
+async def get_insurance_status(db: AsyncSession = Depends(get_db)):
     """Get insurance pre-authorization status"""
-    recent = db.query(InsurancePreAuth).order_by(
-        InsurancePreAuth.timestamp.desc()
-    ).limit(10).all()
+    result = await db.execute(
+        select(InsurancePreAuth).order_by(InsurancePreAuth.timestamp.desc()).limit(10)
+    )
+    recent = result.scalars().all()
     
     if not recent:
         recent = [_generate_dummy_insurance() for _ in range(3)]
@@ -41,6 +44,7 @@ async def get_insurance_status(db: Session = Depends(get_db)):
     }
 
 @router.get("/providers")
+@response_cache.cached("insurance.providers", ttl=3600, tags=())
 async def get_insurance_providers():
     """Get insurance provider statistics"""
     providers = [
@@ -54,6 +58,7 @@ async def get_insurance_providers():
     return {"providers": providers}
 
 @router.get("/treatments")
+@response_cache.cached("insurance.treatments", ttl=3600, tags=())
 async def get_treatment_coverage():
     """Get treatment coverage information"""
     treatments = [
@@ -3,17 +3,20 @@ Pharmaceutical and supply chain routes
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, PharmaceuticalInventory, PharmaceuticalAlert
+from utils.cache import response_cache
 from datetime import datetime, timedelta
 import random
 
 router = APIRouter()
 
 @router.get("/inventory")
-async def get_inventory_status(db: Session = Depends(get_db)):
+async def get_inventory_status(db: AsyncSession = Depends(get_db)):
     """Get pharmaceutical inventory status"""
-    inventory = db.query(PharmaceuticalInventory).all()
+    result = await db.execute(select(PharmaceuticalInventory))
+    inventory = result.scalars().all()
     
     if not inventory:
         inventory = _generate_dummy_inventory()
@@ -38,11 +41,12 @@ async def get_inventory_status(db: Session = Depends(get_db)):
     }
 
 @router.get("/alerts")
-async def get_pharmaceutical_alerts(db: Session = Depends(get_db)):
+async def get_pharmaceutical_alerts(db: AsyncSession = Depends(get_db)):
     """Get pharmaceutical supply alerts"""
-    alerts = db.query(PharmaceuticalAlert).order_by(
-        PharmaceuticalAlert.timestamp.desc()
-    ).limit(10).all()
+    result = await db.execute(
+        select(PharmaceuticalAlert).order_by(PharmaceuticalAlert.timestamp.desc()).limit(10)
+    )
+    alerts = result.scalars().all()
     
     if not alerts:
         alerts = _generate_dummy_alerts()
@@ -65,6 +69,7 @@ async def get_pharmaceutical_alerts(db: Session = Depends(get_db)):
     }
 
 @router.get("/partners")
+@response_cache.cached("pharmaceutical.partners", ttl=3600, tags=())
 async def get_partner_companies():
     """Get pharmaceutical partner companies"""
     partners = [
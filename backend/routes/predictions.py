@@ -2,23 +2,29 @@
 Prediction routes
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, Prediction
+from utils.pagination import paginate
 from datetime import datetime, timedelta
+from typing import Optional
 import random
 
 router = APIRouter()
 
 @router.get("/current")
-async def get_current_predictions(db: Session = Depends(get_db)):
+async def get_current_predictions(db: AsyncSession = Depends(get_db)):
     """Get active predictions"""
     # Get predictions for next 7 days
     future_date = datetime.utcnow() + timedelta(days=7)
-    predictions = db.query(Prediction).filter(
-        Prediction.surge_date >= datetime.utcnow(),
-        Prediction.surge_date <= future_date
-    ).order_by(Prediction.surge_date).all()
+    result = await db.execute(
+        select(Prediction).where(
+            Prediction.surge_date >= datetime.utcnow(),
+            Prediction.surge_date <= future_date
+        ).order_by(Prediction.surge_date)
+    )
+    predictions = result.scalars().all()
     
     if not predictions:
         # Generate dummy prediction
@@ -41,27 +47,39 @@ async def get_current_predictions(db: Session = Depends(get_db)):
     }
 
 @router.get("/history")
-async def get_prediction_history(days: int = 30, db: Session = Depends(get_db)):
-    """Get historical predictions"""
+async def get_prediction_history(
+    days: int = 30,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get historical predictions, newest first. Pass the returned next_cursor
+    to fetch older pages; include_total adds the count for the whole window.
+    """
     since = datetime.utcnow() - timedelta(days=days)
-    predictions = db.query(Prediction).filter(
-        Prediction.timestamp >= since
-    ).order_by(Prediction.timestamp.desc()).all()
+    page = await paginate(
+        db, Prediction, [Prediction.timestamp >= since],
+        cursor=cursor, limit=limit, include_total=include_total
+    )
+    predictions = page["items"]
     
-    if not predictions:
+    if not predictions and not cursor:
         # Generate dummy history
         predictions = [_generate_dummy_prediction() for _ in range(5)]
     
     return {
         "period_days": days,
-        "total_predictions": len(predictions),
-        "predictions": predictions[:20]  # Limit to 20
+        "total_predictions": page["total"] if include_total else len(predictions),
+        "predictions": predictions,
+        "next_cursor": page["next_cursor"]
     }
 
 @router.get("/{prediction_id}")
-async def get_prediction_details(prediction_id: int, db: Session = Depends(get_db)):
+async def get_prediction_details(prediction_id: int, db: AsyncSession = Depends(get_db)):
     """Get detailed prediction information"""
-    prediction = db.query(Prediction).filter(Prediction.id == prediction_id).first()
+    prediction = await db.get(Prediction, prediction_id)
     
     if not prediction:
         prediction = _generate_dummy_prediction()
@@ -3,16 +3,21 @@ Resource allocation routes
 """
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, Resource
+from utils.cache import response_cache
 import random
 
 router = APIRouter()
 
 @router.get("/current")
-async def get_current_resources(db: Session = Depends(get_db)):
+async def get_current_resources(db: AsyncSession = Depends(get_db)):
     """Get current resource allocations"""
-    resources = db.query(Resource).order_by(Resource.timestamp.desc()).limit(5).all()
+    result = await db.execute(
+        select(Resource).order_by(Resource.timestamp.desc()).limit(5)
+    )
+    resources = result.scalars().all()
     
     if not resources:
         # Generate dummy resource allocation
@@ -34,6 +39,7 @@ async def get_current_resources(db: Session = Depends(get_db)):
     }
 
 @router.get("/summary")
+@response_cache.cached("resources.summary", ttl=30)
 async def get_resource_summary():
     """Get resource allocation summary"""
     return {
@@ -2,20 +2,26 @@
 Retired staff and Reverse 911 routes
 """
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db, RetiredStaff, StaffActivation
+from utils.pagination import paginate
 from datetime import datetime
+from typing import Optional
 import random
 
 router = APIRouter()
 
 @router.get("/available")
-async def get_available_staff(db: Session = Depends(get_db)):
+async def get_available_staff(db: AsyncSession = Depends(get_db)):
     """Get available retired staff"""
-    staff = db.query(RetiredStaff).filter(
-        RetiredStaff.availability == True
-    ).order_by(RetiredStaff.crisis_hero_score.desc()).limit(20).all()
+    result = await db.execute(
+        select(RetiredStaff).where(
+            RetiredStaff.availability == True
+        ).order_by(RetiredStaff.crisis_hero_score.desc()).limit(20)
+    )
+    staff = result.scalars().all()
     
     if not staff:
         staff = [_generate_dummy_staff() for _ in range(15)]
@@ -36,13 +42,19 @@ async def get_available_staff(db: Session = Depends(get_db)):
     }
 
 @router.get("/activations")
-async def get_staff_activations(db: Session = Depends(get_db)):
-    """Get recent staff activations"""
-    activations = db.query(StaffActivation).order_by(
-        StaffActivation.timestamp.desc()
-    ).limit(20).all()
+async def get_staff_activations(
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get staff activations, newest first, one keyset page at a time"""
+    page = await paginate(
+        db, StaffActivation, cursor=cursor, limit=limit, include_total=include_total
+    )
+    activations = page["items"]
     
-    if not activations:
+    if not activations and not cursor:
         activations = [_generate_dummy_activation() for _ in range(8)]
     
     # Calculate stats
@@ -50,7 +62,8 @@ async def get_staff_activations(db: Session = Depends(get_db)):
     pending = sum(1 for a in activations if (a.status if hasattr(a, 'status') else a.get('status')) == 'pending')
     
     return {
-        "total_activations": len(activations),
+        "total_activations": page["total"] if include_total else len(activations),
+        "next_cursor": page["next_cursor"],
         "confirmed": confirmed,
         "pending": pending,
         "response_rate": round((confirmed / len(activations) * 100), 1) if activations else 0,
@@ -68,11 +81,12 @@ async def get_staff_activations(db: Session = Depends(get_db)):
     }
 
 @router.get("/leaderboard")
-async def get_crisis_hero_leaderboard(db: Session = Depends(get_db)):
+async def get_crisis_hero_leaderboard(db: AsyncSession = Depends(get_db)):
     """Get Crisis Hero leaderboard"""
-    staff = db.query(RetiredStaff).order_by(
-        RetiredStaff.crisis_hero_score.desc()
-    ).limit(10).all()
+    result = await db.execute(
+        select(RetiredStaff).order_by(RetiredStaff.crisis_hero_score.desc()).limit(10)
+    )
+    staff = result.scalars().all()
     
     if not staff:
         staff = [_generate_dummy_staff() for _ in range(10)]
@@ -0,0 +1,91 @@
+"""
+Sensor ingestion routes
+"""
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from datetime import datetime
+from typing import Optional
+
+from services.ingestion import ndjson_batches
+from utils.timeseries import TREND_WINDOW
+
+router = APIRouter()
+
+@router.post("/ingest")
+async def ingest_readings(request: Request):
+    """
+    Bulk-ingest sensor readings as NDJSON, one reading per line:
+    {"station": "aqi-bandra-01", "ward": "mumbai", "aqi": 182.5, "temperature": 24.1,
+     "humidity": 61, "timestamp": "2024-11-02T06:15:00Z"}
+    The body is consumed as it streams in and slows down when the
+    aggregation queue is full.
+    """
+    pipeline = request.app.state.ingestion
+    counts = {"received": 0, "rejected": 0}
+    batches = 0
+    async for batch in ndjson_batches(request.stream(), pipeline, counts):
+        await pipeline.submit(batch)
+        batches += 1
+    return {
+        "received": counts["received"],
+        "queued": counts["received"] - counts["rejected"],
+        "rejected": counts["rejected"],
+        "batches": batches,
+        "ingested_at": datetime.utcnow().isoformat()
+    }
+
+@router.get("/windows")
+async def get_sensor_windows(request: Request, ward: Optional[str] = Query(None, max_length=100)):
+    """Sliding-window sensor aggregates per ward and the latest closed tumbling windows"""
+    pipeline = request.app.state.ingestion
+    if ward is not None:
+        window = pipeline.window(ward)
+        if window is None:
+            raise HTTPException(status_code=404, detail=f"No recent readings for ward '{ward}'")
+        return window
+
+    return {
+        "wards": {ward_id: pipeline.window(ward_id) for ward_id in pipeline.ward_ids()},
+        "recent_windows": [
+            {"ward": ward_id, "window_start": pane.bucket * pipeline.tumbling_seconds,
+             "readings": pane.readings, "metrics": pane.summary()}
+            for ward_id, pane in list(pipeline.recent_windows)[-20:]
+        ]
+    }
+
+@router.get("/ingest/stats")
+async def get_ingest_stats(request: Request):
+    """Ingestion throughput, rejects, late readings and queue depth"""
+    return request.app.state.ingestion.get_stats()
+
+@router.get("/threats")
+async def get_ward_threats(request: Request):
+    """Threat level of every ward with recent readings, scored in one batch"""
+    pipeline = request.app.state.ingestion
+    surveillance = request.app.state.surveillance
+    windows = [window for window in map(pipeline.window, pipeline.ward_ids())
+               if window is not None and "aqi" in window["metrics"]]
+    if not windows:
+        return {"wards": [], "scored_at": datetime.utcnow().isoformat()}
+
+    trends = [surveillance.history.stats(window["ward"], "aqi", TREND_WINDOW)
+              if surveillance.history is not None else None for window in windows]
+    scored = surveillance.score_batch({
+        "aqi": [window["metrics"]["aqi"]["mean"] for window in windows],
+        "temperature": [window["metrics"].get("temperature", {}).get("mean", float("inf")) for window in windows],
+        "aqi_slope_per_hour": [trend["slope_per_hour"] if trend else 0.0 for trend in trends],
+        "aqi_trend_points": [trend["count"] if trend else 0 for trend in trends]
+    })
+    return {
+        "wards": [
+            {"ward": window["ward"], "threat_level": str(level), "score": float(score),
+             "readings": window["readings"], "aqi": round(window["metrics"]["aqi"]["mean"], 2)}
+            for window, score, level in zip(windows, scored["score"], scored["level"])
+        ],
+        "scored_at": datetime.utcnow().isoformat()
+    }
+
+@router.get("/sources")
+async def get_source_stats(request: Request):
+    """Per-source cache hits, stale hits, timeouts and errors of the surveillance feeds"""
+    return request.app.state.surveillance.sources.get_stats()
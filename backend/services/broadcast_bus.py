@@ -0,0 +1,222 @@
+"""
+Broadcast Bus - Cross-worker pub/sub for real-time updates
+Lets every uvicorn worker's ConnectionManager see messages produced in any
+worker, and elects a single leader worker to run the orchestrator
+"""
+
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, single-worker deployments only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BusHandler = Callable[[str, Dict], Awaitable]
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class InMemoryBus:
+    """
+    Delivers messages to handlers in the same process
+    """
+
+    def __init__(self):
+        self.handlers: List[BusHandler] = []
+
+    def subscribe(self, handler: BusHandler):
+        self.handlers.append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, channel: str, message: Dict):
+        await self._dispatch(channel, message)
+
+    async def _dispatch(self, channel: str, message: Dict):
+        for handler in self.handlers:
+            try:
+                await handler(channel, message)
+            except Exception as e:
+                logger.error(f"❌ Bus handler failed on '{channel}': {e}")
+
+
+class UnixSocketBus(InMemoryBus):
+    """
+    Relays messages between workers on one host through a Unix socket broker.
+    The first worker to take the broker lock hosts the broker, every worker
+    (including that one) connects to it as a client. If the broker's worker
+    dies, the remaining workers reconnect and elect a new broker.
+    """
+
+    def __init__(self, path: str, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.path = path
+        self.reconnect_delay = reconnect_delay
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = asyncio.Event()
+        self.client_task: Optional[asyncio.Task] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.broker_lock = None
+        self.peers: List[asyncio.StreamWriter] = []
+
+    async def start(self):
+        self.client_task = asyncio.create_task(self._run_client())
+        try:
+            await asyncio.wait_for(self.connected.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Broadcast bus not connected to {self.path} yet, retrying in background")
+
+    async def stop(self):
+        if self.client_task:
+            self.client_task.cancel()
+        if self.writer:
+            self.writer.close()
+        if self.server:
+            self.server.close()
+            for peer in self.peers:
+                peer.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self.broker_lock:
+            self.broker_lock.close()
+
+    async def publish(self, channel: str, message: Dict):
+        line = json.dumps({"channel": channel, "message": message}, default=_json_default)
+        if self.writer is None or self.writer.is_closing():
+            # Broker unreachable: keep local clients up to date at least
+            await self._dispatch(channel, json.loads(line)["message"])
+            return
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+
+    async def _run_client(self):
+        """Connect to the broker (hosting it if nobody does) and read messages"""
+        while True:
+            try:
+                reader, self.writer = await asyncio.open_unix_connection(self.path, limit=2 ** 24)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await self._try_host_broker()
+                await asyncio.sleep(0 if self.server else self.reconnect_delay)
+                continue
+
+            self.connected.set()
+            logger.info(f"🔗 Broadcast bus connected to {self.path}")
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    envelope = json.loads(line)
+                    await self._dispatch(envelope["channel"], envelope["message"])
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"⚠️ Broadcast bus connection error: {e}")
+            finally:
+                self.connected.clear()
+                self.writer.close()
+                self.writer = None
+            logger.warning("⚠️ Broadcast bus disconnected, reconnecting...")
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _try_host_broker(self):
+        """Become the broker if no other worker holds the broker lock"""
+        if self.server is not None:
+            return
+        lock = try_lock_file(self.path + ".lock")
+        if lock is None:
+            return
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        self.broker_lock = lock
+        self.server = await asyncio.start_unix_server(self._serve_peer, self.path, limit=2 ** 24)
+        logger.info(f"📡 Hosting broadcast bus broker on {self.path}")
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Fan out every line a worker sends to all connected workers"""
+        self.peers.append(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for peer in list(self.peers):
+                    peer.write(line)
+                await asyncio.gather(
+                    *(peer.drain() for peer in list(self.peers)), return_exceptions=True
+                )
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.peers.remove(writer)
+            writer.close()
+
+
+class LeaderElection:
+    """
+    Elects exactly one leader among workers on a host using an exclusive
+    file lock. The lock is released when the leader exits (or crashes), at
+    which point another worker takes over on its next attempt.
+    """
+
+    def __init__(self, lock_path: str, retry_interval: float = 5.0):
+        self.lock_path = lock_path
+        self.retry_interval = retry_interval
+        self.lock_file = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock_file is not None
+
+    async def run(self, on_elected: Callable[[], Awaitable]):
+        """Keep trying to take leadership, then call on_elected once"""
+        while self.lock_file is None:
+            self.lock_file = try_lock_file(self.lock_path)
+            if self.lock_file is None:
+                await asyncio.sleep(self.retry_interval)
+        logger.info(f"👑 Worker {os.getpid()} elected leader")
+        await on_elected()
+
+    def release(self):
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+
+def try_lock_file(path: str):
+    """Take an exclusive non-blocking lock, returning the open file or None"""
+    lock_file = open(path, "a+")
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def create_bus(backend: str = None, path: str = None) -> InMemoryBus:
+    """Build the configured bus backend ("memory" or "unix")"""
+    backend = backend or os.getenv("MEDISURGE_BUS", "memory")
+    if backend == "memory":
+        return InMemoryBus()
+    if backend == "unix":
+        return UnixSocketBus(path or os.getenv("MEDISURGE_BUS_PATH", "/tmp/medisurge-bus.sock"))
+    raise ValueError(f"Unknown broadcast bus backend '{backend}', expected 'memory' or 'unix'")
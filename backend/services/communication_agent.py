@@ -8,6 +8,9 @@ from datetime import datetime
 from typing import Dict, List
 import logging
 
+from utils.clock import utcnow
+from utils.metrics import traced
+
 logger = logging.getLogger(__name__)
 
 class CommunicationAgent:
@@ -15,22 +18,25 @@ class CommunicationAgent:
     Creates and distributes health advisories
     """
     
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        # Injected RNG makes seeded simulation runs reproducible
+        self.rng = rng or random.Random()
         self.channels = ["SMS", "WhatsApp", "Email", "Social Media"]
         self.languages = ["English", "Hindi", "Marathi"]
         logger.info("📢 Communication Agent initialized")
     
+    @traced("communication.send_advisory")
     async def send_advisory(self, prediction: Dict) -> Dict:
         """Generate and send public health advisory"""
         
         condition = prediction.get("primary_condition", "Health Issue")
-        surge_date = prediction.get("surge_date", datetime.utcnow())
+        surge_date = prediction.get("surge_date", utcnow())
         
         # Generate advisory message
         advisory = self._generate_advisory(condition, surge_date)
         
         # Simulate distribution
-        recipients = random.randint(40000, 60000)
+        recipients = self.rng.randint(40000, 60000)
         
         # Multi-language distribution
         distributions = []
@@ -50,7 +56,7 @@ class CommunicationAgent:
             "channels_used": self.channels,
             "languages": self.languages,
             "distributions": distributions,
-            "timestamp": datetime.utcnow(),
+            "timestamp": utcnow(),
             "status": "sent"
         }
         
@@ -0,0 +1,311 @@
+"""
+Connection Manager - Real-time WebSocket fan-out
+Delivers each broadcast to every dashboard through bounded per-client queues
+and pushes per-topic deltas to subscribed clients
+"""
+
+import asyncio
+import json
+from typing import Dict, Iterable, List
+import logging
+
+from fastapi import WebSocket
+
+from utils.helpers import diff_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Agents clients can subscribe to as "agent:<name>"
+AGENT_TOPICS = (
+    "orchestrator", "surveillance", "prediction", "resource", "insurance",
+    "reverse911", "pharmaceutical", "communication"
+)
+
+# Scoped topics take a free-form id, e.g. "city:mumbai" or "hospital:lilavati"
+SCOPED_TOPIC_PREFIXES = ("city", "hospital")
+
+# What to do when a client's send queue is full
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+# "Try again later" close code sent to evicted slow consumers
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class ClientConnection:
+    """
+    A connected WebSocket with its own bounded send queue and sender task
+    """
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.sender_task: asyncio.Task = None
+        self.sent = 0
+        self.dropped = 0
+        self.topics = set()
+        # Topics whose latest snapshot this client is known to hold
+        self.synced = set()
+
+
+class ConnectionManager:
+    """
+    Fans messages out to WebSocket clients without letting one slow client
+    hold up the others
+    """
+
+    def __init__(self, queue_size: int = 100, slow_consumer_policy: str = "drop_oldest",
+                 send_timeout: float = 5.0):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(
+                f"Unknown slow consumer policy '{slow_consumer_policy}', "
+                f"expected one of {SLOW_CONSUMER_POLICIES}"
+            )
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.send_timeout = send_timeout
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        self.evicted = 0
+        self.dropped = 0
+        self.snapshots: Dict[str, Dict] = {}
+        self.sequences: Dict[str, int] = {}
+        self.bus = None
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        client = ClientConnection(websocket, self.queue_size)
+        client.sender_task = asyncio.create_task(self._sender(client))
+        self.clients[websocket] = client
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        if client.sender_task is not asyncio.current_task():
+            client.sender_task.cancel()
+
+    def attach_bus(self, bus):
+        """
+        Route broadcasts and topic updates through a cross-worker bus so
+        clients connected to any worker receive them
+        """
+        self.bus = bus
+        bus.subscribe(self._on_bus_message)
+
+    async def broadcast(self, message: dict):
+        """Send a message to every client on every worker"""
+        if self.bus is None:
+            return await self.broadcast_local(message)
+        await self.bus.publish("broadcast", message)
+
+    async def publish(self, topic: str, snapshot: dict):
+        """Publish a topic snapshot to subscribers on every worker"""
+        if self.bus is None:
+            return await self.publish_local(topic, snapshot)
+        await self.bus.publish("topic", {"topic": topic, "snapshot": snapshot})
+
+    async def broadcast_local(self, message: dict) -> int:
+        """Serialize once and queue for every client, returns clients reached"""
+        payload = json.dumps(message, default=_json_default)
+        delivered = 0
+        for client in list(self.clients.values()):
+            if self._enqueue(client, payload):
+                delivered += 1
+        return delivered
+
+    async def send(self, websocket: WebSocket, message: dict) -> bool:
+        """Queue a message for a single client"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return False
+        return self._enqueue(client, json.dumps(message, default=_json_default))
+
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Subscribe a client to topics and queue the current snapshot of each"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return []
+        accepted = []
+        for topic in topics:
+            if not is_valid_topic(topic):
+                continue
+            client.topics.add(topic)
+            client.synced.discard(topic)
+            accepted.append(topic)
+            if topic in self.snapshots:
+                self._send_snapshot(client, topic)
+        return accepted
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> List[str]:
+        """Remove topic subscriptions from a client"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return []
+        removed = [topic for topic in topics if topic in client.topics]
+        for topic in removed:
+            client.topics.discard(topic)
+            client.synced.discard(topic)
+        return removed
+
+    def resync(self, websocket: WebSocket, topics: Iterable[str] = None):
+        """Resend full snapshots, e.g. after a client notices a sequence gap"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        for topic in (topics or list(client.topics)):
+            if topic in client.topics:
+                client.synced.discard(topic)
+                if topic in self.snapshots:
+                    self._send_snapshot(client, topic)
+
+    async def publish_local(self, topic: str, snapshot: dict) -> int:
+        """
+        Record the latest snapshot for a topic and push it to subscribers.
+        Clients holding the previous snapshot get only the changed fields,
+        new or out-of-sync clients get the full snapshot.
+        """
+        # Normalise to plain JSON types so diffs compare what clients see
+        snapshot = json.loads(json.dumps(snapshot, default=_json_default))
+        previous = self.snapshots.get(topic)
+        if previous == snapshot:
+            return 0
+
+        changed, removed = diff_snapshots(previous or {}, snapshot)
+        seq = self.sequences.get(topic, 0) + 1
+        self.snapshots[topic] = snapshot
+        self.sequences[topic] = seq
+
+        delta_payload = None
+        delivered = 0
+        for client in list(self.clients.values()):
+            if topic not in client.topics:
+                continue
+            if topic not in client.synced:
+                if self._send_snapshot(client, topic):
+                    delivered += 1
+                continue
+            if delta_payload is None:
+                delta_payload = json.dumps({
+                    "type": "delta",
+                    "topic": topic,
+                    "seq": seq,
+                    "changed": changed,
+                    "removed": removed
+                })
+            if self._enqueue(client, delta_payload):
+                delivered += 1
+        return delivered
+
+    async def close_all(self):
+        """Close every connection, used on shutdown"""
+        for client in list(self.clients.values()):
+            self.disconnect(client.websocket)
+            try:
+                await client.websocket.close(code=1001)
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict:
+        """Connection and queue statistics"""
+        return {
+            "connections": len(self.clients),
+            "queued_messages": sum(c.queue.qsize() for c in self.clients.values()),
+            "dropped_messages": self.dropped,
+            "evicted_connections": self.evicted,
+            "topics": len(self.snapshots),
+            "slow_consumer_policy": self.slow_consumer_policy
+        }
+
+    async def _on_bus_message(self, channel: str, message: Dict):
+        if channel == "broadcast":
+            await self.broadcast_local(message)
+        elif channel == "topic":
+            await self.publish_local(message["topic"], message["snapshot"])
+
+    def _enqueue(self, client: ClientConnection, payload: str) -> bool:
+        """Queue a payload for one client, applying the slow consumer policy"""
+        try:
+            client.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_consumer_policy == "disconnect":
+            logger.warning("🐢 Evicting slow WebSocket consumer (queue full)")
+            asyncio.create_task(self._evict(client, code=SLOW_CONSUMER_CLOSE_CODE))
+            return False
+
+        client.dropped += 1
+        self.dropped += 1
+        # A dropped message may have been a delta, so the next update on
+        # every topic has to be a full snapshot
+        client.synced.clear()
+        if self.slow_consumer_policy == "drop_newest":
+            return False
+
+        # drop_oldest: make room for the freshest update
+        client.queue.get_nowait()
+        client.queue.put_nowait(payload)
+        return True
+
+    def _send_snapshot(self, client: ClientConnection, topic: str) -> bool:
+        """Queue the full current snapshot of a topic for one client"""
+        payload = json.dumps({
+            "type": "snapshot",
+            "topic": topic,
+            "seq": self.sequences[topic],
+            "data": self.snapshots[topic]
+        })
+        if not self._enqueue(client, payload):
+            return False
+        client.synced.add(topic)
+        return True
+
+    async def _sender(self, client: ClientConnection):
+        """Drain one client's queue, evicting the socket on failure"""
+        try:
+            while True:
+                payload = await client.queue.get()
+                await asyncio.wait_for(
+                    client.websocket.send_text(payload), timeout=self.send_timeout
+                )
+                client.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ WebSocket send timed out after {self.send_timeout}s, evicting client")
+            await self._evict(client, code=SLOW_CONSUMER_CLOSE_CODE)
+        except Exception as e:
+            logger.info(f"🔌 Removing dead WebSocket connection: {e}")
+            await self._evict(client)
+
+    async def _evict(self, client: ClientConnection, code: int = 1000):
+        """Drop a client and close its socket"""
+        if self.clients.get(client.websocket) is not client:
+            return
+        self.evicted += 1
+        self.disconnect(client.websocket)
+        try:
+            await client.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+def _json_default(value):
+    """Serialize datetimes as ISO strings like the REST endpoints do"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def is_valid_topic(topic: str) -> bool:
+    """Check a topic against the subscription namespace"""
+    if not isinstance(topic, str) or ":" not in topic:
+        return False
+    kind, name = topic.split(":", 1)
+    if kind == "agent":
+        return name in AGENT_TOPICS
+    return kind in SCOPED_TOPIC_PREFIXES and bool(name)
@@ -0,0 +1,442 @@
+"""
+Sensor Ingestion - Streaming intake for AQI monitors and weather stations
+NDJSON readings are parsed in batches, queued through a bounded queue and
+folded into tumbling windows per station and ward; sliding windows built
+from the last few tumbling windows feed the surveillance threat score
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+import logging
+
+from services.regions import region_slug
+
+logger = logging.getLogger(__name__)
+
+# Numeric fields a sensor reading may carry
+METRICS = ("aqi", "temperature", "humidity")
+
+# Longest NDJSON line accepted; a reading is a few hundred bytes
+MAX_LINE_BYTES = 64 * 1024
+
+
+class Pane:
+    """
+    Count, sum, min and max of each metric over one tumbling window
+    """
+
+    __slots__ = ("bucket", "readings", "counts", "sums", "mins", "maxs")
+
+    def __init__(self, bucket: int):
+        self.bucket = bucket
+        self.readings = 0
+        self.counts = [0] * len(METRICS)
+        self.sums = [0.0] * len(METRICS)
+        self.mins = [math.inf] * len(METRICS)
+        self.maxs = [-math.inf] * len(METRICS)
+
+    def add(self, values: Tuple[Optional[float], ...]):
+        self.readings += 1
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            self.counts[i] += 1
+            self.sums[i] += value
+            if value < self.mins[i]:
+                self.mins[i] = value
+            if value > self.maxs[i]:
+                self.maxs[i] = value
+
+    def merge(self, other: "Pane"):
+        self.readings += other.readings
+        for i in range(len(METRICS)):
+            self.counts[i] += other.counts[i]
+            self.sums[i] += other.sums[i]
+            self.mins[i] = min(self.mins[i], other.mins[i])
+            self.maxs[i] = max(self.maxs[i], other.maxs[i])
+
+    def to_dict(self) -> Dict:
+        return {"bucket": self.bucket, "readings": self.readings, "counts": self.counts,
+                "sums": self.sums, "mins": self.mins, "maxs": self.maxs}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Pane":
+        pane = cls(data["bucket"])
+        pane.readings = data["readings"]
+        pane.counts, pane.sums = list(data["counts"]), list(data["sums"])
+        pane.mins, pane.maxs = list(data["mins"]), list(data["maxs"])
+        return pane
+
+    def summary(self) -> Dict:
+        return {
+            metric: {
+                "count": self.counts[i],
+                "mean": round(self.sums[i] / self.counts[i], 2),
+                "min": round(self.mins[i], 2),
+                "max": round(self.maxs[i], 2)
+            }
+            for i, metric in enumerate(METRICS) if self.counts[i]
+        }
+
+
+class SlidingWindow:
+    """
+    The most recent tumbling windows of one station or ward. Memory is
+    fixed at `panes` windows no matter how many readings arrive.
+    """
+
+    def __init__(self, panes: int):
+        self.panes: deque = deque(maxlen=panes)
+
+    def add(self, bucket: int, values: Tuple[Optional[float], ...]) -> Tuple[bool, Optional[Pane]]:
+        """Fold a reading in, returns (accepted, tumbling window it closed)"""
+        current = self.panes[-1] if self.panes else None
+        if current is None or bucket > current.bucket:
+            pane = Pane(bucket)
+            pane.add(values)
+            self.panes.append(pane)
+            return True, current
+        if bucket == current.bucket:
+            current.add(values)
+            return True, None
+        # Late reading: fold into its window if that is still held
+        for pane in self.panes:
+            if pane.bucket == bucket:
+                pane.add(values)
+                return True, None
+        return False, None
+
+    def merge(self, incoming: Pane):
+        """Fold in a tumbling window aggregated elsewhere (another worker)"""
+        for pane in self.panes:
+            if pane.bucket == incoming.bucket:
+                pane.merge(incoming)
+                return
+        if self.panes and incoming.bucket < self.panes[0].bucket and len(self.panes) == self.panes.maxlen:
+            return
+        self.panes.append(incoming)
+        ordered = sorted(self.panes, key=lambda pane: pane.bucket)
+        self.panes.clear()
+        self.panes.extend(ordered)
+
+    def aggregate(self, since_bucket: int, until_bucket: int) -> Optional[Pane]:
+        """Merge the tumbling windows from `since_bucket` through `until_bucket` into one"""
+        total = None
+        for pane in self.panes:
+            if pane.bucket < since_bucket or pane.bucket > until_bucket:
+                continue
+            if total is None:
+                total = Pane(pane.bucket)
+            total.merge(pane)
+        return total
+
+
+def _epoch(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class IngestionPipeline:
+    """
+    Bounded queue of reading batches drained by one aggregation task.
+    Producers wait while `queue_batches` batches are pending, so a burst
+    slows the senders down instead of growing memory.
+    """
+
+    def __init__(self, tumbling_seconds: float = 60, sliding_seconds: float = 900,
+                 queue_batches: int = 64, max_stations: int = 10000, history: int = 256):
+        self.tumbling_seconds = tumbling_seconds
+        self.panes = max(1, int(sliding_seconds // tumbling_seconds))
+        self.max_stations = max_stations
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_batches)
+        self.consumer: Optional[asyncio.Task] = None
+
+        self.stations: Dict[str, SlidingWindow] = {}
+        # Windows of readings aggregated by this worker; only these are shared
+        self.wards: Dict[str, SlidingWindow] = {}
+        # ward -> origin (worker) -> windows shared by other workers
+        self.remote_wards: Dict[str, Dict[str, SlidingWindow]] = {}
+        self.station_wards: Dict[str, str] = {}
+        self.ward_slugs: Dict[str, str] = {}
+        # Closed ward tumbling windows, newest last
+        self.recent_windows: deque = deque(maxlen=history)
+        # Callables (ward, pane) run for each closed ward tumbling window
+        self.window_listeners: List[Callable[[str, Pane], None]] = []
+        # Per-station recent readings (utils.timeseries), if attached
+        self.history = None
+
+        self.stats = {"received": 0, "accepted": 0, "rejected": 0, "late": 0, "batches": 0,
+                      "backpressure_waits": 0, "dropped_batches": 0, "merged_windows": 0}
+
+    async def start(self):
+        self.consumer = asyncio.create_task(self._consume())
+        logger.info(
+            f"📡 Sensor ingestion started ({self.tumbling_seconds:.0f}s windows, "
+            f"{self.panes * self.tumbling_seconds / 60:.0f}min sliding)"
+        )
+
+    async def stop(self):
+        """Aggregate whatever is still queued, then stop"""
+        if self.consumer:
+            await self.queue.join()
+            self.consumer.cancel()
+            try:
+                await self.consumer
+            except asyncio.CancelledError:
+                pass
+        logger.info(f"📡 Sensor ingestion stopped, {self.stats['accepted']} readings aggregated")
+
+    def normalize(self, reading: Dict, now: float) -> Optional[Tuple[str, str, int, Tuple]]:
+        """(station, ward, timestamp, values) for a raw reading, None if unusable"""
+        try:
+            station = str(reading["station"])
+            ward_name = reading.get("ward") or self.station_wards.get(station)
+            if not ward_name:
+                return None
+            ward = self.ward_slugs.get(ward_name)
+            if ward is None:
+                ward = region_slug(ward_name)
+                if len(self.ward_slugs) < self.max_stations:
+                    self.ward_slugs[ward_name] = ward
+            values = tuple(
+                None if reading.get(metric) is None else float(reading[metric]) for metric in METRICS
+            )
+            timestamp = _epoch(reading.get("timestamp"))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        if not ward or all(value is None for value in values):
+            return None
+        if not all(value is None or math.isfinite(value) for value in values):
+            return None
+        if timestamp is None:
+            timestamp = now
+        elif not math.isfinite(timestamp) or timestamp > now + self.tumbling_seconds:
+            # A far-future window would make every real reading look late
+            return None
+        return station, ward, timestamp, values
+
+    async def submit(self, batch: List[Tuple]):
+        """Queue normalized readings, waiting while the queue is full"""
+        if not batch:
+            return
+        if self.queue.full():
+            self.stats["backpressure_waits"] += 1
+        await self.queue.put(batch)
+
+    def submit_nowait(self, batch: List[Tuple]) -> bool:
+        """Queue normalized readings only if there is room"""
+        try:
+            self.queue.put_nowait(batch)
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped_batches"] += 1
+            return False
+
+    async def _consume(self):
+        while True:
+            batch = await self.queue.get()
+            try:
+                self.process(batch)
+            except Exception as e:
+                logger.error(f"❌ Failed to aggregate sensor batch: {e}")
+            finally:
+                self.queue.task_done()
+
+    def process(self, batch: List[Tuple]):
+        """Fold a batch of normalized readings into the station and ward windows"""
+        self.stats["batches"] += 1
+        history = self.history
+        for station, ward, timestamp, values in batch:
+            bucket = int(timestamp // self.tumbling_seconds)
+            station_window = self.stations.get(station)
+            ward_window = self.wards.get(ward)
+            # Check the caps before touching any state, so a rejected reading
+            # leaves no trace in the windows or the history store
+            if ((station_window is None and len(self.stations) >= self.max_stations)
+                    or (ward_window is None and len(self.wards) >= self.max_stations)):
+                self.stats["rejected"] += 1
+                continue
+            if station_window is None:
+                station_window = self.stations[station] = SlidingWindow(self.panes)
+
+            accepted, _ = station_window.add(bucket, values)
+            if not accepted:
+                self.stats["late"] += 1
+                continue
+            self.station_wards[station] = ward
+            if history is not None:
+                for metric, value in zip(METRICS, values):
+                    if value is not None:
+                        history.append(station, metric, timestamp, value)
+
+            if ward_window is None:
+                ward_window = self.wards[ward] = SlidingWindow(self.panes)
+            _, closed = ward_window.add(bucket, values)
+            self.stats["accepted"] += 1
+            if closed is not None:
+                self._window_closed(ward, closed)
+
+    def _window_closed(self, ward: str, pane: Pane):
+        self.recent_windows.append((ward, pane))
+        for listener in self.window_listeners:
+            try:
+                listener(ward, pane)
+            except Exception as e:
+                logger.error(f"❌ Window listener failed: {e}")
+
+    def merge_window(self, ward: str, pane: Pane, origin: str, now: float = None):
+        """
+        Add a ward tumbling window aggregated by another worker. Kept per
+        origin, apart from this worker's own windows, so it is never shared
+        back and counted twice.
+        """
+        current = int((now if now is not None else time.time()) // self.tumbling_seconds)
+        if pane.bucket > current + 1:
+            return
+        origins = self.remote_wards.get(ward)
+        if origins is None:
+            if len(self.remote_wards) >= self.max_stations:
+                return
+            origins = self.remote_wards[ward] = {}
+        window = origins.get(origin)
+        if window is None:
+            # Workers that restarted leave origins with only expired windows behind
+            for stale in [key for key, held in origins.items() if held.panes[-1].bucket <= current - self.panes]:
+                del origins[stale]
+            window = origins[origin] = SlidingWindow(self.panes)
+        window.merge(pane)
+        self.stats["merged_windows"] += 1
+
+    def ward_ids(self) -> List[str]:
+        """Wards with windows from this worker or any other"""
+        return list(dict.fromkeys([*self.wards, *self.remote_wards]))
+
+    def window(self, ward: str, now: float = None) -> Optional[Dict]:
+        """Sliding-window aggregate for a ward, None if it has no recent readings"""
+        ward_id = region_slug(ward)
+        windows = [*self.remote_wards.get(ward_id, {}).values()]
+        if ward_id in self.wards:
+            windows.append(self.wards[ward_id])
+        current = int((now if now is not None else time.time()) // self.tumbling_seconds)
+        total = None
+        for window in windows:
+            part = window.aggregate(current - self.panes + 1, current)
+            if part is None:
+                continue
+            if total is None:
+                total = part
+            else:
+                total.merge(part)
+        if total is None:
+            return None
+        return {
+            "ward": ward_id,
+            "readings": total.readings,
+            "stations": sum(1 for station_ward in self.station_wards.values() if station_ward == ward_id),
+            "window_seconds": self.panes * self.tumbling_seconds,
+            "metrics": total.summary()
+        }
+
+    def reading_for(self, ward: str, now: float = None) -> Optional[Dict]:
+        """Windowed sensor values for threat scoring, None without fresh AQI"""
+        window = self.window(ward, now)
+        if window is None or "aqi" not in window["metrics"]:
+            return None
+        metrics = window["metrics"]
+        reading = {metric: stats["mean"] for metric, stats in metrics.items()}
+        reading["sensors"] = {
+            "stations": window["stations"],
+            "readings": window["readings"],
+            "window_seconds": window["window_seconds"],
+            "aqi_max": metrics["aqi"]["max"]
+        }
+        return reading
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "queued_batches": self.queue.qsize(),
+            "stations": len(self.stations),
+            "wards": len(self.wards),
+            "remote_wards": len(self.remote_wards),
+            "tumbling_seconds": self.tumbling_seconds,
+            "sliding_seconds": self.panes * self.tumbling_seconds
+        }
+
+
+async def ndjson_batches(chunks: AsyncIterator[bytes], pipeline: IngestionPipeline,
+                         counts: Dict[str, int] = None, batch_size: int = 1000,
+                         max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[List[Tuple]]:
+    """
+    Split a byte stream into NDJSON lines and yield normalized readings in
+    batches; malformed lines are counted as rejected (in `counts` too, if
+    given) and skipped. A line longer than `max_line_bytes` is rejected and
+    the rest of it discarded as it arrives, so memory stays bounded.
+    """
+    counts = counts if counts is not None else {}
+    counts.setdefault("received", 0)
+    counts.setdefault("rejected", 0)
+    batch: List[Tuple] = []
+    remainder = b""
+    discarding = False
+    now = time.time()
+    async for chunk in chunks:
+        if discarding:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            discarding = False
+        lines = (remainder + chunk).split(b"\n")
+        remainder = lines.pop()
+        if len(remainder) > max_line_bytes:
+            _reject_line(pipeline, counts)
+            remainder = b""
+            discarding = True
+        now = time.time()
+        for line in lines:
+            if len(line) > max_line_bytes:
+                _reject_line(pipeline, counts)
+                continue
+            _parse_line(line, pipeline, now, batch, counts)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    _parse_line(remainder, pipeline, now, batch, counts)
+    if batch:
+        yield batch
+
+
+def _reject_line(pipeline: IngestionPipeline, counts: Dict[str, int]):
+    counts["received"] += 1
+    counts["rejected"] += 1
+    pipeline.stats["received"] += 1
+    pipeline.stats["rejected"] += 1
+
+
+def _parse_line(line: bytes, pipeline: IngestionPipeline, now: float, batch: List[Tuple],
+                counts: Dict[str, int]):
+    if not line.strip():
+        return
+    try:
+        normalized = pipeline.normalize(json.loads(line), now)
+    except ValueError:
+        normalized = None
+    if normalized is None:
+        _reject_line(pipeline, counts)
+        return
+    counts["received"] += 1
+    pipeline.stats["received"] += 1
+    batch.append(normalized)
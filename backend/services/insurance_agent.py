@@ -4,10 +4,12 @@ Pre-processes insurance claims 48-72 hours before surge
 """
 
 import random
-from datetime import datetime, timedelta
 from typing import Dict, List
 import logging
 
+from utils.clock import utcnow
+from utils.metrics import traced
+
 logger = logging.getLogger(__name__)
 
 class InsuranceAgent:
@@ -15,7 +17,9 @@ class InsuranceAgent:
     Automates insurance pre-authorization for predicted patients
     """
     
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        # Injected RNG makes seeded simulation runs reproducible
+        self.rng = rng or random.Random()
         self.insurance_providers = [
             "Star Health", "ICICI Lombard", "HDFC Ergo", 
             "Bajaj Allianz", "Max Bupa"
@@ -29,6 +33,7 @@ class InsuranceAgent:
         }
         logger.info("💰 Insurance Pre-Authorization Agent initialized")
     
+    @traced("insurance.pre_authorize")
     async def pre_authorize(self, prediction: Dict) -> Dict:
         """Pre-authorize insurance for predicted patients"""
         
@@ -46,7 +51,7 @@ class InsuranceAgent:
         patients_per_provider = predicted_patients // len(self.insurance_providers)
         
         for provider in self.insurance_providers:
-            approval_rate = random.uniform(0.82, 0.92)
+            approval_rate = self.rng.uniform(0.82, 0.92)
             approved_patients = int(patients_per_provider * approval_rate)
             
             auth = {
@@ -73,7 +78,7 @@ class InsuranceAgent:
             "total_approved": total_approved,
             "approval_rate": round(overall_approval_rate, 1),
             "processing_time": "24-48 hours",
-            "timestamp": datetime.utcnow(),
+            "timestamp": utcnow(),
             "status": "submitted"
         }
         
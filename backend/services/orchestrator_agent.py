@@ -3,8 +3,10 @@ Orchestrator Agent - Coordinates all AI agents
 """
 
 import asyncio
-from datetime import datetime
-from typing import Dict, List
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
 import logging
 
 from services.surveillance_agent import SurveillanceAgent
@@ -14,6 +16,17 @@ from services.communication_agent import CommunicationAgent
 from services.insurance_agent import InsuranceAgent
 from services.reverse911_agent import Reverse911Agent
 from services.pharmaceutical_agent import PharmaceuticalAgent
+from services.pipeline import PipelineDAG, PipelineNode
+from services.sources import SourceFetcher, http_sources, simulated_sources
+from services.resilience import AgentPolicy, AgentSupervisor
+from services.prediction_gate import PredictionGate
+from services.persistence import PersistenceQueue, crisis_response_rows
+from services.response_tracker import NO_CHANGE, TOP_UP, ResponsePlan, ResponseTracker
+from services.regions import STAGES, RegionState, parse_regions, region_slug
+from utils.helpers import parse_key_values
+from utils.clock import utcnow
+from utils.metrics import span
+from utils.timeseries import TimeSeriesStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,81 +36,388 @@ class OrchestratorAgent:
     The Coordinator - Orchestrates all agents and prioritizes tasks
     """
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None):
         logger.info("🎯 Initializing Orchestrator Agent...")
         
+        # Simulation mode: a seed gives every agent its own reproducible RNG stream
+        if seed is None and os.getenv("MEDISURGE_SIMULATION_SEED"):
+            seed = int(os.getenv("MEDISURGE_SIMULATION_SEED"))
+        self.seed = seed
+        if seed is not None:
+            logger.info(f"🎲 Simulation mode with seed {seed}")
+        
         # Initialize all agents
-        self.surveillance = SurveillanceAgent()
-        self.prediction = PredictionAgent()
+        surveillance_rng = self._rng("surveillance") or random.Random()
+        self.surveillance = SurveillanceAgent(
+            surveillance_rng, parse_key_values(os.getenv("MEDISURGE_THREAT_RULES", "")),
+            sources=self._source_fetcher(surveillance_rng)
+        )
+        self.prediction = PredictionAgent(self._rng("prediction"))
         self.resource = ResourceAgent()
-        self.communication = CommunicationAgent()
-        self.insurance = InsuranceAgent()
-        self.reverse911 = Reverse911Agent()
-        self.pharmaceutical = PharmaceuticalAgent()
+        self.communication = CommunicationAgent(self._rng("communication"))
+        self.insurance = InsuranceAgent(self._rng("insurance"))
+        self.reverse911 = Reverse911Agent(self._rng("reverse911"))
+        self.pharmaceutical = PharmaceuticalAgent(self._rng("pharmaceutical"))
+        
+        # Recent readings per region and station, for trend-aware scoring
+        self.history = TimeSeriesStore(
+            capacity=int(os.getenv("MEDISURGE_HISTORY_CAPACITY", "1440")),
+            max_series=int(os.getenv("MEDISURGE_HISTORY_MAX_SERIES", "20000"))
+        )
+        self.surveillance.history = self.history
+        self.prediction.history = self.history
+        
+        # Deadlines, retries and circuit breakers for the surveillance feeds and
+        # the response agents. Only the resource plan is a pure calculation, so
+        # only it is hedged.
+        deadlines = {"surveillance": 15, "resource": 5, "insurance": 10, "reverse911": 10,
+                     "pharmaceutical": 10, "communication": 10}
+        deadlines.update(parse_key_values(os.getenv("MEDISURGE_AGENT_DEADLINES", "")))
+        retries = int(os.getenv("MEDISURGE_AGENT_RETRIES", "2"))
+        self.supervisor = AgentSupervisor({
+            name: AgentPolicy(
+                deadline=deadline,
+                retries=retries,
+                hedge_after=deadline / 4 if name == "resource" else None
+            )
+            for name, deadline in deadlines.items()
+        })
+        guard = self.supervisor.wrap
+        # A required source that is briefly unavailable is retried within the scan
+        self.monitor_sources = guard("surveillance", self.surveillance.monitor)
+        
+        # Crisis response DAG: staffing and supply build on the resource plan
+        self.response_pipeline = PipelineDAG([
+            PipelineNode("resource", guard("resource", self.resource.allocate_resources), inputs=["prediction"]),
+            PipelineNode("insurance", guard("insurance", self.insurance.pre_authorize), inputs=["prediction"]),
+            PipelineNode("reverse911", guard("reverse911", self.reverse911.activate_staff),
+                         inputs=["prediction", "resource"]),
+            PipelineNode("pharmaceutical", guard("pharmaceutical", self.pharmaceutical.coordinate_supply),
+                         inputs=["prediction", "resource"]),
+            PipelineNode("communication", guard("communication", self.communication.send_advisory),
+                         inputs=["prediction"])
+        ])
+        # Top-ups for an active surge: no repeat advisory
+        self.top_up_pipeline = PipelineDAG([
+            node for node in self.response_pipeline.nodes.values() if node.name != "communication"
+        ])
+        self.response_tracker = ResponseTracker()
+        # Reuses a region's last prediction while its inputs stay materially unchanged
+        self.prediction_gate = PredictionGate(
+            max_age=float(os.getenv("MEDISURGE_PREDICTION_GATE_MAX_AGE", "1800")),
+            steps=parse_key_values(os.getenv("MEDISURGE_PREDICTION_GATE_STEPS", ""))
+        )
+        self.last_pipeline_run: Optional[Dict] = None
         
         self.monitoring_active = False
+        
+        # One independent pipeline per monitored city/ward
+        region_ids = parse_regions(os.getenv("MEDISURGE_REGIONS", os.getenv("MEDISURGE_CITY", "mumbai")))
+        self.regions: Dict[str, RegionState] = {
+            region_id: RegionState(region_id, self._rng(f"scheduler:{region_id}")) for region_id in region_ids
+        }
+        self.region_tasks: List[asyncio.Task] = []
+        
+        # Bounded concurrency across regions; semaphores wake waiters in FIFO
+        # order so a region in crisis queues behind, not ahead of, the others
+        self.global_limit = asyncio.Semaphore(int(os.getenv("MEDISURGE_MAX_CONCURRENT_STAGES", "8")))
+        stage_limits = {"surveillance": 8, "prediction": 4, "response": 2}
+        stage_limits.update(parse_key_values(os.getenv("MEDISURGE_STAGE_LIMITS", "")))
+        self.stage_limits = {stage: asyncio.Semaphore(int(stage_limits[stage])) for stage in STAGES}
+        
+        # Async callable (topic, snapshot) used to push live updates to dashboards
+        self.publisher: Optional[Callable[[str, Dict], Awaitable]] = None
+        # Async callables (prediction, results) run after each crisis response
+        self.response_listeners: List[Callable[[Dict, Dict], Awaitable]] = []
+        # Write-behind queue that stores agent outputs, if configured
+        self.persistence: Optional[PersistenceQueue] = None
         logger.info("✅ Orchestrator Agent initialized!")
     
+    def _rng(self, stream: str) -> Optional[random.Random]:
+        """Independent seeded RNG per stream, or None for unseeded live runs"""
+        if self.seed is None:
+            return None
+        return random.Random(f"{self.seed}:{stream}")
+    
     async def start_monitoring(self):
-        """Start 24/7 autonomous monitoring"""
+        """Start 24/7 autonomous monitoring of every region"""
         self.monitoring_active = True
-        logger.info("🔄 Starting autonomous 24/7 monitoring...")
+        logger.info(f"🔄 Starting autonomous 24/7 monitoring of {len(self.regions)} regions...")
+        await self.publish_status()
         
+        self.region_tasks = [
+            asyncio.create_task(self._monitor_region(region)) for region in self.regions.values()
+        ]
+        try:
+            await asyncio.gather(*self.region_tasks)
+        finally:
+            for task in self.region_tasks:
+                task.cancel()
+    
+    async def _monitor_region(self, region: RegionState):
+        """Scan one region on its own adaptive schedule"""
         while self.monitoring_active:
             try:
-                # Step 1: Surveillance
-                surveillance_data = await self.surveillance.monitor()
-                logger.info(f"📊 Surveillance: Threat level {surveillance_data['threat_level']}")
-                
-                # Step 2: Prediction (if threat detected)
-                if surveillance_data['threat_level'] in ['MEDIUM', 'HIGH', 'CRITICAL']:
-                    prediction = await self.prediction.predict_surge(surveillance_data)
-                    logger.info(f"🔮 Prediction: {prediction['confidence']}% confidence, {prediction['alert_level']} alert")
-                    
-                    # Step 3: Activate response agents if HIGH or CRITICAL
-                    if prediction['alert_level'] in ['HIGH', 'CRITICAL']:
-                        await self.coordinate_crisis_response(prediction)
-                
-                # Wait 15 minutes before next check
-                await asyncio.sleep(900)
+                await self.scan_region(region)
+                delay = region.scheduler.next_delay(region.threat_level)
                 
             except Exception as e:
-                logger.error(f"❌ Error in monitoring loop: {e}")
-                await asyncio.sleep(60)
+                region.errors += 1
+                delay = region.scheduler.error_delay()
+                logger.error(f"❌ Error in monitoring loop for {region.region_id}: {e}, retrying in {delay:.0f}s")
+            
+            # Wait for the next scheduled scan or an out-of-band trigger
+            reason = await region.scheduler.wait(delay)
+            if reason != "scheduled" and self.monitoring_active:
+                logger.info(f"⚡ Out-of-band scan triggered for {region.region_id}: {reason}")
     
-    async def coordinate_crisis_response(self, prediction: Dict):
-        """Coordinate all agents for crisis response"""
-        logger.info(f"🚨 Coordinating crisis response for prediction ID: {prediction['id']}")
+    async def scan_region(self, region: RegionState, reading: Dict = None) -> Dict:
+        """
+        Run surveillance -> prediction -> response for one region, scoring
+        `reading` instead of polling the sources when one is given (replays).
+        Returns the decisions taken along the way.
+        """
+        # Step 1: Surveillance
+        if reading is None:
+            surveillance_data = await self._run_stage(
+                region, "surveillance", self.monitor_sources, region.region_id
+            )
+        else:
+            surveillance_data = await self._run_stage(
+                region, "surveillance", self.surveillance.assess, reading, region.region_id
+            )
+        surveillance_data["region"] = region.region_id
+        region.record_scan(surveillance_data)
+        logger.info(f"📊 Surveillance [{region.region_id}]: Threat level {surveillance_data['threat_level']}")
+        await self._publish_agent("surveillance", surveillance_data, "monitoring")
+        await self._publish_city(region, surveillance_data)
+        decision = {"threat_level": surveillance_data["threat_level"], "alert_level": None, "response": None}
         
-        try:
-            # Execute all response agents in parallel
-            results = await asyncio.gather(
-                self.resource.allocate_resources(prediction),
-                self.insurance.pre_authorize(prediction),
-                self.reverse911.activate_staff(prediction),
-                self.pharmaceutical.coordinate_supply(prediction),
-                self.communication.send_advisory(prediction),
-                return_exceptions=True
+        # Step 2: Prediction (if threat detected)
+        threat_detected = surveillance_data['threat_level'] in ['MEDIUM', 'HIGH', 'CRITICAL']
+        cached = self.prediction_gate.lookup(region.region_id, surveillance_data) if threat_detected else None
+        if not threat_detected:
+            self.prediction_gate.forget(region.region_id)
+        elif cached is not None:
+            # Same inputs as last time: that prediction and its response still stand
+            region.predictions_reused += 1
+            decision["alert_level"] = cached["alert_level"]
+            decision["prediction_reused"] = True
+            logger.info(f"♻️ Prediction [{region.region_id}]: inputs unchanged, keeping {cached['id']}")
+            await self._publish_city(region, surveillance_data, cached)
+        else:
+            prediction = await self._run_stage(region, "prediction", self.prediction.predict_surge, surveillance_data)
+            prediction["region"] = region.region_id
+            if self.persistence is not None:
+                # Response rows reference the stored prediction by its primary key
+                prediction["record_id"] = await self.persistence.save_prediction(prediction)
+            region.record_prediction(prediction)
+            decision["alert_level"] = prediction["alert_level"]
+            logger.info(
+                f"🔮 Prediction [{region.region_id}]: {prediction['confidence']}% confidence, "
+                f"{prediction['alert_level']} alert"
+            )
+            await self._publish_agent("prediction", prediction)
+            await self._publish_city(region, surveillance_data, prediction)
+            
+            # Step 3: Activate response agents if HIGH or CRITICAL
+            if prediction['alert_level'] in ['HIGH', 'CRITICAL']:
+                plan = await self._run_stage(region, "response", self.respond_to_prediction, prediction)
+                if not plan.succeeded:
+                    # Nothing went out: the next scan must predict and respond again
+                    decision["response"] = "failed"
+                    return decision
+                region.responses += 1
+                decision["response"] = plan.mode
+            self.prediction_gate.store(region.region_id, surveillance_data, prediction)
+        
+        return decision
+    
+    async def _run_stage(self, region: RegionState, stage: str, func: Callable[..., Awaitable], *args):
+        """Run one pipeline stage under its stage limit and the global limit"""
+        async with self.stage_limits[stage]:
+            async with self.global_limit:
+                start = time.perf_counter()
+                try:
+                    with span(f"orchestrator.{stage}"):
+                        return await func(*args)
+                finally:
+                    region.record_stage(stage, time.perf_counter() - start)
+    
+    async def respond_to_prediction(self, prediction: Dict) -> ResponsePlan:
+        """Dispatch only the work a prediction adds to its surge's active response"""
+        plan = self.response_tracker.plan(prediction)
+        
+        if plan.mode == NO_CHANGE:
+            logger.info(
+                f"⏸️ Prediction {prediction['id']} ({prediction.get('region', 'unassigned')}) is within the "
+                f"active response ({plan.delta['additional_patients']:+d} patients), nothing to dispatch"
+            )
+            response = {}
+        elif plan.mode == TOP_UP:
+            logger.info(
+                f"➕ Topping up active response for {prediction.get('region', 'unassigned')}: "
+                f"{plan.delta['additional_patients']:+d} patients"
             )
+            response = await self.coordinate_crisis_response(plan.work_order, self.top_up_pipeline)
+        else:
+            response = await self.coordinate_crisis_response(plan.work_order)
+        
+        # Failed agents come back as exception values, so a non-empty result can still mean nothing went out
+        plan.succeeded = plan.mode == NO_CHANGE or (
+            isinstance(response.get("resource"), dict)
+            and not any(isinstance(result, Exception) for result in response.values())
+        )
+        self.response_tracker.record(plan, response)
+        return plan
+    
+    async def coordinate_crisis_response(self, prediction: Dict, pipeline: PipelineDAG = None) -> Dict:
+        """Coordinate agents for crisis response, returns each agent's result"""
+        pipeline = pipeline or self.response_pipeline
+        logger.info(
+            f"🚨 Coordinating crisis response for prediction ID: {prediction['id']}"
+            f" ({prediction.get('region', 'unassigned')})"
+        )
+        
+        try:
+            # Run the response pipeline; independent agents run concurrently
+            run = await pipeline.run({"prediction": prediction}, memo_key=(prediction["id"], prediction.get("timestamp")))
+            self.last_pipeline_run = run.get_stats()
             
             # Log results
-            agent_names = ['Resource', 'Insurance', 'Reverse911', 'Pharmaceutical', 'Communication']
+            agent_names = [
+                name for name in ['Resource', 'Insurance', 'Reverse911', 'Pharmaceutical', 'Communication']
+                if name.lower() in run.results
+            ]
+            results = [run.results[name.lower()] for name in agent_names]
             for name, result in zip(agent_names, results):
                 if isinstance(result, Exception):
                     logger.error(f"❌ {name} Agent failed: {result}")
+                    status = self.supervisor.status(name.lower())
+                    await self._publish_agent(
+                        name.lower(), {"error": str(result)}, "failed" if status == "active" else status
+                    )
                 else:
                     logger.info(f"✅ {name} Agent: {result.get('status', 'completed')}")
+                    await self._publish_agent(name.lower(), result)
+            logger.info(
+                f"⏱️ Response pipeline took {run.elapsed * 1000:.1f}ms, "
+                f"critical path: {' -> '.join(run.critical_path)}"
+            )
+            degraded = self.supervisor.degraded()
+            self.last_pipeline_run["degraded_agents"] = degraded
+            if degraded:
+                logger.warning(f"⚠️ Crisis response completed with degraded agents: {', '.join(degraded)}")
+            
+            pharmaceutical_result = run.results.get('pharmaceutical')
+            if isinstance(pharmaceutical_result, dict):
+                await self._publish_hospitals(pharmaceutical_result)
+            
+            response = dict(zip((name.lower() for name in agent_names), results))
+            if self.persistence is not None:
+                for model, rows in crisis_response_rows(prediction, response, run.timings).items():
+                    await self.persistence.enqueue(model, rows)
+            
+            for listener in self.response_listeners:
+                await listener(prediction, response)
             
             logger.info("🎉 Crisis response coordination complete!")
+            return response
             
         except Exception as e:
             logger.error(f"❌ Error coordinating crisis response: {e}")
+            return {}
+    
+    async def publish_status(self):
+        """Publish the current status of every agent"""
+        status = self.get_system_status()
+        await self._publish("agent:orchestrator", {"status": status["orchestrator"], "last_run": None})
+        for name, agent_status in status["agents"].items():
+            await self._publish(f"agent:{name}", {"status": agent_status, "last_run": None})
+    
+    async def _publish(self, topic: str, snapshot: Dict):
+        """Push a snapshot to live subscribers, never failing the caller"""
+        if self.publisher is None:
+            return
+        try:
+            await self.publisher(topic, snapshot)
+        except Exception as e:
+            logger.error(f"❌ Failed to publish {topic}: {e}")
+    
+    async def _publish_agent(self, name: str, result: Dict, status: str = "active"):
+        """Publish the scalar summary of an agent result"""
+        snapshot = {"status": status, "last_run": utcnow()}
+        snapshot.update(
+            (key, value) for key, value in result.items()
+            if not isinstance(value, (list, dict)) and key != "status"
+        )
+        await self._publish(f"agent:{name}", snapshot)
+    
+    async def _publish_city(self, region: RegionState, surveillance_data: Dict, prediction: Dict = None):
+        """Publish the current picture and pipeline metrics for a region"""
+        snapshot = {
+            "threat_level": surveillance_data["threat_level"],
+            "aqi": round(surveillance_data["aqi"]),
+            "temperature": round(surveillance_data["temperature"], 1),
+            "last_scan": surveillance_data["timestamp"],
+            "metrics": region.get_stats()
+        }
+        if prediction:
+            snapshot["prediction"] = {
+                "alert_level": prediction["alert_level"],
+                "predicted_patients": prediction["predicted_patients"],
+                "surge_date": prediction["surge_date"],
+                "primary_condition": prediction["primary_condition"]
+            }
+        await self._publish(f"city:{region.region_id}", snapshot)
+    
+    async def _publish_hospitals(self, supply: Dict):
+        """Publish per-hospital medicine stock from a supply coordination result"""
+        hospitals: Dict[str, Dict] = {}
+        for item in supply.get("regional_inventory", []):
+            hospitals.setdefault(item["hospital"], {})[item["medicine"]] = {
+                "current_stock": item["current_stock"],
+                "status": item["status"]
+            }
+        for hospital, stock in hospitals.items():
+            await self._publish(f"hospital:{region_slug(hospital)}", {"hospital": hospital, "stock": stock})
+    
+    def trigger_scan(self, reason: str = "manual", region_id: str = None) -> bool:
+        """
+        Request an immediate scan of one region (or all of them), returns
+        False if monitoring isn't running or the region is unknown
+        """
+        if not self.monitoring_active:
+            return False
+        if region_id is None:
+            targets = list(self.regions.values())
+        elif region_slug(region_id) in self.regions:
+            targets = [self.regions[region_slug(region_id)]]
+        else:
+            return False
+        for region in targets:
+            region.scheduler.trigger(reason)
+        return True
     
     def stop_monitoring(self):
         """Stop monitoring"""
         self.monitoring_active = False
+        for region in self.regions.values():
+            region.scheduler.trigger("shutdown")
         logger.info("🛑 Monitoring stopped")
     
+    def _source_fetcher(self, rng: random.Random) -> SourceFetcher:
+        """Real feeds behind MEDISURGE_SOURCES_URL (e.g. stub_sources.py), simulated otherwise"""
+        ttls = parse_key_values(os.getenv("MEDISURGE_SOURCE_TTLS", ""))
+        timeouts = parse_key_values(os.getenv("MEDISURGE_SOURCE_TIMEOUTS", ""))
+        base_url = os.getenv("MEDISURGE_SOURCES_URL")
+        if base_url:
+            return SourceFetcher.pooled(
+                http_sources(base_url, ttls, timeouts),
+                max_connections=int(os.getenv("MEDISURGE_SOURCE_CONNECTIONS", "20"))
+            )
+        return SourceFetcher(simulated_sources(rng, ttls, timeouts))
+    
     def get_system_status(self) -> Dict:
         """Get overall system status"""
         return {
@@ -105,12 +425,16 @@ class OrchestratorAgent:
             "agents": {
                 "surveillance": "active",
                 "prediction": "active",
-                "resource": "active",
-                "communication": "active",
-                "insurance": "active",
-                "reverse911": "active",
-                "pharmaceutical": "active"
+                **{name: self.supervisor.status(name) for name in self.supervisor.policies}
             },
+            "agent_health": self.supervisor.get_stats(),
             "monitoring": self.monitoring_active,
-            "last_check": datetime.utcnow().isoformat()
+            "simulation_seed": self.seed,
+            "response_pipeline": self.last_pipeline_run,
+            "responses": self.response_tracker.get_stats(),
+            "history": self.history.get_stats(),
+            "sources": self.surveillance.sources.get_stats(),
+            "prediction_gate": self.prediction_gate.get_stats(),
+            "regions": {region_id: region.get_stats() for region_id, region in self.regions.items()},
+            "last_check": utcnow().isoformat()
         }
@@ -0,0 +1,318 @@
+"""
+Persistence Queue - Batched write-behind storage for agent outputs
+The orchestrator enqueues rows and moves on; a background task flushes them
+in bulk, one transaction and one executemany insert per table per batch
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import insert
+
+from database import (
+    SessionLocal, Prediction, Resource, InsurancePreAuth, StaffActivation,
+    PharmaceuticalAlert, CommunicationLog, AgentLog
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PersistenceQueue:
+    """
+    Buffers rows per table and flushes them when a batch fills up or the
+    flush interval elapses. Producers wait (backpressure) once more than
+    `max_pending_rows` rows are buffered. A batch that fails to commit is
+    put back and retried on later flushes, up to `max_attempts` times.
+    """
+
+    def __init__(self, session_factory=SessionLocal, batch_size: int = 5000,
+                 flush_interval: float = 1.0, max_pending_rows: int = 50000,
+                 max_attempts: int = 3):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending_rows = max_pending_rows
+        self.max_attempts = max_attempts
+
+        # (model, rows, failed attempts so far)
+        self.buffer: Deque[Tuple[type, List[Dict], int]] = deque()
+        self.pending_rows = 0
+        self.space_available = asyncio.Condition()
+        self.batch_ready = asyncio.Event()
+        self.flush_task: asyncio.Task = None
+        self.running = False
+
+        self.stats = {"enqueued": 0, "written": 0, "retried": 0, "failed": 0, "batches": 0,
+                      "backpressure_waits": 0, "dropped": 0}
+        # time.monotonic() of the latest failed batch, for recent-failure health checks
+        self.last_failure_at: float = None
+
+    async def start(self):
+        self.running = True
+        self.flush_task = asyncio.create_task(self._flush_loop())
+        logger.info("💾 Persistence queue started")
+
+    async def stop(self):
+        """Flush everything still buffered, then stop"""
+        self.running = False
+        self.batch_ready.set()
+        if self.flush_task:
+            await self.flush_task
+        logger.info(f"💾 Persistence queue stopped, {self.stats['written']} rows written")
+
+    async def enqueue(self, model, rows: List[Dict]):
+        """Buffer rows for a table, waiting while the queue is over capacity"""
+        if not rows:
+            return
+        async with self.space_available:
+            if self.pending_rows + len(rows) > self.max_pending_rows and self.pending_rows > 0:
+                self.stats["backpressure_waits"] += 1
+                await self.space_available.wait_for(
+                    lambda: self.pending_rows + len(rows) <= self.max_pending_rows or self.pending_rows == 0
+                )
+            self.buffer.append((model, rows, 0))
+            self.pending_rows += len(rows)
+            self.stats["enqueued"] += len(rows)
+        if self.pending_rows >= self.batch_size:
+            self.batch_ready.set()
+
+    def enqueue_nowait(self, model, rows: List[Dict]) -> bool:
+        """Buffer rows only if there is room, for callers that must never wait"""
+        if not self.running or self.pending_rows + len(rows) > self.max_pending_rows:
+            self.stats["dropped"] += len(rows)
+            return False
+        self.buffer.append((model, rows, 0))
+        self.pending_rows += len(rows)
+        self.stats["enqueued"] += len(rows)
+        if self.pending_rows >= self.batch_size:
+            self.batch_ready.set()
+        return True
+
+    async def save_prediction(self, prediction: Dict) -> Optional[int]:
+        """
+        Insert a prediction right away and return its primary key, so the rows
+        queued for its response can reference it. None if the write failed.
+        """
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    record = Prediction(
+                        timestamp=prediction["timestamp"],
+                        surge_date=prediction["surge_date"],
+                        predicted_patients=prediction["predicted_patients"],
+                        baseline_patients=prediction["baseline_patients"],
+                        surge_percentage=prediction["surge_percentage"],
+                        confidence=prediction["confidence"],
+                        primary_condition=prediction["primary_condition"],
+                        alert_level=prediction["alert_level"],
+                        factors=prediction.get("factors")
+                    )
+                    session.add(record)
+                    await session.flush()
+                    return record.id
+        except Exception as e:
+            self.last_failure_at = time.monotonic()
+            logger.error(f"❌ Failed to persist prediction {prediction.get('id')}: {e}")
+            return None
+
+    def failed_within(self, seconds: float) -> bool:
+        """Whether a batch failed to write in the last `seconds`"""
+        return self.last_failure_at is not None and time.monotonic() - self.last_failure_at < seconds
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "pending": self.pending_rows,
+            "last_failure_seconds_ago": round(time.monotonic() - self.last_failure_at, 1)
+            if self.last_failure_at is not None else None
+        }
+
+    async def _flush_loop(self):
+        while self.running or self.buffer:
+            try:
+                await asyncio.wait_for(self.batch_ready.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.batch_ready.clear()
+            while self.buffer:
+                # After a failure, wait a flush interval before retrying
+                if not await self._flush_batch():
+                    break
+                if self.pending_rows < self.batch_size and self.running:
+                    break
+
+    async def _flush_batch(self) -> bool:
+        """Write up to batch_size buffered rows in a single transaction"""
+        entries: List[Tuple[type, List[Dict], int]] = []
+        batch: Dict[type, List[Dict]] = {}
+        taken = 0
+        while self.buffer and taken < self.batch_size:
+            entry = self.buffer.popleft()
+            entries.append(entry)
+            batch.setdefault(entry[0], []).extend(entry[1])
+            taken += len(entry[1])
+
+        start = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    for model, rows in batch.items():
+                        await session.execute(insert(model), rows)
+            self.stats["written"] += taken
+            self.stats["batches"] += 1
+            logger.info(
+                f"💾 Flushed {taken} rows across {len(batch)} tables "
+                f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+        except Exception as e:
+            self.last_failure_at = time.monotonic()
+            # Put retryable entries back at the front, in their original order
+            retry = [(model, rows, attempts + 1) for model, rows, attempts in entries
+                     if attempts + 1 < self.max_attempts]
+            self.buffer.extendleft(reversed(retry))
+            requeued = sum(len(rows) for _, rows, _ in retry)
+            self.stats["retried"] += requeued
+            self.stats["failed"] += taken - requeued
+            logger.error(
+                f"❌ Failed to persist batch of {taken} rows ({requeued} queued for retry): {e}"
+            )
+            taken -= requeued
+            success = False
+        else:
+            success = True
+
+        async with self.space_available:
+            self.pending_rows -= taken
+            self.space_available.notify_all()
+        return success
+
+
+def crisis_response_rows(prediction: Dict, results: Dict, timings: Dict) -> Dict[type, List[Dict]]:
+    """
+    Map a crisis response (agent name -> result or exception) to table rows
+    """
+    # The persisted Prediction's key, not the agent's short display id
+    prediction_id = prediction.get("record_id")
+    details = {"prediction_id": prediction_id, "region": prediction.get("region")}
+    now = datetime.utcnow()
+    rows: Dict[type, List[Dict]] = {}
+
+    resources = results.get("resource")
+    if isinstance(resources, dict):
+        rows[Resource] = [{
+            "prediction_id": prediction_id,
+            "timestamp": now,
+            "nurses_needed": resources["nurses_needed"],
+            "doctors_needed": resources["doctors_needed"],
+            "nebulizers": resources["nebulizers"],
+            "oxygen_cylinders": resources["oxygen_cylinders"],
+            "n95_masks": resources["n95_masks"],
+            "ventilators": resources["ventilators"],
+            "estimated_cost": resources["estimated_cost"],
+            "allocation_strategy": resources["allocation_strategy"]
+        }]
+
+    insurance = results.get("insurance")
+    if isinstance(insurance, dict):
+        rows[InsurancePreAuth] = [
+            {
+                "prediction_id": prediction_id,
+                "timestamp": now,
+                "patient_count": auth["patients"],
+                "insurance_provider": auth["provider"],
+                "treatment_type": ", ".join(auth["treatments"]),
+                "estimated_cost": auth["estimated_cost"],
+                "status": auth["status"],
+                "approval_rate": round(auth["approved"] / auth["patients"] * 100, 1) if auth["patients"] else 0
+            }
+            for auth in insurance["authorizations"]
+        ]
+
+    staff = results.get("reverse911")
+    if isinstance(staff, dict):
+        rows[StaffActivation] = [
+            {
+                "prediction_id": prediction_id,
+                "staff_id": activation["staff_id"],
+                "timestamp": now,
+                "shift_date": activation["shift_date"],
+                "shift_duration": activation["shift_duration"],
+                "compensation": activation["compensation"],
+                "status": activation["status"],
+                "response_time": activation["response_time"]
+            }
+            for activation in staff["activations"]
+        ]
+
+    supply = results.get("pharmaceutical")
+    if isinstance(supply, dict):
+        stock_by_medicine: Dict[str, int] = {}
+        for item in supply["regional_inventory"]:
+            stock_by_medicine[item["medicine"]] = stock_by_medicine.get(item["medicine"], 0) + item["current_stock"]
+        rows[PharmaceuticalAlert] = [
+            {
+                "prediction_id": prediction_id,
+                "timestamp": now,
+                "medicine_name": alert["medicine"],
+                "required_quantity": alert["requested_quantity"],
+                "current_stock": stock_by_medicine.get(alert["medicine"], 0),
+                "partner_company": alert["partner_company"],
+                "production_status": alert["production_status"],
+                "estimated_delivery": alert["estimated_ready"]
+            }
+            for alert in supply["partner_alerts"]
+        ]
+
+    advisory = results.get("communication")
+    if isinstance(advisory, dict):
+        rows[CommunicationLog] = [
+            {
+                "prediction_id": prediction_id,
+                "timestamp": now,
+                "message_type": "advisory",
+                "channel": distribution["channel"],
+                "recipients_count": distribution["recipients"],
+                "content": advisory["advisory_text"],
+                "language": distribution["language"],
+                "sent_successfully": distribution["sent"]
+            }
+            for distribution in advisory["distributions"]
+        ]
+
+    rows[AgentLog] = [
+        {
+            "timestamp": now,
+            "agent_name": name,
+            "action": "crisis_response",
+            "status": "failure" if isinstance(result, Exception) else "success",
+            "details": {**details, "error": str(result)} if isinstance(result, Exception) else details,
+            "execution_time": timings.get(name)
+        }
+        for name, result in results.items()
+    ]
+    return rows
+
+
+def agent_log_sampler(queue: PersistenceQueue, rate: float) -> Callable[[str, float, str], None]:
+    """
+    Span sink that writes a random `rate` fraction of finished spans to
+    AgentLog, dropping samples rather than waiting when the queue is full
+    """
+    def sample(name: str, seconds: float, outcome: str):
+        if random.random() >= rate:
+            return
+        agent, _, action = name.partition(".")
+        queue.enqueue_nowait(AgentLog, [{
+            "timestamp": datetime.utcnow(),
+            "agent_name": agent,
+            "action": action or name,
+            "status": "success" if outcome == "ok" else "failure",
+            "details": {"span": name, "sampled": True},
+            "execution_time": seconds
+        }])
+    return sample
@@ -8,6 +8,9 @@ from datetime import datetime, timedelta
 from typing import Dict, List
 import logging
 
+from utils.clock import utcnow
+from utils.metrics import traced
+
 logger = logging.getLogger(__name__)
 
 class PharmaceuticalAgent:
@@ -15,7 +18,9 @@ class PharmaceuticalAgent:
     Coordinates medicine supply chain and prevents stockouts
     """
     
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        # Injected RNG makes seeded simulation runs reproducible
+        self.rng = rng or random.Random()
         self.partner_companies = [
             "Cipla", "Sun Pharma", "Dr. Reddy's", "Lupin", "Torrent Pharma"
         ]
@@ -27,15 +32,17 @@ class PharmaceuticalAgent:
         
         logger.info("💊 Pharmaceutical AI Co-Pilot initialized")
     
-    async def coordinate_supply(self, prediction: Dict) -> Dict:
-        """Coordinate medicine supply for predicted surge"""
+    @traced("pharmaceutical.coordinate_supply")
+    async def coordinate_supply(self, prediction: Dict, resources: Dict) -> Dict:
+        """Coordinate medicine and consumable supply for predicted surge"""
         
         predicted_patients = prediction.get("predicted_patients", 200)
         primary_condition = prediction.get("primary_condition", "")
-        surge_date = prediction.get("surge_date", datetime.utcnow())
+        surge_date = prediction.get("surge_date", utcnow())
         
-        # Determine medicine requirements
+        # Determine medicine requirements, plus consumables from the resource plan
         medicine_requirements = self._calculate_medicine_needs(primary_condition, predicted_patients)
+        medicine_requirements = self._add_equipment_needs(medicine_requirements, resources)
         
         # Check regional inventory
         regional_inventory = self._check_regional_inventory(medicine_requirements)
@@ -58,7 +65,7 @@ class PharmaceuticalAgent:
             "shortage": shortage,
             "supply_status": "sufficient" if shortage == 0 else "shortage_detected",
             "estimated_delivery": surge_date - timedelta(hours=12),
-            "timestamp": datetime.utcnow(),
+            "timestamp": utcnow(),
             "status": "coordinating"
         }
         
@@ -104,13 +111,29 @@ class PharmaceuticalAgent:
         
         return requirements
     
+    def _add_equipment_needs(self, requirements: List[Dict], resources: Dict) -> List[Dict]:
+        """Source oxygen and masks in the quantities the resource agent allocated"""
+        
+        equipment = [
+            {"name": "Oxygen Supply", "quantity": resources["oxygen_cylinders"], "unit": "cylinders"},
+            {"name": "N95 Masks", "quantity": resources["n95_masks"], "unit": "masks"}
+        ]
+        names = {item["name"] for item in equipment}
+        
+        combined = [req for req in requirements if req["name"] not in names]
+        for item in equipment:
+            if item["quantity"] > 0:
+                combined.append({**item, "critical": True})
+        
+        return combined
+    
     def _check_regional_inventory(self, requirements: List[Dict]) -> List[Dict]:
         """Check medicine availability across regional hospitals"""
         
         inventory = []
         for req in requirements:
             for hospital in self.regional_hospitals:
-                current_stock = random.randint(0, req["quantity"])
+                current_stock = self.rng.randint(0, req["quantity"])
                 status = "sufficient" if current_stock >= req["quantity"] * 0.5 else "low"
                 
                 inventory.append({
@@ -130,18 +153,18 @@ class PharmaceuticalAgent:
         
         alerts = []
         for req in requirements:
-            company = random.choice(self.partner_companies)
-            production_capacity = int(req["quantity"] * random.uniform(1.2, 2.0))
+            company = self.rng.choice(self.partner_companies)
+            production_capacity = int(req["quantity"] * self.rng.uniform(1.2, 2.0))
             
             alert = {
                 "partner_company": company,
                 "medicine": req["name"],
                 "requested_quantity": req["quantity"],
                 "production_capacity": production_capacity,
-                "production_status": random.choice(["ramping_up", "confirmed", "processing"]),
-                "estimated_ready": surge_date - timedelta(hours=random.randint(12, 36)),
-                "confidence": random.uniform(0.85, 0.98),
-                "alerted_at": datetime.utcnow()
+                "production_status": self.rng.choice(["ramping_up", "confirmed", "processing"]),
+                "estimated_ready": surge_date - timedelta(hours=self.rng.randint(12, 36)),
+                "confidence": self.rng.uniform(0.85, 0.98),
+                "alerted_at": utcnow()
             }
             alerts.append(alert)
         
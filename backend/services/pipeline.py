@@ -0,0 +1,155 @@
+"""
+Pipeline DAG - Dependency-aware execution for agent pipelines
+Each node declares the values it consumes; nodes whose inputs are ready run
+concurrently, successful results are memoized per run key (e.g. prediction
+id) and every node's timing is recorded
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+class PipelineDependencyError(Exception):
+    """Raised for a node whose upstream node failed"""
+
+
+class PipelineNode:
+    """
+    One step of a pipeline: `func(*inputs)` produces the value named `output`
+    """
+
+    def __init__(self, name: str, func: Callable[..., Awaitable], inputs: Iterable[str] = (),
+                 output: str = None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.output = output or name
+
+
+class PipelineRun:
+    """
+    Results, timings and critical path of one pipeline execution
+    """
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.finished_at: Dict[str, float] = {}
+        self.memoized: List[str] = []
+        self.critical_path: List[str] = []
+        self.elapsed = 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            "timings_ms": {name: round(seconds * 1000, 1) for name, seconds in self.timings.items()},
+            "critical_path": self.critical_path,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "memoized": self.memoized
+        }
+
+
+class PipelineDAG:
+    """
+    Runs a set of nodes in dependency order with maximum concurrency
+    """
+
+    def __init__(self, nodes: List[PipelineNode], memo_size: int = 32):
+        self.nodes = {node.name: node for node in nodes}
+        self.producers = {node.output: node for node in nodes}
+        self.memo: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self.memo_size = memo_size
+        # Fail fast on cycles
+        self._topological_order()
+
+    async def run(self, inputs: Dict[str, Any], memo_key: Any = None) -> PipelineRun:
+        """
+        Execute every node. Node failures are captured as exception results;
+        nodes downstream of a failure get a PipelineDependencyError.
+        """
+        missing = {
+            name for node in self.nodes.values() for name in node.inputs
+            if name not in self.producers and name not in inputs
+        }
+        if missing:
+            raise ValueError(f"Pipeline inputs not provided: {', '.join(sorted(missing))}")
+
+        run = PipelineRun()
+        memo = self.memo.setdefault(memo_key, {}) if memo_key is not None else {}
+        if memo_key is not None:
+            self.memo.move_to_end(memo_key)
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+
+        started = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(node: PipelineNode):
+            upstream = [self.producers[name] for name in node.inputs if name in self.producers]
+            await asyncio.gather(*(tasks[dep.name] for dep in upstream), return_exceptions=True)
+
+            failed = [dep.name for dep in upstream if isinstance(run.results[dep.name], Exception)]
+            node_start = time.perf_counter()
+            if failed:
+                result = PipelineDependencyError(f"upstream node failed: {', '.join(failed)}")
+            elif node.name in memo:
+                result = memo[node.name]
+                run.memoized.append(node.name)
+            else:
+                args = [
+                    run.results[self.producers[name].name] if name in self.producers else inputs[name]
+                    for name in node.inputs
+                ]
+                try:
+                    result = await node.func(*args)
+                    memo[node.name] = result
+                except Exception as e:
+                    result = e
+
+            finished = time.perf_counter()
+            run.results[node.name] = result
+            run.timings[node.name] = finished - node_start
+            run.finished_at[node.name] = finished - started
+
+        for node in self._topological_order():
+            tasks[node.name] = asyncio.create_task(execute(node))
+        await asyncio.gather(*tasks.values())
+
+        run.elapsed = time.perf_counter() - started
+        run.critical_path = self._critical_path(run)
+        return run
+
+    def _critical_path(self, run: PipelineRun) -> List[str]:
+        """Walk back from the last node to finish through its latest input"""
+        if not run.finished_at:
+            return []
+        path = [max(run.finished_at, key=run.finished_at.get)]
+        while True:
+            upstream = [
+                self.producers[name].name for name in self.nodes[path[-1]].inputs
+                if name in self.producers
+            ]
+            if not upstream:
+                break
+            path.append(max(upstream, key=run.finished_at.get))
+        return list(reversed(path))
+
+    def _topological_order(self) -> List[PipelineNode]:
+        order: List[PipelineNode] = []
+        state: Dict[str, str] = {}
+
+        def visit(node: PipelineNode):
+            if state.get(node.name) == "done":
+                return
+            if state.get(node.name) == "visiting":
+                raise ValueError(f"Pipeline has a cycle through '{node.name}'")
+            state[node.name] = "visiting"
+            for name in node.inputs:
+                if name in self.producers:
+                    visit(self.producers[name])
+            state[node.name] = "done"
+            order.append(node)
+
+        for node in self.nodes.values():
+            visit(node)
+        return order
@@ -4,10 +4,14 @@ Predicts patient surges 48-72 hours in advance
 """
 
 import random
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Dict
 import logging
 
+from utils.clock import utcnow
+from utils.metrics import traced
+from utils.timeseries import TREND_WINDOW
+
 logger = logging.getLogger(__name__)
 
 class PredictionAgent:
@@ -15,11 +19,16 @@ class PredictionAgent:
     Uses ML models to predict patient surges
     """
     
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        # Injected RNG makes seeded simulation runs reproducible
+        self.rng = rng or random.Random()
         self.baseline_patients = 120
         self.prediction_accuracy = 0.87
+        # Recent readings per region (utils.timeseries), shared with surveillance
+        self.history = None
         logger.info("🔮 Prediction Agent initialized")
     
+    @traced("prediction.predict_surge")
     async def predict_surge(self, surveillance_data: Dict) -> Dict:
         """Predict patient surge based on surveillance data"""
         
@@ -28,28 +37,34 @@ class PredictionAgent:
         
         # Calculate surge multiplier based on threat level
         if threat_level == "CRITICAL":
-            surge_multiplier = random.uniform(2.5, 3.5)
+            surge_multiplier = self.rng.uniform(2.5, 3.5)
         elif threat_level == "HIGH":
-            surge_multiplier = random.uniform(1.8, 2.5)
+            surge_multiplier = self.rng.uniform(1.8, 2.5)
         elif threat_level == "MEDIUM":
-            surge_multiplier = random.uniform(1.3, 1.8)
+            surge_multiplier = self.rng.uniform(1.3, 1.8)
         else:
-            surge_multiplier = random.uniform(0.9, 1.2)
+            surge_multiplier = self.rng.uniform(0.9, 1.2)
+        
+        # Rising admissions over the recent window push the forecast up
+        aqi_trend, admission_trend = self._trends(surveillance_data)
+        if admission_trend and admission_trend["count"] >= 3 and admission_trend["slope_per_hour"] > 0:
+            surge_multiplier *= 1.1
         
         # Predict patient numbers
         predicted_patients = int(self.baseline_patients * surge_multiplier)
         surge_percentage = ((predicted_patients - self.baseline_patients) / self.baseline_patients) * 100
         
         # Determine primary condition
-        if aqi > 200:
+        peak_aqi = max(aqi, aqi_trend["p95"]) if aqi_trend else aqi
+        if peak_aqi > 200:
             primary_condition = "Respiratory Illness"
         elif surveillance_data.get("temperature", 25) < 18:
             primary_condition = "Viral Infections"
         else:
-            primary_condition = random.choice(["Respiratory Illness", "Cardiovascular", "Gastroenteritis"])
+            primary_condition = self.rng.choice(["Respiratory Illness", "Cardiovascular", "Gastroenteritis"])
         
         # Calculate confidence
-        confidence = random.uniform(0.75, 0.95)
+        confidence = self.rng.uniform(0.75, 0.95)
         
         # Determine alert level
         if surge_percentage > 150 and confidence > 0.8:
@@ -62,12 +77,12 @@ class PredictionAgent:
             alert_level = "LOW"
         
         # Surge date (48-72 hours from now)
-        hours_ahead = random.randint(48, 72)
-        surge_date = datetime.utcnow() + timedelta(hours=hours_ahead)
+        hours_ahead = self.rng.randint(48, 72)
+        surge_date = utcnow() + timedelta(hours=hours_ahead)
         
         prediction = {
-            "id": random.randint(1000, 9999),
-            "timestamp": datetime.utcnow(),
+            "id": self.rng.randint(1000, 9999),
+            "timestamp": utcnow(),
             "surge_date": surge_date,
             "predicted_patients": predicted_patients,
             "baseline_patients": self.baseline_patients,
@@ -79,7 +94,9 @@ class PredictionAgent:
                 "aqi": surveillance_data.get("aqi"),
                 "temperature": surveillance_data.get("temperature"),
                 "events": surveillance_data.get("events"),
-                "social_sentiment_score": surveillance_data.get("social_sentiment", {}).get("sentiment_score")
+                "social_sentiment_score": surveillance_data.get("social_sentiment", {}).get("sentiment_score"),
+                "aqi_trend_per_hour": round(aqi_trend["slope_per_hour"], 2) if aqi_trend else None,
+                "admission_trend_per_hour": round(admission_trend["slope_per_hour"], 2) if admission_trend else None
             }
         }
         
@@ -89,3 +106,12 @@ class PredictionAgent:
         )
         
         return prediction
+    
+    def _trends(self, surveillance_data: Dict):
+        """Recent AQI and admission-rate statistics for the scanned region"""
+        region = surveillance_data.get("region")
+        if self.history is None or not region:
+            return None, None
+        now = surveillance_data.get("timestamp")
+        return (self.history.stats(region, "aqi", TREND_WINDOW, now),
+                self.history.stats(region, "admission_rate", TREND_WINDOW, now))
@@ -0,0 +1,97 @@
+"""
+Prediction Gate - Skip re-predicting when a region's inputs haven't changed
+Fingerprints the quantized features prediction depends on; while a region's
+fingerprint matches its last prediction (and that prediction is recent
+enough) the cached prediction stands and prediction and response are skipped
+"""
+
+import math
+from typing import Dict, Hashable, Optional, Tuple
+import logging
+
+from utils.clock import utcnow
+from utils.metrics import registry
+from utils.timeseries import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+# Band widths inputs are quantized to; override with MEDISURGE_PREDICTION_GATE_STEPS
+DEFAULT_STEPS: Dict[str, float] = {"aqi": 25, "temperature": 2, "mentions": 100}
+
+gate_lookups = registry.counter("medisurge_prediction_gate_total", "Prediction gate lookups by outcome")
+
+
+def _band(value: Optional[float], step: float) -> Optional[int]:
+    if value is None:
+        return None
+    return math.floor(value / step)
+
+
+def fingerprint(surveillance_data: Dict, steps: Dict[str, float] = DEFAULT_STEPS) -> Tuple[Hashable, ...]:
+    """The quantized inputs a prediction depends on"""
+    events = surveillance_data.get("events") or {}
+    sentiment = surveillance_data.get("social_sentiment") or {}
+    admissions = surveillance_data.get("admission_patterns") or {}
+    admission_trend = (surveillance_data.get("trends") or {}).get("admission_rate") or {}
+    return (
+        surveillance_data.get("threat_level"),
+        _band(surveillance_data.get("aqi"), steps["aqi"]),
+        _band(surveillance_data.get("temperature"), steps["temperature"]),
+        events.get("days_until") if events.get("upcoming") else None,
+        _band(sentiment.get("breathing_difficulty_mentions"), steps["mentions"]),
+        admissions.get("trend"),
+        admission_trend.get("count", 0) >= 3 and admission_trend.get("slope_per_hour", 0) > 0
+    )
+
+
+class PredictionGate:
+    """
+    Last prediction per region with the fingerprint it was made from.
+    `max_age` (seconds) forces a fresh prediction eventually; 0 disables the gate.
+    """
+
+    def __init__(self, max_age: float = 1800, steps: Dict[str, float] = None):
+        self.max_age = max_age
+        self.steps = {**DEFAULT_STEPS, **(steps or {})}
+        # region -> (fingerprint, prediction, stored at)
+        self.entries: Dict[str, Tuple[Tuple, Dict, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, region: str, surveillance_data: Dict) -> Optional[Dict]:
+        """The region's cached prediction if its inputs are materially unchanged"""
+        entry = self.entries.get(region)
+        if (self.max_age > 0 and entry is not None
+                and entry[0] == fingerprint(surveillance_data, self.steps)
+                and epoch_seconds(utcnow()) - entry[2] < self.max_age):
+            self.hits += 1
+            gate_lookups.inc(outcome="hit")
+            return entry[1]
+        self.misses += 1
+        gate_lookups.inc(outcome="miss")
+        return None
+
+    def store(self, region: str, surveillance_data: Dict, prediction: Dict):
+        """Remember a prediction once its response has gone out"""
+        if self.max_age > 0:
+            self.entries[region] = (fingerprint(surveillance_data, self.steps), prediction, epoch_seconds(utcnow()))
+
+    def forget(self, region: str):
+        """Drop a region's entry, e.g. once its threat falls below prediction"""
+        self.entries.pop(region, None)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 3) if lookups else 0.0
+
+    def get_stats(self) -> Dict:
+        return {
+            "enabled": self.max_age > 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "regions": len(self.entries),
+            "max_age_seconds": self.max_age,
+            "steps": dict(self.steps)
+        }
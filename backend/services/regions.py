@@ -0,0 +1,79 @@
+"""
+Regional pipelines - Per-city state for sharded orchestration
+Each monitored city or ward runs its own surveillance -> prediction ->
+response pipeline with its own schedule, state and metrics
+"""
+
+import random
+import re
+from datetime import datetime
+from typing import Dict, List
+
+from services.scheduler import AdaptiveScheduler
+
+STAGES = ("surveillance", "prediction", "response")
+
+
+def region_slug(name: str) -> str:
+    """Normalise a city/ward name into a topic-safe region id"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def parse_regions(spec: str) -> List[str]:
+    """Parse "mumbai,pune,delhi-south" into unique region ids, keeping order"""
+    regions = []
+    for name in spec.split(","):
+        slug = region_slug(name)
+        if slug and slug not in regions:
+            regions.append(slug)
+    return regions
+
+
+class RegionState:
+    """
+    Schedule, latest readings and counters for one regional pipeline
+    """
+
+    def __init__(self, region_id: str, rng: random.Random = None):
+        self.region_id = region_id
+        self.scheduler = AdaptiveScheduler(rng=rng)
+
+        self.threat_level = None
+        self.alert_level = None
+        self.last_scan = None
+        self.last_prediction_id = None
+
+        self.scans = 0
+        self.predictions = 0
+        self.predictions_reused = 0
+        self.responses = 0
+        self.errors = 0
+        self.stage_ms: Dict[str, float] = {}
+
+    def record_scan(self, surveillance_data: Dict):
+        self.scans += 1
+        self.threat_level = surveillance_data["threat_level"]
+        self.last_scan = surveillance_data["timestamp"]
+
+    def record_prediction(self, prediction: Dict):
+        self.predictions += 1
+        self.alert_level = prediction["alert_level"]
+        self.last_prediction_id = prediction["id"]
+
+    def record_stage(self, stage: str, seconds: float):
+        self.stage_ms[stage] = round(seconds * 1000, 1)
+
+    def get_stats(self) -> Dict:
+        return {
+            "threat_level": self.threat_level,
+            "alert_level": self.alert_level,
+            "last_scan": self.last_scan.isoformat() if isinstance(self.last_scan, datetime) else self.last_scan,
+            "last_prediction_id": self.last_prediction_id,
+            "scans": self.scans,
+            "predictions": self.predictions,
+            "predictions_reused": self.predictions_reused,
+            "responses": self.responses,
+            "errors": self.errors,
+            "stage_ms": dict(self.stage_ms),
+            "scheduler": self.scheduler.get_stats()
+        }
@@ -0,0 +1,213 @@
+"""
+Agent Resilience - Deadlines, retries, hedging and circuit breakers
+Wraps agent calls so a hung or failing agent costs at most its own budget
+and is short-circuited after repeated failures until a probe succeeds
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class AgentTimeoutError(Exception):
+    """An agent used up its deadline"""
+
+
+class CircuitOpenError(Exception):
+    """An agent's circuit breaker is rejecting calls"""
+
+
+class DeadlineExceeded(Exception):
+    """Internal: a call's overall deadline ran out mid-attempt"""
+
+
+class AgentPolicy:
+    """
+    How to call one agent. `deadline` bounds the whole call, retries
+    included; `hedge_after` (idempotent agents only) starts a duplicate
+    attempt if the first hasn't answered by then.
+    """
+
+    def __init__(self, deadline: float = 10.0, retries: int = 2, backoff: float = 0.2,
+                 hedge_after: Optional[float] = None):
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge_after = hedge_after
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, then lets a single
+    probe call through once `recovery_timeout` has passed
+    """
+
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class AgentSupervisor:
+    """
+    Applies a policy and a circuit breaker to every call of each agent
+    """
+
+    def __init__(self, policies: Dict[str, AgentPolicy], failure_threshold: int = 3,
+                 recovery_timeout: float = 60.0):
+        self.policies = policies
+        self.breakers = {
+            name: CircuitBreaker(failure_threshold, recovery_timeout) for name in policies
+        }
+        self.last_error: Dict[str, Optional[str]] = {name: None for name in policies}
+        self.stats = {name: {"calls": 0, "failures": 0, "retries": 0, "hedges": 0, "rejected": 0}
+                      for name in policies}
+
+    def wrap(self, name: str, func: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        """Return `func` guarded by the named agent's policy and breaker"""
+        async def guarded(*args):
+            return await self.call(name, func, *args)
+        return guarded
+
+    async def call(self, name: str, func: Callable[..., Awaitable], *args) -> Any:
+        policy, breaker, stats = self.policies[name], self.breakers[name], self.stats[name]
+        if not breaker.allow():
+            stats["rejected"] += 1
+            raise CircuitOpenError(f"{name} circuit is open after {breaker.consecutive_failures} failures")
+
+        stats["calls"] += 1
+        try:
+            return await self._call_with_retries(name, func, args, policy)
+        finally:
+            # A cancelled probe must not leave the breaker stuck half-open
+            breaker.probe_in_flight = False
+
+    async def _call_with_retries(self, name: str, func: Callable[..., Awaitable], args: tuple,
+                                 policy: AgentPolicy) -> Any:
+        breaker, stats = self.breakers[name], self.stats[name]
+        deadline = time.monotonic() + policy.deadline
+        error: Exception = None
+        for attempt in range(policy.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if attempt:
+                stats["retries"] += 1
+            try:
+                result = await self._within_deadline(self._attempt(name, func, args, policy), remaining)
+                breaker.record_success()
+                self.last_error[name] = None
+                return result
+            except DeadlineExceeded:
+                break
+            except Exception as e:
+                error = e
+                logger.warning(f"⚠️ {name} attempt {attempt + 1} failed: {e}")
+                delay = min(policy.backoff * 2 ** attempt, deadline - time.monotonic())
+                if attempt < policy.retries and delay > 0:
+                    await asyncio.sleep(delay)
+
+        if error is None:
+            error = AgentTimeoutError(f"{name} exceeded its {policy.deadline:.1f}s deadline")
+        stats["failures"] += 1
+        breaker.record_failure()
+        self.last_error[name] = str(error)
+        raise error
+
+    @staticmethod
+    async def _within_deadline(attempt: Awaitable, remaining: float) -> Any:
+        """
+        Await an attempt for at most `remaining` seconds. Running out raises
+        DeadlineExceeded, so a TimeoutError raised by the agent itself (a slow
+        source, say) stays an ordinary, retryable failure.
+        """
+        task = asyncio.ensure_future(attempt)
+        try:
+            done, _ = await asyncio.wait({task}, timeout=remaining)
+        finally:
+            if not task.done():
+                task.cancel()
+        if not done:
+            raise DeadlineExceeded()
+        return task.result()
+
+    async def _attempt(self, name: str, func: Callable[..., Awaitable], args: tuple,
+                       policy: AgentPolicy) -> Any:
+        """One attempt, hedged with a second concurrent call if configured"""
+        if policy.hedge_after is None:
+            return await func(*args)
+
+        attempts = [asyncio.ensure_future(func(*args))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=policy.hedge_after)
+            if not done:
+                self.stats[name]["hedges"] += 1
+                attempts.append(asyncio.ensure_future(func(*args)))
+                pending = set(attempts)
+                # First success wins; a failure only counts once no attempt is left
+                while True:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for attempt in done:
+                        if attempt.exception() is None:
+                            return attempt.result()
+                    if not pending:
+                        break
+            return done.pop().result()
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    def status(self, name: str) -> str:
+        """active, degraded (last call failed), circuit_open or recovering"""
+        state = self.breakers[name].state
+        if state == OPEN:
+            return "circuit_open"
+        if state == HALF_OPEN:
+            return "recovering"
+        return "degraded" if self.last_error[name] else "active"
+
+    def degraded(self) -> List[str]:
+        return [name for name in self.policies if self.status(name) != "active"]
+
+    def get_stats(self) -> Dict:
+        return {
+            name: {
+                "status": self.status(name),
+                "deadline": self.policies[name].deadline,
+                "last_error": self.last_error[name],
+                **self.stats[name]
+            }
+            for name in self.policies
+        }
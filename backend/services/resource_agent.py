@@ -7,6 +7,8 @@ import random
 from typing import Dict
 import logging
 
+from utils.metrics import traced
+
 logger = logging.getLogger(__name__)
 
 class ResourceAgent:
@@ -27,6 +29,7 @@ class ResourceAgent:
         }
         logger.info("📦 Resource Agent initialized")
     
+    @traced("resource.allocate_resources")
     async def allocate_resources(self, prediction: Dict) -> Dict:
         """Calculate resource requirements for predicted surge"""
         
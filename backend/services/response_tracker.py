@@ -0,0 +1,151 @@
+"""
+Response Tracker - Incremental re-response for ongoing surges
+Keeps the active response per region and surge window, compares each new
+prediction with what has already been committed and decides whether to
+run a full response, a top-up, or nothing at all
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from utils.clock import utcnow
+
+FULL = "full"
+TOP_UP = "top_up"
+NO_CHANGE = "no_change"
+
+
+class ActiveResponse:
+    """
+    What has been dispatched so far for one surge window
+    """
+
+    def __init__(self, region: str, prediction: Dict):
+        self.region = region
+        self.surge_date: datetime = prediction["surge_date"]
+        self.primary_condition = prediction["primary_condition"]
+        self.committed_patients = 0
+        self.activated_staff_ids: set = set()
+        self.prediction_ids: List[int] = []
+        self.top_ups = 0
+        self.started_at = utcnow()
+        self.updated_at = self.started_at
+
+    def get_stats(self) -> Dict:
+        return {
+            "surge_date": self.surge_date.isoformat(),
+            "primary_condition": self.primary_condition,
+            "committed_patients": self.committed_patients,
+            "activated_staff": len(self.activated_staff_ids),
+            "predictions": len(self.prediction_ids),
+            "top_ups": self.top_ups,
+            "started_at": self.started_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+
+
+class ResponsePlan:
+    """
+    The work to dispatch for a prediction: `work_order` is the prediction
+    handed to the response agents (only the extra patients for a top-up)
+    """
+
+    def __init__(self, mode: str, prediction: Dict, work_order: Optional[Dict] = None,
+                 delta: Optional[Dict] = None):
+        self.mode = mode
+        self.prediction = prediction
+        self.work_order = work_order
+        self.delta = delta or {}
+        # Set once dispatched: True only if a resource plan went out and no agent failed
+        self.succeeded = False
+
+
+class ResponseTracker:
+    """
+    Diffs new predictions against the active response for their surge window
+    """
+
+    def __init__(self, window_hours: float = 24, min_top_up_patients: int = 10):
+        self.window = timedelta(hours=window_hours)
+        self.min_top_up_patients = min_top_up_patients
+        self.active: Dict[str, ActiveResponse] = {}
+        self.stats = {FULL: 0, TOP_UP: 0, NO_CHANGE: 0, "advisories_suppressed": 0}
+
+    def plan(self, prediction: Dict) -> ResponsePlan:
+        """Decide how much work a new prediction needs"""
+        region = prediction.get("region")
+        active = self._current(region, prediction)
+
+        if active is None:
+            return ResponsePlan(FULL, prediction, work_order=prediction, delta={"reason": "new surge window"})
+
+        if prediction["primary_condition"] != active.primary_condition:
+            # Different treatments, medicines, specialists and advice: start over
+            return ResponsePlan(FULL, prediction, work_order=prediction, delta={
+                "reason": "condition changed",
+                "previous_condition": active.primary_condition,
+                "primary_condition": prediction["primary_condition"]
+            })
+
+        additional = prediction["predicted_patients"] - active.committed_patients
+        delta = {"additional_patients": additional, "committed_patients": active.committed_patients}
+        if additional < self.min_top_up_patients:
+            return ResponsePlan(NO_CHANGE, prediction, delta=delta)
+
+        work_order = {
+            **prediction,
+            "predicted_patients": additional,
+            "baseline_patients": 0,
+            "response_mode": TOP_UP,
+            "already_activated_staff": sorted(active.activated_staff_ids)
+        }
+        return ResponsePlan(TOP_UP, prediction, work_order=work_order, delta=delta)
+
+    def record(self, plan: ResponsePlan, results: Dict):
+        """Fold dispatched work into the active response"""
+        self.stats[plan.mode] += 1
+        if plan.mode == TOP_UP:
+            self.stats["advisories_suppressed"] += 1
+        if plan.mode == NO_CHANGE:
+            return
+        if not isinstance(results.get("resource"), dict):
+            # Nothing was planned, so nothing counts as committed
+            return
+
+        prediction = plan.prediction
+        region = prediction.get("region")
+        if plan.mode == FULL:
+            self.active[region] = ActiveResponse(region, prediction)
+        active = self.active[region]
+
+        active.committed_patients += plan.work_order["predicted_patients"]
+        active.prediction_ids.append(prediction["id"])
+        active.updated_at = utcnow()
+        if plan.mode == TOP_UP:
+            active.top_ups += 1
+
+        staff = results.get("reverse911")
+        if isinstance(staff, dict):
+            active.activated_staff_ids.update(
+                activation["staff_id"] for activation in staff["activations"]
+                if activation["status"] != "declined"
+            )
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "active": {region: response.get_stats() for region, response in self.active.items()}
+        }
+
+    def _current(self, region: str, prediction: Dict) -> Optional[ActiveResponse]:
+        """The active response covering this prediction's surge window, if any"""
+        active = self.active.get(region)
+        if active is None:
+            return None
+        if utcnow() > active.surge_date + self.window:
+            # The surge has passed
+            del self.active[region]
+            return None
+        if abs(prediction["surge_date"] - active.surge_date) > self.window:
+            return None
+        return active
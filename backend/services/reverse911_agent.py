@@ -4,10 +4,12 @@ Activates retired healthcare workers during predicted surges
 """
 
 import random
-from datetime import datetime, timedelta
 from typing import Dict, List
 import logging
 
+from utils.clock import utcnow
+from utils.metrics import traced
+
 logger = logging.getLogger(__name__)
 
 class Reverse911Agent:
@@ -15,7 +17,9 @@ class Reverse911Agent:
     Activates retired medical professionals for crisis support
     """
     
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        # Injected RNG makes seeded simulation runs reproducible
+        self.rng = rng or random.Random()
         # Dummy retired staff database
         self.retired_staff_db = self._generate_staff_database()
         logger.info("👨‍⚕️ Reverse 911 Agent initialized with retired staff database")
@@ -37,37 +41,39 @@ class Reverse911Agent:
         for i in range(50):
             staff.append({
                 "id": i + 1,
-                "name": f"{random.choice(first_names)} {random.choice(last_names)}",
-                "specialization": random.choice(specializations),
-                "phone": f"+91-{random.randint(7000000000, 9999999999)}",
+                "name": f"{self.rng.choice(first_names)} {self.rng.choice(last_names)}",
+                "specialization": self.rng.choice(specializations),
+                "phone": f"+91-{self.rng.randint(7000000000, 9999999999)}",
                 "email": f"doctor{i+1}@retired.com",
-                "distance_km": round(random.uniform(1, 15), 1),
-                "crisis_hero_score": random.randint(50, 500),
-                "availability": random.choice([True, True, True, False]),  # 75% available
-                "last_response_time": round(random.uniform(0.5, 6), 1),  # hours
-                "total_activations": random.randint(5, 50)
+                "distance_km": round(self.rng.uniform(1, 15), 1),
+                "crisis_hero_score": self.rng.randint(50, 500),
+                "availability": self.rng.choice([True, True, True, False]),  # 75% available
+                "last_response_time": round(self.rng.uniform(0.5, 6), 1),  # hours
+                "total_activations": self.rng.randint(5, 50)
             })
         
         # Sort by crisis hero score (best responders first)
         staff.sort(key=lambda x: x["crisis_hero_score"], reverse=True)
         return staff
     
-    async def activate_staff(self, prediction: Dict) -> Dict:
-        """Activate retired staff for predicted surge"""
+    @traced("reverse911.activate_staff")
+    async def activate_staff(self, prediction: Dict, resources: Dict) -> Dict:
+        """Activate retired staff for predicted surge, sized by the resource plan"""
         
-        predicted_patients = prediction.get("predicted_patients", 200)
         primary_condition = prediction.get("primary_condition", "")
-        surge_date = prediction.get("surge_date", datetime.utcnow())
+        surge_date = prediction.get("surge_date", utcnow())
         
-        # Calculate staff needed (from resource agent calculations)
-        doctors_needed = max(5, int(predicted_patients * 0.015))
-        nurses_needed = max(10, int(predicted_patients * 0.035))
+        # Staff needed comes from the resource agent's allocation
+        doctors_needed = resources["doctors_needed"]
+        nurses_needed = resources["nurses_needed"]
         
-        # Filter staff by specialization relevance
+        # Filter staff by specialization relevance, skipping anyone already activated for this surge
         relevant_specializations = self._get_relevant_specializations(primary_condition)
+        already_activated = set(prediction.get("already_activated_staff", ()))
         relevant_staff = [
             s for s in self.retired_staff_db 
             if s["specialization"] in relevant_specializations and s["availability"]
+            and s["id"] not in already_activated
         ]
         
         # Select top candidates
@@ -76,7 +82,7 @@ class Reverse911Agent:
         # Send activation requests
         activations = []
         for staff in candidates[:doctors_needed + nurses_needed]:
-            shift_duration = random.choice([4, 6, 8])
+            shift_duration = self.rng.choice([4, 6, 8])
             compensation = shift_duration * 1333  # ₹8,000 for 6 hours
             
             activation = {
@@ -88,9 +94,9 @@ class Reverse911Agent:
                 "shift_date": surge_date,
                 "shift_duration": shift_duration,
                 "compensation": compensation,
-                "status": random.choice(["confirmed", "confirmed", "pending", "declined"]),
-                "response_time": round(random.uniform(0.5, 3), 1),
-                "sent_at": datetime.utcnow()
+                "status": self.rng.choice(["confirmed", "confirmed", "pending", "declined"]),
+                "response_time": round(self.rng.uniform(0.5, 3), 1),
+                "sent_at": utcnow()
             }
             activations.append(activation)
         
@@ -98,6 +104,7 @@ class Reverse911Agent:
         confirmed = len([a for a in activations if a["status"] == "confirmed"])
         pending = len([a for a in activations if a["status"] == "pending"])
         declined = len([a for a in activations if a["status"] == "declined"])
+        coverage_rate = round((confirmed / (doctors_needed + nurses_needed)) * 100, 1)
         
         result = {
             "prediction_id": prediction.get("id"),
@@ -107,9 +114,9 @@ class Reverse911Agent:
             "confirmed": confirmed,
             "pending": pending,
             "declined": declined,
-            "coverage_rate": round((confirmed / (doctors_needed + nurses_needed)) * 100, 1),
+            "coverage_rate": coverage_rate,
             "activations": activations,
-            "timestamp": datetime.utcnow(),
+            "timestamp": utcnow(),
             "status": "active"
         }
         
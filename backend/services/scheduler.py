@@ -0,0 +1,101 @@
+"""
+Adaptive Scheduler - Threat-aware pacing for the monitoring loop
+Scans come faster as the threat level rises, back off while readings stay
+LOW, back off exponentially on errors, and can be triggered on demand
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds between scans at each threat level
+DEFAULT_INTERVALS = {
+    "CRITICAL": 60,
+    "HIGH": 180,
+    "MEDIUM": 450,
+    "LOW": 900
+}
+
+
+class AdaptiveScheduler:
+    """
+    Decides how long the monitoring loop sleeps before the next scan
+    """
+
+    def __init__(self, intervals: Dict[str, float] = None, low_backoff: float = 1.5,
+                 max_interval: float = 3600, jitter: float = 0.1,
+                 error_base: float = 30, error_max: float = 900, rng: random.Random = None):
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.low_backoff = low_backoff
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.error_base = error_base
+        self.error_max = error_max
+        self.rng = rng or random.Random()
+
+        self.consecutive_low = 0
+        self.consecutive_errors = 0
+        self.last_threat_level = None
+        self.next_scan_at = None
+        self.triggered_scans = 0
+        self.wakeup = asyncio.Event()
+        self.trigger_reason = None
+
+    def next_delay(self, threat_level: str) -> float:
+        """Delay after a successful scan at the given threat level"""
+        self.consecutive_errors = 0
+        self.last_threat_level = threat_level
+        interval = self.intervals.get(threat_level, self.intervals["LOW"])
+
+        if threat_level == "LOW":
+            # Stretch quiet periods, one step per consecutive LOW reading
+            interval *= self.low_backoff ** self.consecutive_low
+            # Stop stepping once capped, so a long quiet spell can't overflow
+            if interval < self.max_interval:
+                self.consecutive_low += 1
+        else:
+            self.consecutive_low = 0
+
+        return self._with_jitter(min(interval, self.max_interval))
+
+    def error_delay(self) -> float:
+        """Delay after a failed scan, doubling with each consecutive failure"""
+        self.consecutive_errors += 1
+        interval = self.error_base * 2 ** (self.consecutive_errors - 1)
+        return self._with_jitter(min(interval, self.error_max))
+
+    def trigger(self, reason: str = "manual"):
+        """Wake the loop for an immediate out-of-band scan"""
+        self.trigger_reason = reason
+        self.wakeup.set()
+
+    async def wait(self, delay: float) -> str:
+        """Sleep for `delay` seconds or until triggered, returns why it woke"""
+        self.next_scan_at = time.time() + delay
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            return "scheduled"
+        finally:
+            self.next_scan_at = None
+
+        self.wakeup.clear()
+        self.triggered_scans += 1
+        reason, self.trigger_reason = self.trigger_reason, None
+        return reason or "manual"
+
+    def get_stats(self) -> Dict:
+        return {
+            "last_threat_level": self.last_threat_level,
+            "next_scan_in": round(self.next_scan_at - time.time(), 1) if self.next_scan_at else None,
+            "consecutive_low": self.consecutive_low,
+            "consecutive_errors": self.consecutive_errors,
+            "triggered_scans": self.triggered_scans
+        }
+
+    def _with_jitter(self, interval: float) -> float:
+        return interval * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
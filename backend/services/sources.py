@@ -0,0 +1,258 @@
+"""
+Data Sources - Pluggable adapters for the feeds surveillance watches
+Every source is fetched concurrently under its own timeout and cached per
+region with its own TTL; stale values are served while a refresh runs in
+the background, and HTTP sources share one pooled connection client
+"""
+
+import asyncio
+import random
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+import httpx
+
+from utils.clock import utcnow
+from utils.timeseries import epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+# name: (ttl seconds, timeout seconds, required for a scan)
+SOURCE_DEFAULTS: Dict[str, Tuple[float, float, bool]] = {
+    "weather_api": (600, 5.0, True),
+    "aqi_monitor": (60, 5.0, True),
+    "festival_calendar": (86400, 2.0, False),
+    "social_media": (300, 2.0, False),
+    "hospital_admissions": (300, 2.0, False),
+    "epidemic_tracker": (3600, 2.0, False),
+}
+
+
+class SourceUnavailable(Exception):
+    """A required source failed and has no cached value to fall back on"""
+
+
+class Source(ABC):
+    """
+    One upstream feed. `ttl` is how long a value stays fresh, after which it
+    is still served for `stale_for` more seconds while being refreshed.
+    """
+
+    def __init__(self, name: str, ttl: float, timeout: float, required: bool = False,
+                 stale_for: Optional[float] = None):
+        self.name = name
+        self.ttl = ttl
+        self.timeout = timeout
+        self.required = required
+        self.stale_for = ttl if stale_for is None else stale_for
+
+    @abstractmethod
+    async def fetch(self, region: str, client: Optional[httpx.AsyncClient]) -> Dict:
+        """The source's current value for a region"""
+
+
+class SimulatedSource(Source):
+    """Generates plausible values in-process (the default without real feeds)"""
+
+    def __init__(self, name: str, generate: Callable[[], Dict], **kwargs):
+        super().__init__(name, **kwargs)
+        self.generate = generate
+
+    async def fetch(self, region: str, client: Optional[httpx.AsyncClient]) -> Dict:
+        return self.generate()
+
+
+class HTTPSource(Source):
+    """GETs `{url}?region=<region>` and expects the same JSON shape as the simulated source"""
+
+    def __init__(self, name: str, url: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.url = url
+
+    async def fetch(self, region: str, client: Optional[httpx.AsyncClient]) -> Dict:
+        response = await client.get(self.url, params={"region": region}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+def simulated_sources(rng: random.Random, ttls: Dict[str, float] = None,
+                      timeouts: Dict[str, float] = None) -> List[Source]:
+    """The dummy feeds surveillance has always generated, one adapter each"""
+    festivals = ["Diwali", "Holi", "Dussehra", "New Year"]
+
+    def weather():
+        return {"temperature": rng.uniform(15, 35), "humidity": rng.uniform(40, 85)}
+
+    def aqi():
+        return {"aqi": rng.uniform(50, 300)}
+
+    def festival_calendar():
+        # Randomly determine if festival is upcoming
+        days_until_festival = rng.randint(0, 10)
+        if days_until_festival <= 3:
+            return {"upcoming": True, "name": rng.choice(festivals), "days_until": days_until_festival}
+        return {"upcoming": False, "name": None, "days_until": None}
+
+    def social_media():
+        return {
+            "breathing_difficulty_mentions": rng.randint(0, 1000),
+            "hospital_queries": rng.randint(0, 500),
+            "sentiment_score": rng.uniform(-1, 1)
+        }
+
+    def hospital_admissions():
+        return {
+            "current_rate": rng.randint(80, 150),
+            "baseline": 100,
+            "trend": rng.choice(["increasing", "stable", "decreasing"])
+        }
+
+    def epidemic_tracker():
+        return {"active_alerts": rng.randint(0, 3)}
+
+    generators = {
+        "weather_api": weather, "aqi_monitor": aqi, "festival_calendar": festival_calendar,
+        "social_media": social_media, "hospital_admissions": hospital_admissions,
+        "epidemic_tracker": epidemic_tracker
+    }
+    return [SimulatedSource(name, generate, **_settings(name, ttls, timeouts))
+            for name, generate in generators.items()]
+
+
+def http_sources(base_url: str, ttls: Dict[str, float] = None,
+                 timeouts: Dict[str, float] = None) -> List[Source]:
+    """Every source served at `{base_url}/{name}`, e.g. by stub_sources.py"""
+    return [HTTPSource(name, f"{base_url.rstrip('/')}/{name}", **_settings(name, ttls, timeouts))
+            for name in SOURCE_DEFAULTS]
+
+
+def _settings(name: str, ttls: Optional[Dict[str, float]], timeouts: Optional[Dict[str, float]]) -> Dict:
+    ttl, timeout, required = SOURCE_DEFAULTS[name]
+    return {
+        "ttl": (ttls or {}).get(name, ttl),
+        "timeout": (timeouts or {}).get(name, timeout),
+        "required": required
+    }
+
+
+class SourceFetcher:
+    """
+    Fetches every source for a region at once. A scan waits only for the
+    required sources without a usable cached value, each for at most its own
+    timeout, so it costs the slowest of those rather than the sum of all.
+    """
+
+    def __init__(self, sources: Iterable[Source], client: Optional[httpx.AsyncClient] = None):
+        self.sources: Dict[str, Source] = {source.name: source for source in sources}
+        self.client = client
+        # (source, region) -> (fetched at, value)
+        self.cache: Dict[Tuple[str, str], Tuple[float, Dict]] = {}
+        # Refreshes in flight, so concurrent scans share one fetch per source
+        self.inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "timeouts": 0, "errors": 0}
+
+    @classmethod
+    def pooled(cls, sources: Iterable[Source], max_connections: int = 20) -> "SourceFetcher":
+        """A fetcher whose HTTP sources share one keep-alive connection pool"""
+        client = httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        ))
+        return cls(sources, client)
+
+    async def close(self):
+        for task in list(self.inflight.values()):
+            task.cancel()
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def fetch_all(self, region: str) -> Dict[str, Dict]:
+        """
+        Latest value of every source for a region. Optional sources that are
+        late or failing with nothing cached are left out; a failing required
+        one raises SourceUnavailable.
+        """
+        now = epoch_seconds(utcnow())
+        results: Dict[str, Dict] = {}
+        pending: Dict[str, asyncio.Task] = {}
+
+        for name, source in self.sources.items():
+            entry = self.cache.get((name, region))
+            age = now - entry[0] if entry else None
+            if entry and age < source.ttl:
+                self.stats["hits"] += 1
+                results[name] = entry[1]
+                continue
+            refresh = self._refresh(source, region)
+            if entry and age < source.ttl + source.stale_for:
+                # Stale-while-revalidate: answer now, the refresh fills the cache
+                self.stats["stale_hits"] += 1
+                results[name] = entry[1]
+            else:
+                self.stats["misses"] += 1
+                pending[name] = refresh
+
+        # Only required sources hold up a scan; optional ones still running
+        # are left out this time and land in the cache for the next scan
+        required = [task for name, task in pending.items() if self.sources[name].required]
+        if required:
+            await asyncio.wait(required)
+        elif pending:
+            # Let sources that answer without I/O (simulated ones) finish
+            await asyncio.sleep(0)
+        for name, task in pending.items():
+            if not task.done():
+                continue
+            if not task.cancelled() and task.exception() is None:
+                results[name] = task.result()
+            elif (name, region) in self.cache:
+                # Too old to be served stale, but better than nothing
+                results[name] = self.cache[(name, region)][1]
+            elif self.sources[name].required:
+                raise SourceUnavailable(f"Source '{name}' unavailable for region '{region}'")
+
+        return results
+
+    def _refresh(self, source: Source, region: str) -> asyncio.Task:
+        key = (source.name, region)
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(source, region))
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    def _finished(self, key: Tuple[str, str], task: asyncio.Task):
+        self.inflight.pop(key, None)
+        # Retrieve the exception so background refreshes never log "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, source: Source, region: str) -> Dict:
+        self.stats["fetches"] += 1
+        try:
+            value = await asyncio.wait_for(source.fetch(region, self.client), source.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"⏱️  Source {source.name} timed out after {source.timeout}s ({region})")
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️  Source {source.name} failed ({region}): {e}")
+            raise
+        self.cache[(source.name, region)] = (epoch_seconds(utcnow()), value)
+        return value
+
+    def get_stats(self) -> Dict:
+        served = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round((self.stats["hits"] + self.stats["stale_hits"]) / served, 3) if served else 0.0,
+            "in_flight": len(self.inflight),
+            "cached": len(self.cache),
+            "sources": {
+                name: {"ttl": source.ttl, "timeout": source.timeout, "required": source.required,
+                       "type": type(source).__name__}
+                for name, source in self.sources.items()
+            }
+        }
@@ -4,10 +4,17 @@ Monitors 20+ data sources 24/7
 """
 
 import random
-from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Sequence
 import logging
 
+import numpy as np
+
+from utils.clock import utcnow
+from utils.metrics import traced
+from utils.timeseries import TREND_WINDOW
+from services.sources import SourceFetcher, simulated_sources
+from services.threat_scoring import load_threat_rules, score_batch, threat_level, threat_score
+
 logger = logging.getLogger(__name__)
 
 class SurveillanceAgent:
@@ -15,112 +22,103 @@ class SurveillanceAgent:
     Continuously monitors environmental and social data sources
     """
     
-    def __init__(self):
-        self.data_sources = [
-            "weather_api", "aqi_monitor", "festival_calendar",
-            "social_media", "hospital_admissions", "epidemic_tracker"
-        ]
+    def __init__(self, rng: random.Random = None, threat_rules: Dict[str, float] = None,
+                 sources: SourceFetcher = None):
+        # Injected RNG makes seeded simulation runs reproducible
+        self.rng = rng or random.Random()
+        # Weights and thresholds behind the threat level (services.threat_scoring)
+        self.threat_rules = load_threat_rules(threat_rules)
+        # Feed adapters (services.sources), simulated unless real ones are passed in
+        self.sources = sources or SourceFetcher(simulated_sources(self.rng))
+        self.data_sources = list(self.sources.sources)
+        # Streaming sensor windows (services.ingestion), used in place of
+        # single AQI/weather samples once a region has fresh readings
+        self.sensor_feed = None
+        # Recent readings per region (utils.timeseries), for trend factors
+        self.history = None
         logger.info("👁️  Surveillance Agent initialized")
     
-    async def monitor(self) -> Dict:
+    @traced("surveillance.monitor")
+    async def monitor(self, region: str = None) -> Dict:
         """Monitor all data sources and detect threats"""
         
-        # Generate dummy surveillance data
-        current_aqi = random.uniform(50, 300)
-        temperature = random.uniform(15, 35)
-        humidity = random.uniform(40, 85)
-        
-        # Check for upcoming festivals (dummy)
-        upcoming_events = self._check_festivals()
-        
-        # Social media sentiment (dummy)
-        social_sentiment = {
-            "breathing_difficulty_mentions": random.randint(0, 1000),
-            "hospital_queries": random.randint(0, 500),
-            "sentiment_score": random.uniform(-1, 1)
+        # Every feed at once, each under its own timeout and cache TTL
+        feeds = await self.sources.fetch_all(region or "default")
+        weather = feeds["weather_api"]
+        
+        reading = {
+            "timestamp": utcnow(),
+            "aqi": feeds["aqi_monitor"]["aqi"],
+            "temperature": weather["temperature"],
+            "humidity": weather.get("humidity"),
+            "events": feeds.get("festival_calendar"),
+            "social_sentiment": feeds.get("social_media"),
+            "admission_patterns": feeds.get("hospital_admissions"),
+            "epidemic": feeds.get("epidemic_tracker")
         }
         
-        # Hospital admission patterns
-        admission_patterns = {
-            "current_rate": random.randint(80, 150),
-            "baseline": 100,
-            "trend": random.choice(["increasing", "stable", "decreasing"])
-        }
-        
-        # Determine threat level
-        threat_level = self._calculate_threat_level(
-            current_aqi, temperature, upcoming_events, 
-            social_sentiment, admission_patterns
-        )
+        # Windowed sensor aggregates replace the single samples when available
+        sensors = self.sensor_feed.reading_for(region) if self.sensor_feed and region else None
+        if sensors:
+            reading.update(sensors)
         
+        return await self.assess(reading, region)
+    
+    @traced("surveillance.assess")
+    async def assess(self, reading: Dict, region: str = None) -> Dict:
+        """Score a reading, live or recorded, and attach its threat level"""
         data = {
-            "timestamp": datetime.utcnow(),
-            "aqi": current_aqi,
-            "temperature": temperature,
-            "humidity": humidity,
-            "events": upcoming_events,
-            "social_sentiment": social_sentiment,
-            "admission_patterns": admission_patterns,
-            "threat_level": threat_level
+            "timestamp": reading.get("timestamp") or utcnow(),
+            "aqi": reading["aqi"],
+            "temperature": reading["temperature"],
+            "humidity": reading.get("humidity"),
+            "events": reading.get("events") or {"upcoming": False, "name": None, "days_until": None},
+            "social_sentiment": reading.get("social_sentiment") or {},
+            "admission_patterns": reading.get("admission_patterns") or {}
         }
+        if reading.get("epidemic"):
+            data["epidemic"] = reading["epidemic"]
+        if reading.get("sensors"):
+            data["sensors"] = reading["sensors"]
+        
+        trends = None
+        if self.history is not None and region:
+            self.history.record(region, data["timestamp"], {
+                "aqi": data["aqi"],
+                "temperature": data["temperature"],
+                "humidity": data["humidity"],
+                "breathing_mentions": data["social_sentiment"].get("breathing_difficulty_mentions"),
+                "admission_rate": data["admission_patterns"].get("current_rate")
+            })
+            trends = self.history.trends(region, TREND_WINDOW, now=data["timestamp"])
+            data["trends"] = {
+                metric: {"mean": round(stats["mean"], 2), "max": round(stats["max"], 2),
+                         "slope_per_hour": round(stats["slope_per_hour"], 2), "count": stats["count"]}
+                for metric, stats in trends.items()
+            }
         
-        logger.info(f"📊 Surveillance scan complete: AQI {current_aqi:.1f}, Temp {temperature:.1f}°C, Threat: {threat_level}")
-        
-        return data
-    
-    def _check_festivals(self) -> Dict:
-        """Check for upcoming festivals/events"""
-        festivals = ["Diwali", "Holi", "Dussehra", "New Year"]
-        
-        # Randomly determine if festival is upcoming
-        days_until_festival = random.randint(0, 10)
+        data["threat_level"] = self._calculate_threat_level(
+            data["aqi"], data["temperature"], data["events"],
+            data["social_sentiment"], data["admission_patterns"], trends
+        )
         
-        if days_until_festival <= 3:
-            return {
-                "upcoming": True,
-                "name": random.choice(festivals),
-                "days_until": days_until_festival
-            }
+        logger.info(
+            f"📊 Surveillance scan complete: AQI {data['aqi']:.1f}, "
+            f"Temp {data['temperature']:.1f}°C, Threat: {data['threat_level']}"
+        )
         
-        return {"upcoming": False, "name": None, "days_until": None}
+        return data
     
     def _calculate_threat_level(self, aqi: float, temp: float, 
                                 events: Dict, sentiment: Dict, 
-                                admissions: Dict) -> str:
+                                admissions: Dict, trends: Dict = None) -> str:
         """Calculate overall threat level"""
-        
-        score = 0
-        
-        # AQI factor
-        if aqi > 200:
-            score += 3
-        elif aqi > 150:
-            score += 2
-        elif aqi > 100:
-            score += 1
-        
-        # Temperature factor (cold weather)
-        if temp < 20:
-            score += 1
-        
-        # Events factor
-        if events.get("upcoming") and events.get("days_until", 10) <= 2:
-            score += 2
-        
-        # Social sentiment factor
-        if sentiment.get("breathing_difficulty_mentions", 0) > 500:
-            score += 2
-        
-        # Admission trend factor
-        if admissions.get("trend") == "increasing":
-            score += 1
-        
-        # Determine level
-        if score >= 6:
-            return "CRITICAL"
-        elif score >= 4:
-            return "HIGH"
-        elif score >= 2:
-            return "MEDIUM"
-        else:
-            return "LOW"
+        score = threat_score(aqi, temp, events, sentiment, admissions, trends, self.threat_rules)
+        return threat_level(score, self.threat_rules)
+    
+    def score_batch(self, columns: Dict[str, Sequence]) -> Dict[str, np.ndarray]:
+        """
+        Score many stations or wards in one vectorized pass; `columns` holds
+        the keyword arguments of services.threat_scoring.score_batch
+        """
+        return score_batch(**columns, rules=self.threat_rules)
@@ -0,0 +1,140 @@
+"""
+Threat scoring - Rule weights and thresholds for surveillance threat levels
+One rule set drives both the scalar path (one reading per scan) and the
+NumPy batch path that scores every station or ward in a single pass
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+# Thresholds and the score each rule adds; override with MEDISURGE_THREAT_RULES,
+# e.g. "aqi_severe=180,mentions_weight=3,critical_at=7"
+DEFAULT_THREAT_RULES: Dict[str, float] = {
+    # AQI bands, the highest band reached counts
+    "aqi_severe": 200, "aqi_severe_weight": 3,
+    "aqi_high": 150, "aqi_high_weight": 2,
+    "aqi_moderate": 100, "aqi_moderate_weight": 1,
+    # Cold weather
+    "cold_below": 20, "cold_weight": 1,
+    # Festival or event close enough to drive crowding
+    "event_within_days": 2, "event_weight": 2,
+    # Social media mentions of breathing difficulty
+    "mentions_above": 500, "mentions_weight": 2,
+    # Hospital admissions trending up
+    "admissions_rising_weight": 1,
+    # AQI climbing over the recent window (points/hour, over at least N points)
+    "aqi_rising_per_hour": 10, "min_trend_points": 3, "aqi_rising_weight": 1,
+    # Score needed for each level
+    "critical_at": 6, "high_at": 4, "medium_at": 2,
+}
+
+LEVELS = ("CRITICAL", "HIGH", "MEDIUM")
+
+
+def load_threat_rules(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Default rules with overrides applied, unknown rule names are rejected"""
+    rules = dict(DEFAULT_THREAT_RULES)
+    for name, value in (overrides or {}).items():
+        if name not in rules:
+            raise ValueError(f"Unknown threat rule '{name}'")
+        rules[name] = float(value)
+    return rules
+
+
+def threat_level(score: float, rules: Dict[str, float] = DEFAULT_THREAT_RULES) -> str:
+    if score >= rules["critical_at"]:
+        return "CRITICAL"
+    elif score >= rules["high_at"]:
+        return "HIGH"
+    elif score >= rules["medium_at"]:
+        return "MEDIUM"
+    return "LOW"
+
+
+def threat_score(aqi: float, temp: float, events: Dict, sentiment: Dict, admissions: Dict,
+                 trends: Dict = None, rules: Dict[str, float] = DEFAULT_THREAT_RULES) -> float:
+    """Score one reading"""
+    score = 0
+
+    # AQI factor
+    if aqi > rules["aqi_severe"]:
+        score += rules["aqi_severe_weight"]
+    elif aqi > rules["aqi_high"]:
+        score += rules["aqi_high_weight"]
+    elif aqi > rules["aqi_moderate"]:
+        score += rules["aqi_moderate_weight"]
+
+    # Temperature factor (cold weather)
+    if temp < rules["cold_below"]:
+        score += rules["cold_weight"]
+
+    # Events factor
+    if events.get("upcoming") and events.get("days_until", 10) <= rules["event_within_days"]:
+        score += rules["event_weight"]
+
+    # Social sentiment factor
+    if sentiment.get("breathing_difficulty_mentions", 0) > rules["mentions_above"]:
+        score += rules["mentions_weight"]
+
+    # Admission trend factor
+    if admissions.get("trend") == "increasing":
+        score += rules["admissions_rising_weight"]
+
+    # Worsening air over the recent window
+    aqi_trend = (trends or {}).get("aqi")
+    if (aqi_trend and aqi_trend["count"] >= rules["min_trend_points"]
+            and aqi_trend["slope_per_hour"] >= rules["aqi_rising_per_hour"]):
+        score += rules["aqi_rising_weight"]
+
+    return score
+
+
+def _column(values: Optional[Sequence], rows: int, fill, dtype) -> np.ndarray:
+    if values is None:
+        return np.full(rows, fill, dtype=dtype)
+    column = np.asarray(values, dtype=dtype)
+    if column.shape != (rows,):
+        raise ValueError(f"Expected {rows} values per column, got shape {column.shape}")
+    return column
+
+
+def score_batch(aqi: Sequence[float], temperature: Sequence[float],
+                event_days: Optional[Sequence[float]] = None,
+                breathing_mentions: Optional[Sequence[float]] = None,
+                admissions_rising: Optional[Sequence[bool]] = None,
+                aqi_slope_per_hour: Optional[Sequence[float]] = None,
+                aqi_trend_points: Optional[Sequence[float]] = None,
+                rules: Dict[str, float] = DEFAULT_THREAT_RULES) -> Dict[str, np.ndarray]:
+    """
+    Score many readings at once from columnar inputs, same rules as
+    `threat_score`. Missing columns count as no signal; `event_days` is NaN
+    where no event is upcoming. Returns {"score": float64[], "level": str[]}.
+    """
+    aqi = np.asarray(aqi, dtype=np.float64)
+    rows = aqi.shape[0]
+    temperature = _column(temperature, rows, np.inf, np.float64)
+    event_days = _column(event_days, rows, np.nan, np.float64)
+    breathing_mentions = _column(breathing_mentions, rows, 0, np.float64)
+    admissions_rising = _column(admissions_rising, rows, False, bool)
+    aqi_slope_per_hour = _column(aqi_slope_per_hour, rows, 0, np.float64)
+    aqi_trend_points = _column(aqi_trend_points, rows, 0, np.float64)
+
+    score = np.select(
+        [aqi > rules["aqi_severe"], aqi > rules["aqi_high"], aqi > rules["aqi_moderate"]],
+        [rules["aqi_severe_weight"], rules["aqi_high_weight"], rules["aqi_moderate_weight"]],
+        0.0
+    )
+    score += (temperature < rules["cold_below"]) * rules["cold_weight"]
+    # NaN compares False, so rows without an event add nothing
+    score += (event_days <= rules["event_within_days"]) * rules["event_weight"]
+    score += (breathing_mentions > rules["mentions_above"]) * rules["mentions_weight"]
+    score += admissions_rising * rules["admissions_rising_weight"]
+    score += ((aqi_trend_points >= rules["min_trend_points"])
+              & (aqi_slope_per_hour >= rules["aqi_rising_per_hour"])) * rules["aqi_rising_weight"]
+
+    level = np.select(
+        [score >= rules["critical_at"], score >= rules["high_at"], score >= rules["medium_at"]],
+        LEVELS, "LOW"
+    )
+    return {"score": score, "level": level}
@@ -0,0 +1,47 @@
+"""
+Stub data sources - Local stand-in for the external feeds surveillance reads
+Serves every source in services.sources at /{source}?region=, with optional
+per-source latency and failure injection, so the HTTP adapters, timeouts
+and stale-while-revalidate can be exercised without the real APIs
+
+Usage (from the backend directory):
+    uvicorn stub_sources:app --port 8100
+    MEDISURGE_SOURCES_URL=http://127.0.0.1:8100 python main.py
+Latency and failures per source, e.g.:
+    MEDISURGE_STUB_LATENCY_MS="social_media=800" MEDISURGE_STUB_FAIL="epidemic_tracker" uvicorn stub_sources:app --port 8100
+"""
+
+import asyncio
+import os
+import random
+
+from fastapi import FastAPI, HTTPException, Query
+
+from services.sources import SOURCE_DEFAULTS, simulated_sources
+from utils.helpers import parse_key_values
+
+app = FastAPI(title="MediSurge stub data sources")
+
+rng = random.Random(os.getenv("MEDISURGE_STUB_SEED"))
+generators = {source.name: source.generate for source in simulated_sources(rng)}
+latency_ms = parse_key_values(os.getenv("MEDISURGE_STUB_LATENCY_MS", ""))
+failing = set(filter(None, os.getenv("MEDISURGE_STUB_FAIL", "").split(",")))
+requests_served = {name: 0 for name in SOURCE_DEFAULTS}
+
+
+@app.get("/stats")
+async def get_stub_stats():
+    """Requests served per source"""
+    return requests_served
+
+
+@app.get("/{source}")
+async def get_source(source: str, region: str = Query("default", max_length=100)):
+    if source not in generators:
+        raise HTTPException(status_code=404, detail=f"Unknown source '{source}'")
+    requests_served[source] += 1
+    if latency_ms.get(source):
+        await asyncio.sleep(latency_ms[source] / 1000)
+    if source in failing:
+        raise HTTPException(status_code=503, detail=f"Source '{source}' is failing")
+    return generators[source]()
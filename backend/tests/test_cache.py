@@ -0,0 +1,133 @@
+"""
+TTL response cache: keys, expiry, stampede protection and invalidation
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import CRISIS_RESPONSE, ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic time for the cache module only, not the event loop"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def counting_route(cache: ResponseCache, name: str = "route", ttl: float = 30, delay: float = 0, **options):
+    calls = []
+
+    @cache.cached(name, ttl=ttl, **options)
+    async def route(**params):
+        calls.append(params)
+        if delay:
+            await asyncio.sleep(delay)
+        return {"call": len(calls), **params}
+
+    return route, calls
+
+
+def test_repeat_calls_are_served_from_cache_until_ttl(clock):
+    cache = ResponseCache()
+    route, calls = counting_route(cache, ttl=30)
+
+    async def scenario():
+        first = await route(days=7)
+        clock[0] += 29
+        second = await route(days=7)
+        clock[0] += 2
+        third = await route(days=7)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert second == first
+    assert third["call"] == 2
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_query_parameters_are_part_of_the_key(clock):
+    cache = ResponseCache()
+    route, calls = counting_route(cache)
+
+    async def scenario():
+        await route(days=7)
+        await route(days=30)
+        await route(days=7)
+
+    asyncio.run(scenario())
+    assert calls == [{"days": 7}, {"days": 30}]
+
+
+def test_ttl_override_by_name(clock):
+    cache = ResponseCache({"route": 5})
+    route, calls = counting_route(cache, ttl=30)
+
+    async def scenario():
+        await route()
+        clock[0] += 6
+        await route()
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache()
+    route, calls = counting_route(cache, delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(route() for _ in range(20)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_invalidation_drops_only_tagged_entries(clock):
+    cache = ResponseCache()
+    live, live_calls = counting_route(cache, "live")
+    static, static_calls = counting_route(cache, "static", tags=())
+
+    async def scenario():
+        await live()
+        await static()
+        assert cache.invalidate(CRISIS_RESPONSE) == 1
+        await live()
+        await static()
+
+    asyncio.run(scenario())
+    assert len(live_calls) == 2
+    assert len(static_calls) == 1
+
+
+def test_result_computed_across_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+    route, calls = counting_route(cache, delay=0.05)
+
+    async def scenario():
+        pending = asyncio.ensure_future(route())
+        await asyncio.sleep(0.01)
+        cache.invalidate(CRISIS_RESPONSE)
+        await pending
+        await route()
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_invalidate_everything(clock):
+    cache = ResponseCache()
+    route, calls = counting_route(cache, tags=())
+
+    async def scenario():
+        await route()
+        assert cache.invalidate() == 1
+        await route()
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
@@ -0,0 +1,121 @@
+"""
+Sensor ingestion: tumbling and sliding windows, caps, late readings and NDJSON parsing
+"""
+
+import asyncio
+import json
+
+from services.ingestion import IngestionPipeline, ndjson_batches
+from utils.timeseries import TimeSeriesStore
+
+NOW = 1_730_440_800.0  # 2024-11-01 06:00 UTC, on a minute boundary
+
+
+def reading(station: str, offset: float, aqi: float = 150.0, ward: str = "andheri-west") -> tuple:
+    """A normalized reading `offset` seconds after NOW"""
+    return (station, ward, NOW + offset, (aqi, 30.0, None))
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def collect(pipeline: IngestionPipeline, *parts: bytes, **options):
+    counts = {}
+    batches = [batch async for batch in ndjson_batches(chunks(*parts), pipeline, counts, **options)]
+    return batches, counts
+
+
+def test_sliding_window_aggregates_recent_tumbling_windows():
+    pipeline = IngestionPipeline(tumbling_seconds=60, sliding_seconds=300)
+    pipeline.process([reading("s1", 0, 100), reading("s2", 10, 200), reading("s1", 70, 300)])
+
+    window = pipeline.window("Andheri West", now=NOW + 90)
+    assert window["readings"] == 3
+    assert window["stations"] == 2
+    assert window["metrics"]["aqi"] == {"count": 3, "mean": 200.0, "min": 100.0, "max": 300.0}
+    assert "humidity" not in window["metrics"]
+
+    # Once the first minute slides out only the last reading is left
+    assert pipeline.window("Andheri West", now=NOW + 330)["readings"] == 1
+    assert pipeline.window("Andheri West", now=NOW + 3600) is None
+
+
+def test_closed_windows_reach_listeners():
+    pipeline = IngestionPipeline(tumbling_seconds=60, sliding_seconds=300)
+    closed = []
+    pipeline.window_listeners.append(lambda ward, pane: closed.append((ward, pane.bucket, pane.readings)))
+    pipeline.process([reading("s1", 0), reading("s2", 30), reading("s1", 60)])
+    assert closed == [("andheri-west", int(NOW // 60), 2)]
+
+
+def test_late_readings_outside_the_window_are_dropped():
+    pipeline = IngestionPipeline(tumbling_seconds=60, sliding_seconds=120)
+    pipeline.process([reading("s1", 0), reading("s1", 60), reading("s1", 120)])
+    pipeline.process([reading("s1", 65), reading("s1", 5)])
+    assert pipeline.stats["accepted"] == 4
+    assert pipeline.stats["late"] == 1
+
+
+def test_station_cap_rejects_without_touching_state():
+    pipeline = IngestionPipeline(max_stations=1)
+    pipeline.history = TimeSeriesStore()
+    pipeline.process([reading("s1", 0), reading("s2", 0), reading("s3", 0, ward="bandra")])
+
+    assert pipeline.stats["accepted"] == 1
+    assert pipeline.stats["rejected"] == 2
+    assert set(pipeline.stations) == {"s1"}
+    assert set(pipeline.wards) == {"andheri-west"}
+    assert set(pipeline.station_wards) == {"s1"}
+    assert set(pipeline.history.series) == {"s1"}
+
+
+def test_normalize_rejects_unusable_readings():
+    pipeline = IngestionPipeline(tumbling_seconds=60)
+    assert pipeline.normalize({"station": "s1", "ward": "Andheri West", "aqi": 120}, NOW) == (
+        "s1", "andheri-west", NOW, (120.0, None, None))
+    assert pipeline.normalize({"station": "s1", "aqi": 120}, NOW) is None
+    assert pipeline.normalize({"station": "s1", "ward": "Andheri West"}, NOW) is None
+    assert pipeline.normalize({"station": "s1", "ward": "Andheri West", "aqi": "NaN"}, NOW) is None
+    assert pipeline.normalize({"station": "s1", "ward": "Andheri West", "aqi": 120,
+                               "timestamp": NOW + 3600}, NOW) is None
+    # Known stations keep their ward
+    pipeline.station_wards["s1"] = "andheri-west"
+    assert pipeline.normalize({"station": "s1", "aqi": 90}, NOW)[1] == "andheri-west"
+
+
+def test_ndjson_lines_split_across_chunks():
+    pipeline = IngestionPipeline()
+    lines = [json.dumps({"station": f"s{i}", "ward": "Andheri West", "aqi": 100 + i}) for i in range(5)]
+    payload = ("\n".join(lines) + "\nnot json\n\n").encode()
+
+    batches, counts = asyncio.run(collect(pipeline, payload[:37], payload[37:90], payload[90:], batch_size=2))
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [batch[0][0] for batch in batches] == ["s0", "s2", "s4"]
+    assert counts == {"received": 6, "rejected": 1}
+
+
+def test_oversized_ndjson_line_is_discarded():
+    pipeline = IngestionPipeline()
+    good = json.dumps({"station": "s1", "ward": "Andheri West", "aqi": 100}).encode()
+    huge = b'{"station": "' + b"x" * 500
+
+    batches, counts = asyncio.run(
+        collect(pipeline, huge, b"x" * 500, b'"}\n' + good + b"\n", max_line_bytes=200))
+    assert [station for batch in batches for station, *_ in batch] == ["s1"]
+    assert counts == {"received": 2, "rejected": 1}
+
+
+def test_queued_batches_are_aggregated_before_stop():
+    async def scenario():
+        pipeline = IngestionPipeline(queue_batches=2)
+        await pipeline.start()
+        for i in range(6):
+            await pipeline.submit([reading(f"s{i}", 0)])
+        await pipeline.stop()
+        return pipeline.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["accepted"] == 6
+    assert stats["queued_batches"] == 0
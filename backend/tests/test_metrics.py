@@ -0,0 +1,88 @@
+"""
+Metrics registry: histograms, spans and the Prometheus rendering
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_counts_and_quantiles_across_label_sets():
+    histogram = Histogram("latency", "test", buckets=(0.1, 0.5, 1.0))
+    for value in (0.05, 0.05, 0.3, 0.8):
+        histogram.observe(value, route="/a", outcome="ok")
+    histogram.observe(0.3, route="/b", outcome="error")
+
+    assert histogram.count() == 5
+    assert histogram.count(route="/a") == 4
+    assert histogram.count(outcome="error") == 1
+    assert histogram.total(route="/a") == pytest.approx(1.2)
+    assert histogram.quantile(0.5, route="/a") == 0.1
+    assert histogram.quantile(0.95) == 1.0
+    assert histogram.quantile(0.5, route="/missing") == 0.0
+
+
+def test_quantile_beyond_the_last_bucket_stays_finite():
+    histogram = Histogram("latency", "test", buckets=(0.1, 0.5))
+    histogram.observe(30.0)
+    assert histogram.quantile(0.95) == 0.5
+    json.dumps({"p95": histogram.quantile(0.95)}, allow_nan=False)
+
+
+def test_spans_record_outcomes_and_skip_cancellations():
+    registry = MetricsRegistry()
+    seen = []
+    registry.span_sinks.append(lambda name, seconds, outcome: seen.append((name, outcome)))
+
+    with registry.span("stage"):
+        pass
+    with pytest.raises(ValueError):
+        with registry.span("stage"):
+            raise ValueError("boom")
+
+    async def cancelled():
+        with registry.span("stage"):
+            await asyncio.sleep(10)
+
+    async def scenario():
+        task = asyncio.ensure_future(cancelled())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert seen == [("stage", "ok"), ("stage", "error")]
+    assert registry.spans.count(span="stage") == 2
+
+
+def test_traced_records_each_call():
+    registry = MetricsRegistry()
+
+    @registry.traced("agent.call")
+    async def agent(value):
+        return value * 2
+
+    assert asyncio.run(agent(21)) == 42
+    assert registry.spans.count(span="agent.call", outcome="ok") == 1
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(route='/say "hi"')
+    registry.gauge("queue_depth", "Depth", callback=lambda: 3).set(0)
+    histogram = registry.histogram("wait_seconds", "Wait", buckets=(1.0,))
+    histogram.observe(0.5)
+    histogram.observe(2.0)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{route="/say \\"hi\\""} 1' in lines
+    assert "queue_depth 3" in lines
+    assert 'wait_seconds_bucket{le="1.0"} 1' in lines
+    assert 'wait_seconds_bucket{le="+Inf"} 2' in lines
+    assert "wait_seconds_count 2" in lines
+    assert "wait_seconds_sum 2.5" in lines
@@ -0,0 +1,85 @@
+"""
+Keyset pagination over AgentLog, on a throwaway SQLite database
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from database import AgentLog, Base
+from utils.pagination import decode_cursor, encode_cursor, paginate
+
+START = datetime(2024, 11, 1, 6, 0)
+
+
+async def seeded_session(path, rows: int):
+    """Engine and session over a fresh database with `rows` agent logs"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Three rows share each timestamp, so ties must be broken by id
+        await conn.execute(insert(AgentLog), [
+            {"timestamp": START + timedelta(minutes=i // 3), "agent_name": f"agent{i % 4}",
+             "action": "scan", "status": "success", "details": {}}
+            for i in range(rows)
+        ])
+    return engine, async_sessionmaker(engine, class_=AsyncSession)()
+
+
+def walk(path, rows: int, limit: int, filters_for=None):
+    """Every page of a full walk, newest first"""
+    async def scenario():
+        engine, session = await seeded_session(path, rows)
+        try:
+            filters = filters_for() if filters_for else None
+            pages, cursor = [], None
+            while True:
+                page = await paginate(session, AgentLog, filters, cursor=cursor, limit=limit, include_total=True)
+                pages.append(page)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return pages
+        finally:
+            await session.close()
+            await engine.dispose()
+
+    return asyncio.run(scenario())
+
+
+def test_walk_visits_every_row_once_newest_first(tmp_path):
+    pages = walk(tmp_path / "logs.db", rows=50, limit=7)
+    seen = [(row.timestamp, row.id) for page in pages for row in page["items"]]
+
+    assert len(pages) == 8
+    assert [len(page["items"]) for page in pages] == [7] * 7 + [1]
+    assert len(seen) == len(set(seen)) == 50
+    assert seen == sorted(seen, reverse=True)
+    assert all(page["total"] == 50 for page in pages)
+
+
+def test_exact_multiple_of_limit_ends_without_an_empty_page(tmp_path):
+    pages = walk(tmp_path / "logs.db", rows=21, limit=7)
+    assert [len(page["items"]) for page in pages] == [7, 7, 7]
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_filters_apply_to_pages_and_total(tmp_path):
+    pages = walk(tmp_path / "logs.db", rows=40, limit=4, filters_for=lambda: [AgentLog.agent_name == "agent1"])
+    items = [row for page in pages for row in page["items"]]
+    assert len(items) == pages[0]["total"] == 10
+    assert {row.agent_name for row in items} == {"agent1"}
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(START, 42)) == (START, 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "W10", encode_cursor(START, 1)[:-3]])
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
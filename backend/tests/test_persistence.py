@@ -0,0 +1,181 @@
+"""
+Write-behind persistence queue and crisis response rows, on a throwaway SQLite database
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from database import AgentLog, Base, Prediction, Resource
+from services.persistence import PersistenceQueue, crisis_response_rows
+
+PREDICTION = {
+    "id": 4242,
+    "timestamp": datetime(2024, 11, 1, 6, 0),
+    "surge_date": datetime(2024, 11, 3, 18, 0),
+    "predicted_patients": 340,
+    "baseline_patients": 120,
+    "surge_percentage": 183.3,
+    "confidence": 88.0,
+    "primary_condition": "Respiratory Illness",
+    "alert_level": "HIGH",
+    "factors": {"aqi": 320},
+    "region": "mumbai"
+}
+
+RESOURCES = {
+    "nurses_needed": 12, "doctors_needed": 5, "nebulizers": 10, "oxygen_cylinders": 20,
+    "n95_masks": 500, "ventilators": 2, "estimated_cost": 125000.0, "allocation_strategy": {}
+}
+
+
+async def database(path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def count(sessions, model) -> int:
+    async with sessions() as session:
+        return (await session.execute(select(func.count(model.id)))).scalar_one()
+
+
+class FailingSessions:
+    """Session factory whose first `failures` sessions can't be opened"""
+
+    def __init__(self, sessions, failures: int):
+        self.sessions = sessions
+        self.failures = failures
+
+    def __call__(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        return self.sessions()
+
+
+def log_rows(n: int, agent: str = "test"):
+    return [{"timestamp": datetime(2024, 11, 1, 6, 0) + timedelta(seconds=i), "agent_name": agent,
+             "action": "write", "status": "success", "details": {}} for i in range(n)]
+
+
+def test_rows_are_flushed_in_batches(tmp_path):
+    async def scenario():
+        engine, sessions = await database(tmp_path / "q.db")
+        queue = PersistenceQueue(sessions, batch_size=100, flush_interval=0.05)
+        await queue.start()
+        for _ in range(10):
+            await queue.enqueue(AgentLog, log_rows(25))
+        await queue.stop()
+        written = await count(sessions, AgentLog)
+        await engine.dispose()
+        return queue.get_stats(), written
+
+    stats, written = asyncio.run(scenario())
+    assert written == stats["written"] == 250
+    assert stats["pending"] == 0
+    assert stats["batches"] <= 5
+
+
+def test_failed_batch_is_retried(tmp_path):
+    async def scenario():
+        engine, sessions = await database(tmp_path / "q.db")
+        queue = PersistenceQueue(FailingSessions(sessions, failures=2), batch_size=100,
+                                 flush_interval=0.02, max_attempts=3)
+        await queue.start()
+        await queue.enqueue(AgentLog, log_rows(5, "first"))
+        await queue.enqueue(AgentLog, log_rows(3, "second"))
+        await queue.stop()
+        async with sessions() as session:
+            agents = (await session.execute(select(AgentLog.agent_name).order_by(AgentLog.id))).scalars().all()
+        await engine.dispose()
+        return queue.get_stats(), agents
+
+    stats, agents = asyncio.run(scenario())
+    assert agents == ["first"] * 5 + ["second"] * 3
+    assert stats["written"] == 8
+    assert stats["failed"] == 0
+    assert stats["retried"] == 16
+    assert stats["pending"] == 0
+    assert stats["last_failure_seconds_ago"] is not None
+
+
+def test_batch_is_dropped_after_max_attempts(tmp_path):
+    async def scenario():
+        engine, sessions = await database(tmp_path / "q.db")
+        queue = PersistenceQueue(FailingSessions(sessions, failures=3), batch_size=100,
+                                 flush_interval=0.02, max_attempts=3)
+        await queue.start()
+        await queue.enqueue(AgentLog, log_rows(4))
+        await queue.stop()
+        written = await count(sessions, AgentLog)
+        await engine.dispose()
+        return queue, written
+
+    queue, written = asyncio.run(scenario())
+    assert written == 0
+    assert queue.stats["failed"] == 4
+    assert queue.pending_rows == 0
+    assert not queue.buffer
+    assert queue.failed_within(60)
+
+
+def test_response_rows_reference_the_stored_prediction(tmp_path):
+    async def scenario():
+        engine, sessions = await database(tmp_path / "q.db")
+        queue = PersistenceQueue(sessions, flush_interval=0.02)
+        await queue.start()
+        record_id = await queue.save_prediction(PREDICTION)
+        results = {"resource": RESOURCES, "insurance": RuntimeError("insurer down")}
+        rows = crisis_response_rows({**PREDICTION, "record_id": record_id}, results, {"resource": 0.01})
+        for model, model_rows in rows.items():
+            await queue.enqueue(model, model_rows)
+        await queue.stop()
+        async with sessions() as session:
+            prediction = await session.get(Prediction, record_id)
+            resource_ids = (await session.execute(select(Resource.prediction_id))).scalars().all()
+            logs = (await session.execute(select(AgentLog).order_by(AgentLog.agent_name))).scalars().all()
+        await engine.dispose()
+        return prediction, resource_ids, logs
+
+    prediction, resource_ids, logs = asyncio.run(scenario())
+    assert prediction.predicted_patients == 340
+    assert resource_ids == [prediction.id]
+    assert [(log.agent_name, log.status) for log in logs] == [("insurance", "failure"), ("resource", "success")]
+    assert logs[0].details["prediction_id"] == prediction.id
+    assert "insurer down" in logs[0].details["error"]
+    assert logs[1].execution_time == 0.01
+
+
+def test_save_prediction_returns_none_when_the_write_fails(tmp_path):
+    async def scenario():
+        engine, sessions = await database(tmp_path / "q.db")
+        queue = PersistenceQueue(FailingSessions(sessions, failures=1))
+        record_id = await queue.save_prediction(PREDICTION)
+        await engine.dispose()
+        return queue, record_id
+
+    queue, record_id = asyncio.run(scenario())
+    assert record_id is None
+    assert queue.failed_within(60)
+
+
+def test_enqueue_waits_while_the_queue_is_full(tmp_path):
+    async def scenario():
+        engine, sessions = await database(tmp_path / "q.db")
+        queue = PersistenceQueue(sessions, batch_size=50, flush_interval=0.02, max_pending_rows=60)
+        await queue.start()
+        for _ in range(10):
+            await queue.enqueue(AgentLog, log_rows(40))
+            assert queue.pending_rows <= 80
+        await queue.stop()
+        written = await count(sessions, AgentLog)
+        await engine.dispose()
+        return queue.get_stats(), written
+
+    stats, written = asyncio.run(scenario())
+    assert written == 400
+    assert stats["backpressure_waits"] > 0
@@ -0,0 +1,81 @@
+"""
+Pipeline DAG: dependency order, concurrency, failure propagation and memoization
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from services.pipeline import PipelineDAG, PipelineDependencyError, PipelineNode
+
+
+def node(name: str, inputs=(), delay: float = 0.0, calls: list = None, fail: bool = False) -> PipelineNode:
+    async def func(*args):
+        if calls is not None:
+            calls.append(name)
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        return (name, *args)
+
+    return PipelineNode(name, func, inputs)
+
+
+def test_independent_nodes_run_concurrently():
+    dag = PipelineDAG([
+        node("resource", ["prediction"], delay=0.1),
+        node("pharma", ["prediction"], delay=0.1),
+        node("communication", ["resource"], delay=0.05),
+    ])
+    start = time.perf_counter()
+    run = asyncio.run(dag.run({"prediction": "p"}))
+    assert time.perf_counter() - start < 0.25
+
+    assert run.results["resource"] == ("resource", "p")
+    assert run.results["communication"] == ("communication", ("resource", "p"))
+    assert run.critical_path == ["resource", "communication"]
+    assert set(run.get_stats()["timings_ms"]) == {"resource", "pharma", "communication"}
+
+
+def test_failure_propagates_downstream_only():
+    dag = PipelineDAG([
+        node("resource", ["prediction"], fail=True),
+        node("pharma", ["prediction"]),
+        node("communication", ["resource", "pharma"]),
+    ])
+    run = asyncio.run(dag.run({"prediction": "p"}))
+    assert isinstance(run.results["resource"], RuntimeError)
+    assert run.results["pharma"] == ("pharma", "p")
+    assert isinstance(run.results["communication"], PipelineDependencyError)
+
+
+def test_successful_results_are_memoized_per_key():
+    calls = []
+    dag = PipelineDAG([
+        node("resource", ["prediction"], calls=calls),
+        node("insurance", ["resource"], calls=calls, fail=True),
+    ], memo_size=2)
+
+    async def scenario():
+        first = await dag.run({"prediction": "p"}, memo_key=1)
+        second = await dag.run({"prediction": "p"}, memo_key=1)
+        await dag.run({"prediction": "p"}, memo_key=2)
+        await dag.run({"prediction": "p"}, memo_key=3)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.memoized == []
+    # Failures aren't memoized, so the retry calls insurance again
+    assert second.memoized == ["resource"]
+    assert calls == ["resource", "insurance", "insurance", "resource", "insurance", "resource", "insurance"]
+    assert list(dag.memo) == [2, 3]
+
+
+def test_missing_inputs_and_cycles_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        PipelineDAG([node("a", ["b"]), node("b", ["a"])])
+
+    dag = PipelineDAG([node("resource", ["prediction", "region"])])
+    with pytest.raises(ValueError, match="prediction, region"):
+        asyncio.run(dag.run({}))
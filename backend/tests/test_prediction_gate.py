@@ -0,0 +1,112 @@
+"""
+Prediction gate: fingerprints, reuse, expiry, and caching only responses that went out
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from services.orchestrator_agent import OrchestratorAgent
+from services.prediction_gate import PredictionGate, fingerprint
+from utils.clock import VirtualClock, virtual_time
+
+READING = {
+    "aqi": 420, "temperature": 38, "humidity": 85,
+    "social_sentiment": {"breathing_difficulty_mentions": 900},
+    "admission_patterns": {"current_rate": 150, "trend": "increasing"},
+    "events": {"upcoming": True, "name": "Diwali", "days_until": 1}
+}
+
+
+def surveillance(aqi: float = 180, temperature: float = 21.0, mentions: int = 420, level: str = "HIGH") -> dict:
+    return {
+        "threat_level": level, "aqi": aqi, "temperature": temperature,
+        "events": {"upcoming": False}, "social_sentiment": {"breathing_difficulty_mentions": mentions},
+        "admission_patterns": {"trend": "stable"}
+    }
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(datetime(2024, 11, 1, 6, 0))
+    with virtual_time(clock):
+        yield clock
+
+
+def test_fingerprint_ignores_moves_within_a_band():
+    assert fingerprint(surveillance(aqi=176, temperature=20.1)) == fingerprint(surveillance(aqi=199, temperature=21.9))
+    assert fingerprint(surveillance(aqi=199)) != fingerprint(surveillance(aqi=201))
+    assert fingerprint(surveillance(level="HIGH")) != fingerprint(surveillance(level="CRITICAL"))
+
+
+def test_lookup_reuses_a_stored_prediction_until_inputs_change(clock):
+    gate = PredictionGate(max_age=1800)
+    assert gate.lookup("mumbai", surveillance()) is None
+    gate.store("mumbai", surveillance(), {"id": 7})
+
+    assert gate.lookup("mumbai", surveillance(aqi=190)) == {"id": 7}
+    assert gate.lookup("mumbai", surveillance(aqi=260)) is None
+    assert gate.lookup("pune", surveillance()) is None
+    assert (gate.hits, gate.misses) == (1, 3)
+    assert gate.hit_rate == 0.25
+
+
+def test_prediction_expires_after_max_age(clock):
+    gate = PredictionGate(max_age=1800)
+    gate.store("mumbai", surveillance(), {"id": 7})
+    clock.advance(1799)
+    assert gate.lookup("mumbai", surveillance()) is not None
+    clock.advance(2)
+    assert gate.lookup("mumbai", surveillance()) is None
+
+
+def test_forget_and_disabled_gate(clock):
+    gate = PredictionGate(max_age=1800)
+    gate.store("mumbai", surveillance(), {"id": 7})
+    gate.forget("mumbai")
+    assert gate.lookup("mumbai", surveillance()) is None
+
+    disabled = PredictionGate(max_age=0)
+    disabled.store("mumbai", surveillance(), {"id": 7})
+    assert disabled.lookup("mumbai", surveillance()) is None
+    assert not disabled.entries
+
+
+def test_custom_steps_override_defaults():
+    gate = PredictionGate(steps={"aqi": 100})
+    assert gate.steps["aqi"] == 100
+    assert gate.steps["temperature"] == 2
+
+
+def test_prediction_is_cached_only_once_its_response_went_out(monkeypatch):
+    monkeypatch.setenv("MEDISURGE_SIMULATION_SEED", "3")
+    monkeypatch.setenv("MEDISURGE_AGENT_RETRIES", "0")
+    orchestrator = OrchestratorAgent()
+    region = next(iter(orchestrator.regions.values()))
+    healthy = {name: node.func for name, node in orchestrator.response_pipeline.nodes.items()}
+
+    async def down(*args):
+        raise RuntimeError("agent down")
+
+    async def scenario():
+        for node in orchestrator.response_pipeline.nodes.values():
+            node.func = down
+        failed = [await orchestrator.scan_region(region, dict(READING)) for _ in range(3)]
+        assert orchestrator.response_tracker.active == {}
+        assert not orchestrator.prediction_gate.entries
+
+        for name, node in orchestrator.response_pipeline.nodes.items():
+            node.func = healthy[name]
+        responded = await orchestrator.scan_region(region, dict(READING))
+        reused = await orchestrator.scan_region(region, dict(READING))
+        return failed, responded, reused
+
+    failed, responded, reused = asyncio.run(scenario())
+    assert all(decision["response"] == "failed" for decision in failed)
+    assert not any(decision.get("prediction_reused") for decision in failed)
+
+    assert responded["response"] == "full"
+    assert reused["prediction_reused"] is True
+    assert region.responses == 1
+    assert region.predictions_reused == 1
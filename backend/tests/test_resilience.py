@@ -0,0 +1,126 @@
+"""
+Agent supervisor: retries, deadlines, hedging and circuit breakers
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services import resilience
+from services.resilience import AgentPolicy, AgentSupervisor, AgentTimeoutError, CircuitOpenError
+
+
+def flaky(failures: int, error: Exception):
+    """An agent that raises `error` on its first `failures` calls"""
+    calls = []
+
+    async def agent():
+        calls.append(time.perf_counter())
+        if len(calls) <= failures:
+            raise error
+        return len(calls)
+
+    return agent, calls
+
+
+async def hang():
+    await asyncio.sleep(60)
+
+
+def test_failures_are_retried_within_the_deadline():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=2, retries=2, backoff=0.01)})
+    agent, calls = flaky(2, RuntimeError("flaky"))
+    assert asyncio.run(supervisor.call("agent", agent)) == 3
+    assert supervisor.stats["agent"]["retries"] == 2
+    assert supervisor.status("agent") == "active"
+
+
+def test_timeouts_raised_by_the_agent_are_retried():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=2, retries=2, backoff=0.01)})
+    agent, calls = flaky(2, asyncio.TimeoutError())
+    assert asyncio.run(supervisor.call("agent", agent)) == 3
+    assert len(calls) == 3
+
+
+def test_exhausted_retries_raise_the_last_error():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=2, retries=1, backoff=0.01)})
+    agent, calls = flaky(5, RuntimeError("down"))
+    with pytest.raises(RuntimeError, match="down"):
+        asyncio.run(supervisor.call("agent", agent))
+    assert len(calls) == 2
+    assert supervisor.status("agent") == "degraded"
+
+
+def test_hung_agent_costs_at_most_its_deadline():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=0.1, retries=3)})
+    start = time.perf_counter()
+    with pytest.raises(AgentTimeoutError):
+        asyncio.run(supervisor.call("agent", hang))
+    assert time.perf_counter() - start < 0.5
+    assert supervisor.stats["agent"]["retries"] == 0
+
+
+def test_circuit_opens_then_lets_one_probe_through(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    breaker = resilience.CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == resilience.OPEN
+    assert not breaker.allow()
+
+    now[0] += 30
+    assert breaker.allow()
+    assert breaker.state == resilience.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == resilience.CLOSED
+
+
+def test_open_circuit_rejects_calls():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=1, retries=0)}, failure_threshold=1)
+    agent, calls = flaky(5, RuntimeError("down"))
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await supervisor.call("agent", agent)
+        with pytest.raises(CircuitOpenError):
+            await supervisor.call("agent", agent)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+    assert supervisor.status("agent") == "circuit_open"
+    assert supervisor.stats["agent"]["rejected"] == 1
+
+
+def test_hedge_answers_when_the_first_attempt_stalls():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=2, retries=0, hedge_after=0.05)})
+    calls = []
+
+    async def agent():
+        calls.append(None)
+        await asyncio.sleep(1 if len(calls) == 1 else 0.01)
+        return len(calls)
+
+    start = time.perf_counter()
+    assert asyncio.run(supervisor.call("agent", agent)) == 2
+    assert time.perf_counter() - start < 0.5
+    assert supervisor.stats["agent"]["hedges"] == 1
+
+
+def test_failed_hedge_waits_for_the_pending_attempt():
+    supervisor = AgentSupervisor({"agent": AgentPolicy(deadline=2, retries=0, hedge_after=0.05)})
+    calls = []
+
+    async def agent():
+        calls.append(None)
+        if len(calls) == 2:
+            raise RuntimeError("hedge failed")
+        await asyncio.sleep(0.2)
+        return "first"
+
+    assert asyncio.run(supervisor.call("agent", agent)) == "first"
@@ -0,0 +1,134 @@
+"""
+Incremental re-response: full responses, top-ups and no-change decisions
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.response_tracker import FULL, NO_CHANGE, TOP_UP, ResponseTracker
+from utils.clock import VirtualClock, virtual_time
+
+NOW = datetime(2024, 11, 1, 6, 0)
+SURGE = NOW + timedelta(hours=60)
+
+
+def prediction(patients: int, condition: str = "Respiratory Illness", surge_date: datetime = SURGE,
+               prediction_id: int = 1) -> dict:
+    return {
+        "id": prediction_id,
+        "region": "mumbai",
+        "predicted_patients": patients,
+        "baseline_patients": 120,
+        "primary_condition": condition,
+        "surge_date": surge_date
+    }
+
+
+def dispatched(*staff: tuple) -> dict:
+    """Agent results with a resource plan and the given (staff_id, status) activations"""
+    return {
+        "resource": {"nurses_needed": 4},
+        "reverse911": {"activations": [{"staff_id": staff_id, "status": status} for staff_id, status in staff]}
+    }
+
+
+@pytest.fixture
+def clock():
+    clock = VirtualClock(NOW)
+    with virtual_time(clock):
+        yield clock
+
+
+def respond(tracker: ResponseTracker, new_prediction: dict, results: dict = None):
+    plan = tracker.plan(new_prediction)
+    tracker.record(plan, dispatched() if results is None else results)
+    return plan
+
+
+def test_first_prediction_gets_a_full_response(clock):
+    tracker = ResponseTracker()
+    plan = respond(tracker, prediction(300), dispatched((1, "confirmed"), (2, "declined")))
+
+    assert plan.mode == FULL
+    assert plan.work_order["predicted_patients"] == 300
+    active = tracker.active["mumbai"]
+    assert active.committed_patients == 300
+    assert active.activated_staff_ids == {1}
+
+
+def test_small_increase_needs_no_change(clock):
+    tracker = ResponseTracker(min_top_up_patients=10)
+    respond(tracker, prediction(300))
+    plan = respond(tracker, prediction(309, prediction_id=2))
+
+    assert plan.mode == NO_CHANGE
+    assert plan.work_order is None
+    assert plan.delta == {"additional_patients": 9, "committed_patients": 300}
+    assert tracker.active["mumbai"].committed_patients == 300
+
+
+def test_lower_prediction_needs_no_change(clock):
+    tracker = ResponseTracker()
+    respond(tracker, prediction(300))
+    plan = respond(tracker, prediction(250, prediction_id=2))
+    assert plan.mode == NO_CHANGE
+    assert plan.delta["additional_patients"] == -50
+
+
+def test_top_up_covers_only_the_extra_patients(clock):
+    tracker = ResponseTracker(min_top_up_patients=10)
+    respond(tracker, prediction(300), dispatched((1, "confirmed"), (3, "sent")))
+    plan = respond(tracker, prediction(360, prediction_id=2), dispatched((4, "confirmed")))
+
+    assert plan.mode == TOP_UP
+    assert plan.work_order["predicted_patients"] == 60
+    assert plan.work_order["baseline_patients"] == 0
+    assert plan.work_order["already_activated_staff"] == [1, 3]
+    # The original prediction is left untouched
+    assert plan.prediction["predicted_patients"] == 360
+
+    active = tracker.active["mumbai"]
+    assert active.committed_patients == 360
+    assert active.top_ups == 1
+    assert active.activated_staff_ids == {1, 3, 4}
+    assert active.prediction_ids == [1, 2]
+
+    # The next top-up is measured against the new commitment
+    assert tracker.plan(prediction(380, prediction_id=3)).work_order["predicted_patients"] == 20
+
+
+def test_changed_condition_starts_over(clock):
+    tracker = ResponseTracker()
+    respond(tracker, prediction(300))
+    plan = respond(tracker, prediction(100, condition="Viral Infections", prediction_id=2))
+
+    assert plan.mode == FULL
+    assert plan.delta["previous_condition"] == "Respiratory Illness"
+    assert tracker.active["mumbai"].committed_patients == 100
+
+
+def test_failed_resource_plan_commits_nothing(clock):
+    tracker = ResponseTracker()
+    plan = respond(tracker, prediction(300), {"resource": RuntimeError("down")})
+
+    assert plan.mode == FULL
+    assert "mumbai" not in tracker.active
+    assert tracker.plan(prediction(300, prediction_id=2)).mode == FULL
+
+
+def test_new_surge_window_gets_a_full_response(clock):
+    tracker = ResponseTracker(window_hours=24)
+    respond(tracker, prediction(300))
+    later = prediction(300, surge_date=SURGE + timedelta(hours=30), prediction_id=2)
+    assert tracker.plan(later).mode == FULL
+
+
+def test_response_expires_once_the_surge_has_passed(clock):
+    tracker = ResponseTracker(window_hours=24)
+    respond(tracker, prediction(300))
+    clock.advance((60 + 25) * 3600)
+
+    plan = tracker.plan(prediction(300, surge_date=clock.now() + timedelta(hours=2), prediction_id=2))
+    assert plan.mode == FULL
+    assert "mumbai" not in tracker.active
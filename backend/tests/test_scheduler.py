@@ -0,0 +1,62 @@
+"""
+Adaptive scheduler: threat-aware intervals, backoff and triggers
+"""
+
+import asyncio
+
+import pytest
+
+from services.scheduler import AdaptiveScheduler
+
+
+def scheduler(**options) -> AdaptiveScheduler:
+    return AdaptiveScheduler(jitter=0, **options)
+
+
+@pytest.mark.parametrize("level, interval", [("CRITICAL", 60), ("HIGH", 180), ("MEDIUM", 450), ("LOW", 900)])
+def test_interval_follows_the_threat_level(level, interval):
+    assert scheduler().next_delay(level) == interval
+
+
+def test_quiet_periods_stretch_up_to_the_cap():
+    quiet = scheduler(low_backoff=1.5, max_interval=3600)
+    delays = [quiet.next_delay("LOW") for _ in range(6)]
+    assert delays == [900, 1350, 2025, 3037.5, 3600, 3600]
+
+    # Any threat resets the stretch
+    assert quiet.next_delay("MEDIUM") == 450
+    assert quiet.next_delay("LOW") == 900
+
+
+def test_long_quiet_spell_does_not_overflow():
+    quiet = scheduler(low_backoff=1.5, max_interval=3600)
+    for _ in range(5000):
+        delay = quiet.next_delay("LOW")
+    assert delay == 3600
+    assert quiet.consecutive_low < 10
+
+
+def test_errors_back_off_exponentially_up_to_the_cap():
+    failing = scheduler(error_base=30, error_max=900)
+    assert [failing.error_delay() for _ in range(7)] == [30, 60, 120, 240, 480, 900, 900]
+    failing.next_delay("LOW")
+    assert failing.error_delay() == 30
+
+
+def test_jitter_stays_within_bounds():
+    jittery = AdaptiveScheduler(jitter=0.1)
+    delays = [jittery.next_delay("CRITICAL") for _ in range(200)]
+    assert all(54 <= delay <= 66 for delay in delays)
+
+
+def test_trigger_wakes_a_waiting_scan():
+    async def scenario():
+        waiting = scheduler()
+        pending = asyncio.ensure_future(waiting.wait(60))
+        await asyncio.sleep(0)
+        waiting.trigger("threshold")
+        reason = await asyncio.wait_for(pending, 1)
+        timed_out = await waiting.wait(0.01)
+        return reason, timed_out, waiting.triggered_scans
+
+    assert asyncio.run(scenario()) == ("threshold", "scheduled", 1)
@@ -0,0 +1,136 @@
+"""
+Source adapters against the stub feeds in stub_sources.py, served in-process
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import httpx
+import pytest
+
+import stub_sources
+from services.sources import SourceFetcher, SourceUnavailable, http_sources
+from utils.clock import VirtualClock, virtual_time
+
+
+def stub_fetcher(**settings) -> SourceFetcher:
+    """A fetcher whose HTTP sources all hit the stub app"""
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub_sources.app))
+    return SourceFetcher(http_sources("http://stub", **settings), client)
+
+
+@pytest.fixture(autouse=True)
+def stub(monkeypatch):
+    """Fresh latency, failure and request counters for every test"""
+    monkeypatch.setattr(stub_sources, "latency_ms", {})
+    monkeypatch.setattr(stub_sources, "failing", set())
+    monkeypatch.setattr(stub_sources, "requests_served", {name: 0 for name in stub_sources.requests_served})
+    return stub_sources
+
+
+def test_sources_are_fetched_concurrently(stub):
+    stub.latency_ms.update({"weather_api": 200, "aqi_monitor": 200})
+
+    async def scenario():
+        fetcher = stub_fetcher()
+        try:
+            start = time.perf_counter()
+            results = await fetcher.fetch_all("mumbai")
+            return results, time.perf_counter() - start
+        finally:
+            await fetcher.close()
+
+    results, elapsed = asyncio.run(scenario())
+    assert {"weather_api", "aqi_monitor"} <= set(results)
+    assert "aqi" in results["aqi_monitor"]
+    # The two slow required sources overlap instead of adding up
+    assert elapsed < 0.35
+    assert all(count == 1 for count in stub.requests_served.values())
+
+
+def test_optional_source_past_its_timeout_is_left_out(stub):
+    stub.latency_ms["social_media"] = 300
+
+    async def scenario():
+        fetcher = stub_fetcher(timeouts={"social_media": 0.05})
+        try:
+            start = time.perf_counter()
+            results = await fetcher.fetch_all("mumbai")
+            elapsed = time.perf_counter() - start
+            await asyncio.gather(*fetcher.inflight.values(), return_exceptions=True)
+            return results, elapsed, fetcher.stats
+        finally:
+            await fetcher.close()
+
+    results, elapsed, stats = asyncio.run(scenario())
+    assert "social_media" not in results
+    assert "weather_api" in results
+    assert elapsed < 0.3
+    assert stats["timeouts"] == 1
+
+
+def test_required_source_past_its_timeout_fails_the_fetch(stub):
+    stub.latency_ms["weather_api"] = 300
+
+    async def scenario():
+        fetcher = stub_fetcher(timeouts={"weather_api": 0.05})
+        try:
+            with pytest.raises(SourceUnavailable):
+                await fetcher.fetch_all("mumbai")
+            return fetcher.stats
+        finally:
+            await fetcher.close()
+
+    assert asyncio.run(scenario())["timeouts"] == 1
+
+
+def test_stale_value_is_served_while_it_refreshes(stub):
+    clock = VirtualClock(datetime(2024, 11, 1, 6, 0))
+
+    async def scenario():
+        fetcher = stub_fetcher(ttls={"aqi_monitor": 60})
+        try:
+            first = await fetcher.fetch_all("mumbai")
+            clock.advance(90)
+            # Stale but within the grace period: answered from cache, refreshed behind
+            stub.latency_ms["aqi_monitor"] = 100
+            start = time.perf_counter()
+            second = await fetcher.fetch_all("mumbai")
+            elapsed = time.perf_counter() - start
+            assert second["aqi_monitor"] == first["aqi_monitor"]
+            assert elapsed < 0.1
+            assert fetcher.stats["stale_hits"] == 1
+            await asyncio.gather(*fetcher.inflight.values())
+            assert stub.requests_served["aqi_monitor"] == 2
+            assert fetcher.cache[("aqi_monitor", "mumbai")][1] != first["aqi_monitor"]
+
+            # Past the grace period a required source is waited for again
+            clock.advance(200)
+            await fetcher.fetch_all("mumbai")
+            assert fetcher.stats["misses"] > len(fetcher.sources)
+            assert stub.requests_served["aqi_monitor"] == 3
+        finally:
+            await fetcher.close()
+
+    with virtual_time(clock):
+        asyncio.run(scenario())
+
+
+def test_failing_required_source_falls_back_to_its_last_value(stub):
+    clock = VirtualClock(datetime(2024, 11, 1, 6, 0))
+
+    async def scenario():
+        fetcher = stub_fetcher(ttls={"weather_api": 60})
+        try:
+            first = await fetcher.fetch_all("mumbai")
+            clock.advance(600)
+            stub.failing.add("weather_api")
+            second = await fetcher.fetch_all("mumbai")
+            assert second["weather_api"] == first["weather_api"]
+            assert fetcher.stats["errors"] == 1
+        finally:
+            await fetcher.close()
+
+    with virtual_time(clock):
+        asyncio.run(scenario())
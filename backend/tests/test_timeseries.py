@@ -0,0 +1,127 @@
+"""
+Ring-buffer time-series store: windows, statistics, caps and snapshots
+"""
+
+import json
+from array import array
+from datetime import datetime, timezone
+
+import pytest
+
+from utils.timeseries import RingBuffer, TimeSeriesStore, epoch_seconds, window_stats
+
+T0 = 1_730_440_800.0  # 2024-11-01 06:00 UTC
+
+
+def filled(capacity: int, points: int, step: float = 60) -> RingBuffer:
+    buffer = RingBuffer(capacity)
+    for i in range(points):
+        buffer.append(T0 + i * step, float(i))
+    return buffer
+
+
+def test_buffer_keeps_the_latest_points_oldest_first():
+    buffer = filled(5, 8)
+    times, values = buffer.window()
+    assert len(buffer) == 5
+    assert list(values) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert list(times) == [T0 + i * 60 for i in range(3, 8)]
+    assert buffer.latest() == (T0 + 7 * 60, 7.0)
+
+
+@pytest.mark.parametrize("points", [4, 10, 13])
+def test_window_selects_recent_points_across_the_wrap(points):
+    buffer = filled(10, points)
+    _, values = buffer.window(seconds=180)
+    # Points at or after latest - 180s: the last four
+    assert list(values) == [float(i) for i in range(max(0, points - 4), points)]
+
+
+def test_window_relative_to_an_explicit_now():
+    buffer = filled(10, 10)
+    _, values = buffer.window(seconds=120, now=T0 + 5 * 60)
+    assert list(values) == [3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0]
+    assert buffer.window(seconds=60, now=T0 + 3600) == (array("d"), array("d"))
+    assert RingBuffer(4).window() == (array("d"), array("d"))
+
+
+def test_window_stats_match_a_direct_computation():
+    times = array("d", [T0 + i * 60 for i in range(20)])
+    values = array("d", [10.0 + 2 * i for i in range(20)])
+    stats = window_stats(times, values)
+
+    assert stats["count"] == 20
+    assert stats["mean"] == pytest.approx(29.0)
+    assert stats["min"] == 10.0
+    assert stats["max"] == 48.0
+    assert stats["p95"] == 48.0
+    assert stats["latest"] == 48.0
+    # +2 per minute
+    assert stats["slope_per_hour"] == pytest.approx(120.0)
+
+
+def test_window_stats_edge_cases():
+    assert window_stats(array("d"), array("d")) is None
+    single = window_stats(array("d", [T0]), array("d", [5.0]))
+    assert single["slope_per_hour"] == 0.0
+    assert single["p95"] == 5.0
+    # Same timestamp twice: no spread, no slope
+    assert window_stats(array("d", [T0, T0]), array("d", [1.0, 3.0]))["slope_per_hour"] == 0.0
+
+
+def test_store_caps_the_number_of_series():
+    store = TimeSeriesStore(capacity=4, max_series=2)
+    assert store.append("s1", "aqi", T0, 100)
+    assert store.append("s1", "temperature", T0, 20)
+    assert not store.append("s2", "aqi", T0, 90)
+    assert store.append("s1", "aqi", T0 + 60, 110)
+    assert store.get_stats()["series"] == 2
+    assert store.rejected_series == 1
+
+
+def test_record_skips_missing_values_and_accepts_datetimes():
+    store = TimeSeriesStore()
+    moment = datetime(2024, 11, 1, 6, 0)
+    store.record("mumbai", moment, {"aqi": 150.0, "humidity": None})
+    assert set(store.series["mumbai"]) == {"aqi"}
+    assert store.series["mumbai"]["aqi"].latest()[0] == T0
+    assert epoch_seconds(moment.replace(tzinfo=timezone.utc)) == T0
+
+    trends = store.trends("mumbai", seconds=3600, now=moment)
+    assert trends["aqi"]["latest"] == 150.0
+    assert store.stats("pune", "aqi") is None
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = TimeSeriesStore(capacity=8)
+    for i in range(12):
+        store.record("mumbai", T0 + i * 60, {"aqi": 100.0 + i, "temperature": 20.0})
+    store.record("pune", T0, {"aqi": 80.0})
+    path = tmp_path / "history.bin"
+
+    assert store.snapshot(str(path)) == 17
+    assert [p.name for p in tmp_path.iterdir()] == ["history.bin"]
+
+    restored = TimeSeriesStore(capacity=8)
+    assert restored.restore(str(path)) == 17
+    for station, metric in [("mumbai", "aqi"), ("mumbai", "temperature"), ("pune", "aqi")]:
+        assert restored.series[station][metric].window() == store.series[station][metric].window()
+
+
+def test_restore_into_a_smaller_store_keeps_the_newest_points(tmp_path):
+    store = TimeSeriesStore(capacity=8)
+    for i in range(8):
+        store.append("mumbai", "aqi", T0 + i * 60, float(i))
+    path = tmp_path / "history.bin"
+    store.snapshot(str(path))
+
+    smaller = TimeSeriesStore(capacity=3)
+    assert smaller.restore(str(path)) == 3
+    assert list(smaller.series["mumbai"]["aqi"].window()[1]) == [5.0, 6.0, 7.0]
+
+
+def test_restore_rejects_unknown_versions(tmp_path):
+    path = tmp_path / "history.bin"
+    path.write_bytes(json.dumps({"version": 99, "series": []}).encode() + b"\n")
+    with pytest.raises(ValueError):
+        TimeSeriesStore().restore(str(path))
@@ -0,0 +1,116 @@
+"""
+TTL response cache for dashboard routes
+Serves repeated polls from memory and lets a single request recompute an
+expired entry while concurrent requests wait for its result
+"""
+
+import asyncio
+import functools
+import os
+import time
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.helpers import parse_key_values
+
+# Tag for entries that depend on the latest crisis response
+CRISIS_RESPONSE = "crisis_response"
+
+
+class ResponseCache:
+    """
+    In-memory TTL cache with stampede protection and tag-based invalidation
+    """
+
+    def __init__(self, ttl_overrides: Dict[str, float] = None):
+        self.ttl_overrides = ttl_overrides or {}
+        self.entries: Dict[str, Tuple[float, Any]] = {}
+        self.tags: Dict[str, set] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def cached(self, name: str, ttl: float, tags: Iterable[str] = (CRISIS_RESPONSE,)):
+        """
+        Cache an async route's result for `ttl` seconds (overridable per name
+        via MEDISURGE_CACHE_TTLS). Query parameters are part of the key,
+        database sessions are not.
+        """
+        tags = tuple(tags)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                key = name + repr(sorted(
+                    (k, v) for k, v in kwargs.items() if not isinstance(v, AsyncSession)
+                ))
+                value = self._lookup(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+
+                lock = self.locks.setdefault(key, asyncio.Lock())
+                async with lock:
+                    # Another request may have refreshed it while we waited
+                    value = self._lookup(key)
+                    if value is not None:
+                        self.hits += 1
+                        return value
+
+                    self.misses += 1
+                    generation = self.generation
+                    value = await func(*args, **kwargs)
+                    # Don't store a result computed across an invalidation
+                    if generation == self.generation:
+                        expires = time.monotonic() + self.ttl_overrides.get(name, ttl)
+                        self.entries[key] = (expires, value)
+                        for tag in tags:
+                            self.tags.setdefault(tag, set()).add(key)
+                    return value
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, tag: str = None) -> int:
+        """Drop entries carrying a tag (or everything), returns entries removed"""
+        self.generation += 1
+        self.invalidations += 1
+        if tag is None:
+            removed = len(self.entries)
+            self.entries.clear()
+            self.tags.clear()
+            return removed
+
+        removed = 0
+        for key in self.tags.pop(tag, set()):
+            if self.entries.pop(key, None) is not None:
+                removed += 1
+        return removed
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "ttl_overrides": self.ttl_overrides
+        }
+
+    def _lookup(self, key: str):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if time.monotonic() >= expires:
+            return None
+        return value
+
+
+response_cache = ResponseCache(parse_key_values(os.getenv("MEDISURGE_CACHE_TTLS", "")))
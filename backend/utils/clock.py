@@ -0,0 +1,47 @@
+"""
+Clock - The time source agents read "now" from
+Live runs use the wall clock; replays and backtests install a VirtualClock
+so hours of recorded readings can be pushed through in seconds
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+_now: Optional[Callable[[], datetime]] = None
+
+
+def utcnow() -> datetime:
+    """Current UTC time, virtual if a replay clock is installed"""
+    return _now() if _now is not None else datetime.utcnow()
+
+
+class VirtualClock:
+    """
+    Time that only moves when told to
+    """
+
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
+
+    def advance_to(self, moment: datetime):
+        """Jump forward to `moment`; time never runs backwards"""
+        if moment > self.current:
+            self.current = moment
+
+
+@contextmanager
+def virtual_time(clock: VirtualClock):
+    """Route every utcnow() call to `clock` for the duration of the block"""
+    global _now
+    previous, _now = _now, clock.now
+    try:
+        yield clock
+    finally:
+        _now = previous
@@ -4,7 +4,7 @@ Utility functions for data generation and processing
 
 import random
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 def generate_time_series_data(days: int = 30) -> List[Dict]:
     """Generate time series data for charts"""
@@ -49,3 +49,38 @@ def calculate_percentage_change(current: float, baseline: float) -> float:
     if baseline == 0:
         return 0
     return ((current - baseline) / baseline) * 100
+
+def diff_snapshots(previous: Dict, current: Dict) -> Tuple[Dict, List[List[str]]]:
+    """
+    Compute a compact delta between two JSON snapshots.
+    Returns the changed fields (nested, only what differs) and the key paths
+    that were removed. Nested dicts are diffed recursively, everything else
+    is replaced wholesale.
+    """
+    changed = {}
+    removed = []
+    
+    for key, value in current.items():
+        if key not in previous:
+            changed[key] = value
+        elif isinstance(value, dict) and isinstance(previous[key], dict):
+            sub_changed, sub_removed = diff_snapshots(previous[key], value)
+            if sub_changed:
+                changed[key] = sub_changed
+            removed.extend([key] + path for path in sub_removed)
+        elif value != previous[key]:
+            changed[key] = value
+    
+    for key in previous:
+        if key not in current:
+            removed.append([key])
+    
+    return changed, removed
+
+def parse_key_values(spec: str) -> Dict[str, float]:
+    """Parse "dashboard.summary=10,insurance.providers=3600" into a dict"""
+    values = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        values[name.strip()] = float(value)
+    return values
@@ -0,0 +1,130 @@
+"""
+Event loop lag monitor and blocking-call detector
+A ticker coroutine measures how late the loop wakes it up; a watchdog thread
+notices when the ticker stops ticking and captures the stack that is holding
+the loop
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from utils.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+loop_lag = registry.histogram(
+    "medisurge_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+loop_blocks = registry.counter("medisurge_loop_blocks_total", "Times a callback held the event loop past the threshold")
+
+
+class LoopLagMonitor:
+    """
+    Samples loop lag every `interval` seconds and records a stack trace
+    whenever the loop is held longer than `block_threshold`
+    """
+
+    def __init__(self, interval: float = 0.1, block_threshold: float = 0.25,
+                 window: int = 600, max_events: int = 20):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.samples: deque = deque(maxlen=window)
+        self.blocking_events: deque = deque(maxlen=max_events)
+
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id: Optional[int] = None
+        self.ticker: Optional[asyncio.Task] = None
+        self.watchdog: Optional[threading.Thread] = None
+        self.stopped = threading.Event()
+
+    async def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.stopped.clear()
+        self.ticker = asyncio.create_task(self._tick())
+        self.watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self.watchdog.start()
+        logger.info(f"⏱️ Loop lag monitor started (block threshold {self.block_threshold * 1000:.0f}ms)")
+
+    async def stop(self):
+        self.stopped.set()
+        if self.ticker:
+            self.ticker.cancel()
+            try:
+                await self.ticker
+            except asyncio.CancelledError:
+                pass
+        if self.watchdog:
+            self.watchdog.join(timeout=1)
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.samples.append(lag)
+            loop_lag.observe(lag)
+            self.heartbeat = time.monotonic()
+
+    def _watch(self):
+        """Runs in a thread: capture the loop's stack once per blocking episode"""
+        captured_for = None
+        while not self.stopped.wait(self.block_threshold / 2):
+            heartbeat = self.heartbeat
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.block_threshold or captured_for == heartbeat:
+                continue
+            captured_for = heartbeat
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = traceback.format_stack(frame) if frame else []
+            self.blocking_events.append((time.time(), {
+                "detected_at": datetime.utcnow().isoformat(),
+                "blocked_ms": round(blocked_for * 1000, 1),
+                "stack": [line.rstrip() for line in stack[-8:]]
+            }))
+            loop_blocks.inc()
+            logger.warning(
+                f"🐢 Event loop blocked for {blocked_for * 1000:.0f}ms+ in:\n{''.join(stack[-3:])}"
+            )
+
+    def percentiles(self) -> Dict[str, float]:
+        """Lag percentiles over the recent window, in milliseconds"""
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        def pick(q: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+        return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+                "max_ms": round(ordered[-1] * 1000, 1)}
+
+    def recent_blocks(self, within: float = 60) -> List[Dict]:
+        cutoff = time.time() - within
+        return [event for detected, event in self.blocking_events if detected >= cutoff]
+
+    def is_degraded(self) -> bool:
+        """Lagging at p99 or blocked within the last minute"""
+        return (self.percentiles()["p99_ms"] >= self.block_threshold * 1000
+                or bool(self.recent_blocks()))
+
+    def get_stats(self) -> Dict:
+        blocks = self.recent_blocks()
+        return {
+            "status": "degraded" if self.is_degraded() else "healthy",
+            **self.percentiles(),
+            "samples": len(self.samples),
+            "block_threshold_ms": round(self.block_threshold * 1000),
+            "recent_blocks": len(blocks),
+            "last_block": blocks[-1] if blocks else None
+        }
@@ -0,0 +1,235 @@
+"""
+Instrumentation for MediSurge AI
+Counters, gauges, histograms and timing spans, rendered in the Prometheus
+text exposition format for the /metrics endpoint
+"""
+
+import asyncio
+import bisect
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Latency buckets in seconds, from sub-millisecond DB queries to slow agents
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge:
+    """Point-in-time value per label set, or read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, callback: Callable[[], float] = None):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels):
+        self.values[_label_key(labels)] = value
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            return [f"{self.name} {self.callback()}"]
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Histogram:
+    """Bucketed observations with running count and sum per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., +Inf count, sum]
+        self.series: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, **labels) -> int:
+        """Observations across every label set matching `labels`"""
+        wanted = set(_label_key(labels))
+        return sum(
+            sum(series[:-1]) for key, series in self.series.items() if wanted <= set(key)
+        )
+
+    def total(self, **labels) -> float:
+        """Sum of observed values across every label set matching `labels`"""
+        wanted = set(_label_key(labels))
+        return sum(series[-1] for key, series in self.series.items() if wanted <= set(key))
+
+    def quantile(self, q: float, **labels) -> float:
+        """
+        Approximate quantile (bucket upper bound) over matching label sets,
+        capped at the largest finite bucket so it always serializes as JSON
+        """
+        wanted = set(_label_key(labels))
+        counts = [0] * (len(self.buckets) + 1)
+        for key, series in self.series.items():
+            if wanted <= set(key):
+                counts = [total + n for total, n in zip(counts, series[:-1])]
+        total = sum(counts)
+        if not total:
+            return 0.0
+        running = 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            if running >= q * total:
+                return bound
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, series in self.series.items():
+            running = 0
+            for bound, n in zip(self.buckets, series):
+                running += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', repr(bound))])} {running}")
+            running += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {running}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds every metric and renders them for scraping. Span sinks receive
+    (span name, seconds, outcome) for each finished span.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.span_sinks: List[Callable[[str, float, str], None]] = []
+        self.started = time.time()
+
+        self.spans = self.histogram("medisurge_span_seconds", "Duration of traced orchestrator stages and agent calls")
+        self.http_requests = self.histogram("medisurge_http_request_seconds", "HTTP request latency per route")
+        self.db_queries = self.histogram("medisurge_db_query_seconds", "Database statement duration")
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str, callback: Callable[[], float] = None) -> Gauge:
+        return self._register(Gauge(name, help_text, callback))
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def _register(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    @contextmanager
+    def span(self, name: str):
+        """Time a block of code as a named span; cancelled blocks aren't recorded"""
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Hedge losers and shutdown cancellations are neither calls nor errors
+            outcome = None
+            raise
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            if outcome is not None:
+                elapsed = time.perf_counter() - start
+                self.spans.observe(elapsed, span=name, outcome=outcome)
+                for sink in self.span_sinks:
+                    sink(name, elapsed, outcome)
+
+    def traced(self, name: str):
+        """Decorator that records every call of an async function as a span"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def instrument_engine(engine: AsyncEngine, label: str):
+    """Record the duration of every statement run through an engine"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("medisurge_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["medisurge_query_start"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        registry.db_queries.observe(time.perf_counter() - start, engine=label, operation=operation)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(context):
+        if context.connection is not None and context.connection.info.get("medisurge_query_start"):
+            context.connection.info["medisurge_query_start"].pop()
+
+
+registry = MetricsRegistry()
+span = registry.span
+traced = registry.traced
@@ -0,0 +1,62 @@
+"""
+Keyset (cursor) pagination for time-ordered tables
+Pages walk backwards through (timestamp, id) so every page costs one index
+range scan with a LIMIT, however far back the client has scrolled
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Opaque token pointing just past a row"""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor token, rejecting anything malformed with a 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+async def paginate(db: AsyncSession, model, filters: List = None, cursor: Optional[str] = None,
+                   limit: int = 20, include_total: bool = False) -> Dict:
+    """
+    Fetch one page of `model` rows, newest first.
+    Returns the rows, the cursor for the next page (None on the last page)
+    and, if requested, the total number of rows matching `filters`.
+    """
+    filters = list(filters or [])
+    order_key = tuple_(model.timestamp, model.id)
+
+    stmt = select(model).where(*filters)
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(order_key < tuple_(cursor_timestamp, cursor_id))
+    stmt = stmt.order_by(model.timestamp.desc(), model.id.desc()).limit(limit + 1)
+
+    result = await db.execute(stmt)
+    rows = result.scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    page = {"items": rows, "next_cursor": next_cursor, "total": None}
+    if include_total:
+        # Counting ids only lets the database answer from the timestamp index
+        total = await db.execute(select(func.count(model.id)).where(*filters))
+        page["total"] = total.scalar_one()
+    return page
@@ -0,0 +1,253 @@
+"""
+Time-series store - Fixed-capacity ring buffers of recent readings
+One pair of array('d') buffers (timestamps, values) per metric and station:
+O(1) appends, windowed mean/max/percentile/slope computed with NumPy over
+the buffers without touching SQLite, and a compact binary snapshot so
+history survives a restart
+"""
+
+import json
+import os
+import tempfile
+from array import array
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+Timestamp = Union[float, datetime]
+
+SNAPSHOT_VERSION = 1
+
+# Window (seconds) agents read recent trends over
+TREND_WINDOW = 3 * 3600
+
+
+def epoch_seconds(moment: Timestamp) -> float:
+    """Epoch seconds for a float or (naive = UTC) datetime"""
+    if isinstance(moment, datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+    return float(moment)
+
+
+class RingBuffer:
+    """
+    The latest `capacity` (timestamp, value) points of one series, oldest
+    overwritten first. Points are expected roughly in time order.
+    """
+
+    __slots__ = ("capacity", "times", "values", "start", "count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, timestamp: float, value: float):
+        if self.count < self.capacity:
+            index = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[index] = timestamp
+        self.values[index] = value
+
+    def _slice(self, buffer: array, first: int) -> array:
+        """Logical positions first..count-1 of a buffer, oldest first"""
+        n = self.count - first
+        if n <= 0:
+            return array("d")
+        begin = (self.start + first) % self.capacity
+        end = begin + n
+        if end <= self.capacity:
+            return buffer[begin:end]
+        return buffer[begin:] + buffer[:end - self.capacity]
+
+    def _first_since(self, since: float) -> int:
+        """Logical position of the first point at or after `since`"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[(self.start + mid) % self.capacity] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, seconds: Optional[float] = None, now: Optional[float] = None) -> Tuple[array, array]:
+        """(timestamps, values) of the points in the last `seconds`, or all of them"""
+        if not self.count:
+            return array("d"), array("d")
+        if seconds is None:
+            first = 0
+        else:
+            latest = self.times[(self.start + self.count - 1) % self.capacity]
+            first = self._first_since((now if now is not None else latest) - seconds)
+        if first >= self.count:
+            return array("d"), array("d")
+        return self._slice(self.times, first), self._slice(self.values, first)
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self.count:
+            return None
+        index = (self.start + self.count - 1) % self.capacity
+        return self.times[index], self.values[index]
+
+
+def window_stats(times: array, values: array, percentile: float = 0.95) -> Optional[Dict]:
+    """Mean, max, a percentile and the least-squares slope (per hour) of a window"""
+    n = len(values)
+    if not n:
+        return None
+    # Zero-copy views of the doubles; every statistic is a single vectorized pass
+    v = np.frombuffer(values, dtype=np.float64)
+    rank = min(n - 1, int(percentile * n))
+    mean = float(v.mean())
+    stats = {
+        "count": n,
+        "mean": mean,
+        "min": float(v.min()),
+        "max": float(v.max()),
+        f"p{round(percentile * 100)}": float(np.partition(v, rank)[rank]),
+        "latest": values[-1],
+        "slope_per_hour": 0.0
+    }
+    if n > 1:
+        # Offsets from the first point keep epoch seconds from swamping the precision
+        dt = np.frombuffer(times, dtype=np.float64) - times[0]
+        dt -= dt.mean()
+        variance = float(dt @ dt)
+        if variance > 0:
+            stats["slope_per_hour"] = float(dt @ (v - mean)) / variance * 3600
+    return stats
+
+
+class TimeSeriesStore:
+    """
+    Ring buffers per station and metric. At most `max_series` series are
+    kept, so memory is bounded at roughly max_series * capacity * 16 bytes.
+    """
+
+    def __init__(self, capacity: int = 1440, max_series: int = 20000):
+        self.capacity = capacity
+        self.max_series = max_series
+        self.series: Dict[str, Dict[str, RingBuffer]] = {}
+        self.series_count = 0
+        self.appended = 0
+        self.rejected_series = 0
+
+    def append(self, station: str, metric: str, timestamp: Timestamp, value: float) -> bool:
+        """Record one point, False if the series cap stops a new series"""
+        metrics = self.series.get(station)
+        buffer = metrics.get(metric) if metrics is not None else None
+        if buffer is None:
+            if self.series_count >= self.max_series:
+                self.rejected_series += 1
+                return False
+            buffer = self.series.setdefault(station, {})[metric] = RingBuffer(self.capacity)
+            self.series_count += 1
+        buffer.append(epoch_seconds(timestamp), value)
+        self.appended += 1
+        return True
+
+    def record(self, station: str, timestamp: Timestamp, values: Dict[str, Optional[float]]):
+        """Record several metrics of one reading"""
+        timestamp = epoch_seconds(timestamp)
+        for metric, value in values.items():
+            if value is not None:
+                self.append(station, metric, timestamp, value)
+
+    def stats(self, station: str, metric: str, seconds: Optional[float] = None,
+              now: Optional[Timestamp] = None) -> Optional[Dict]:
+        """Windowed statistics for one series, None if it has no points in the window"""
+        buffer = self.series.get(station, {}).get(metric)
+        if buffer is None:
+            return None
+        times, values = buffer.window(seconds, epoch_seconds(now) if now is not None else None)
+        return window_stats(times, values)
+
+    def trends(self, station: str, seconds: Optional[float] = None,
+               now: Optional[Timestamp] = None) -> Dict[str, Dict]:
+        """Windowed statistics for every metric recorded for a station"""
+        trends = {}
+        for metric in self.series.get(station, {}):
+            stats = self.stats(station, metric, seconds, now)
+            if stats is not None:
+                trends[metric] = stats
+        return trends
+
+    def stations(self) -> List[str]:
+        return sorted(self.series)
+
+    def get_stats(self) -> Dict:
+        return {
+            "series": self.series_count,
+            "stations": len(self.series),
+            "points": sum(len(buffer) for metrics in self.series.values() for buffer in metrics.values()),
+            "capacity_per_series": self.capacity,
+            "appended": self.appended,
+            "rejected_series": self.rejected_series
+        }
+
+    def snapshot(self, path: str) -> int:
+        """
+        Write every series to `path` atomically: one JSON header line, then
+        each series' timestamps and values as raw doubles, oldest first.
+        Returns the number of points written.
+        """
+        entries = []
+        for station, metrics in self.series.items():
+            for metric, buffer in metrics.items():
+                times, values = buffer.window()
+                entries.append(((station, metric), times, values))
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "capacity": self.capacity,
+            "series": [[station, metric, len(times)] for (station, metric), times, _ in entries]
+        }
+        # A unique temporary file, so concurrent writers never share one
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header).encode() + b"\n")
+                for _, times, values in entries:
+                    times.tofile(f)
+                    values.tofile(f)
+            os.replace(temp_path, path)
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(temp_path)
+            raise
+        return sum(len(times) for _, times, _ in entries)
+
+    def restore(self, path: str) -> int:
+        """Load a snapshot written by `snapshot`, returns the number of points restored"""
+        restored = 0
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported time-series snapshot version {header.get('version')}")
+            for station, metric, count in header["series"]:
+                times, values = array("d"), array("d")
+                times.fromfile(f, count)
+                values.fromfile(f, count)
+                for timestamp, value in _tail(times, values, self.capacity):
+                    if not self.append(station, metric, timestamp, value):
+                        break
+                    restored += 1
+        return restored
+
+
+def _tail(times: array, values: array, capacity: int) -> Iterator[Tuple[float, float]]:
+    """The newest `capacity` points, oldest first"""
+    first = max(0, len(times) - capacity)
+    return zip(times[first:], values[first:])
@@ -11,16 +11,21 @@ import PharmaceuticalStatus from '../components/PharmaceuticalStatus';
 import SystemMetrics from '../components/SystemMetrics';
 import CrisisTimeline from '../components/CrisisTimeline';
 import { fetchDashboardData } from '../lib/api';
+import { useLiveTopics } from '../lib/liveUpdates';
+
+const CITY_TOPIC = `city:${process.env.NEXT_PUBLIC_CITY || 'mumbai'}`;
 
 export default function Home() {
   const [dashboardData, setDashboardData] = useState<any>(null);
   const [loading, setLoading] = useState(true);
 
+  const live = useLiveTopics([CITY_TOPIC]);
+  const lastScan = live[CITY_TOPIC]?.last_scan;
+
+  // Reload when the orchestrator reports a new scan instead of polling
   useEffect(() => {
     loadDashboard();
-    const interval = setInterval(loadDashboard, 30000); // Refresh every 30s
-    return () => clearInterval(interval);
-  }, []);
+  }, [lastScan]);
 
   const loadDashboard = async () => {
     try {
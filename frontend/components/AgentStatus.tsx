@@ -2,15 +2,15 @@
 
 import { useEffect, useState } from 'react';
 import { fetchAgentStatus } from '../lib/api';
+import { useLiveTopics } from '../lib/liveUpdates';
 import { CheckCircle, Activity, AlertCircle } from 'lucide-react';
 
 export default function AgentStatus() {
   const [agents, setAgents] = useState<any>(null);
 
+  // Initial load over HTTP, live status arrives over the WebSocket
   useEffect(() => {
     loadAgents();
-    const interval = setInterval(loadAgents, 15000);
-    return () => clearInterval(interval);
   }, []);
 
   const loadAgents = async () => {
@@ -33,6 +33,9 @@ export default function AgentStatus() {
     { key: 'pharmaceutical', name: 'Pharmaceutical', icon: '💊', description: 'Supply Chain' },
   ];
 
+  const live = useLiveTopics(agentList.map((agent) => `agent:${agent.key}`));
+  const statusOf = (key: string) => live[`agent:${key}`] || agents?.[key];
+
   return (
     <div className="grid grid-cols-2 md:grid-cols-4 gap-4">
       {agentList.map((agent) => (
@@ -42,7 +45,7 @@ export default function AgentStatus() {
         >
           <div className="flex items-start justify-between mb-2">
             <span className="text-3xl">{agent.icon}</span>
-            {agents?.[agent.key] && (
+            {statusOf(agent.key) && (
               <CheckCircle className="h-5 w-5 text-green-500" />
             )}
           </div>
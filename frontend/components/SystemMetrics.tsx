@@ -22,10 +22,13 @@ export default function SystemMetrics() {
 
   if (!metrics) return null;
 
-  const performanceData = [
-    { name: 'Prediction Accuracy', value: 87.3 },
-    { name: 'Agent Success', value: 94.5 },
-    { name: 'System Uptime', value: 99.8 },
+  const performance = metrics.performance || {};
+  const formatMs = (value?: number | null) => (value == null ? '—' : `${value}ms`);
+
+  const latencyData = [
+    { name: 'Avg Response', value: performance.average_response_ms ?? 0 },
+    { name: 'p95 Response', value: performance.p95_response_ms ?? 0 },
+    { name: 'p95 Request', value: performance.p95_request_latency_ms ?? 0 },
   ];
 
   return (
@@ -36,75 +39,45 @@ export default function SystemMetrics() {
 
       <div className="grid grid-cols-1 md:grid-cols-4 gap-4 mb-6">
         <div className="stat-card">
-          <p className="text-sm text-gray-600 mb-1">Prediction Accuracy</p>
+          <p className="text-sm text-gray-600 mb-1">Responses Coordinated</p>
           <p className="text-3xl font-bold text-blue-600">
-            {metrics.performance?.prediction_accuracy || 87.3}%
+            {performance.responses_coordinated ?? 0}
           </p>
         </div>
 
         <div className="stat-card">
           <p className="text-sm text-gray-600 mb-1">Response Time</p>
           <p className="text-3xl font-bold text-green-600">
-            {metrics.performance?.average_response_time || '3.2h'}
+            {formatMs(performance.average_response_ms)}
           </p>
         </div>
 
         <div className="stat-card">
           <p className="text-sm text-gray-600 mb-1">System Uptime</p>
           <p className="text-3xl font-bold text-purple-600">
-            {metrics.performance?.system_uptime || '99.8%'}
+            {performance.system_uptime || '—'}
           </p>
         </div>
 
         <div className="stat-card">
           <p className="text-sm text-gray-600 mb-1">Success Rate</p>
           <p className="text-3xl font-bold text-indigo-600">
-            {metrics.performance?.agent_success_rate || 94.5}%
+            {performance.agent_success_rate == null ? '—' : `${performance.agent_success_rate}%`}
           </p>
         </div>
       </div>
 
       <div className="h-64">
         <ResponsiveContainer width="100%" height="100%">
-          <BarChart data={performanceData}>
+          <BarChart data={latencyData}>
             <CartesianGrid strokeDasharray="3 3" />
             <XAxis dataKey="name" />
-            <YAxis />
+            <YAxis unit="ms" />
             <Tooltip />
             <Bar dataKey="value" fill="#3b82f6" />
           </BarChart>
         </ResponsiveContainer>
       </div>
-
-      <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mt-6">
-        <div className="text-center p-3 bg-blue-50 rounded-lg">
-          <p className="text-xs text-gray-600">Lives Protected</p>
-          <p className="text-xl font-bold text-blue-600">
-            {metrics.impact?.lives_protected?.toLocaleString() || '1,000+'}
-          </p>
-        </div>
-
-        <div className="text-center p-3 bg-green-50 rounded-lg">
-          <p className="text-xs text-gray-600">Visits Prevented</p>
-          <p className="text-xl font-bold text-green-600">
-            {metrics.impact?.emergency_visits_prevented || 300}+
-          </p>
-        </div>
-
-        <div className="text-center p-3 bg-purple-50 rounded-lg">
-          <p className="text-xs text-gray-600">Wait Time ↓</p>
-          <p className="text-xl font-bold text-purple-600">
-            {metrics.impact?.wait_time_reduction || 60}%
-          </p>
-        </div>
-
-        <div className="text-center p-3 bg-pink-50 rounded-lg">
-          <p className="text-xs text-gray-600">Stockouts Prevented</p>
-          <p className="text-xl font-bold text-pink-600">
-            {metrics.impact?.stockouts_prevented || 8}
-          </p>
-        </div>
-      </div>
     </div>
   );
 }
@@ -0,0 +1,88 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+
+const WS_URL = process.env.NEXT_PUBLIC_WS_URL || 'ws://localhost:8000/ws/updates';
+
+type Snapshots = Record<string, any>;
+
+// Merge a delta's changed fields into a snapshot and drop removed key paths
+function applyDelta(snapshot: any, changed: any, removed: string[][]): any {
+  const next = { ...snapshot };
+  for (const [key, value] of Object.entries(changed)) {
+    const current = next[key];
+    const bothObjects =
+      current && typeof current === 'object' && !Array.isArray(current) &&
+      value && typeof value === 'object' && !Array.isArray(value);
+    next[key] = bothObjects ? applyDelta(current, value, []) : value;
+  }
+  for (const path of removed) {
+    let parent = next;
+    for (const key of path.slice(0, -1)) {
+      parent[key] = { ...parent[key] };
+      parent = parent[key];
+    }
+    delete parent[path[path.length - 1]];
+  }
+  return next;
+}
+
+/**
+ * Subscribe to topics on /ws/updates and keep the latest snapshot of each.
+ * The server sends one full snapshot per topic, then only changed fields.
+ */
+export function useLiveTopics(topics: string[]): Snapshots {
+  const [snapshots, setSnapshots] = useState<Snapshots>({});
+  const topicKey = topics.join(',');
+
+  useEffect(() => {
+    let socket: WebSocket | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let retryDelay = 1000;
+    let closed = false;
+    const sequences: Record<string, number> = {};
+
+    const connect = () => {
+      socket = new WebSocket(WS_URL);
+
+      socket.onopen = () => {
+        retryDelay = 1000;
+        socket?.send(JSON.stringify({ action: 'subscribe', topics }));
+      };
+
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'snapshot') {
+          sequences[message.topic] = message.seq;
+          setSnapshots((prev) => ({ ...prev, [message.topic]: message.data }));
+        } else if (message.type === 'delta') {
+          if (sequences[message.topic] !== message.seq - 1) {
+            // Missed an update, ask for a fresh snapshot
+            socket?.send(JSON.stringify({ action: 'resync', topics: [message.topic] }));
+            return;
+          }
+          sequences[message.topic] = message.seq;
+          setSnapshots((prev) => ({
+            ...prev,
+            [message.topic]: applyDelta(prev[message.topic] || {}, message.changed, message.removed),
+          }));
+        }
+      };
+
+      socket.onclose = () => {
+        if (closed) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      if (retryTimer) clearTimeout(retryTimer);
+      socket?.close();
+    };
+  }, [topicKey]);
+
+  return snapshots;
+}